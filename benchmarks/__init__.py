@@ -0,0 +1,17 @@
+"""
+Offline benchmarks of the Qlarifais stack.
+
+Every shipped experiment config (baseline, ablation1-3 and pilot) is built with
+randomly initialized encoders, a synthetic tokenizer, answer vocabulary and
+Numberbatch, and run on synthetic images and questions, so neither OK-VQA nor
+any pretrained weights are needed. Results are written as JSON, which
+``benchmarks.compare`` compares across commits:
+
+    python -m benchmarks.run --out before.json
+    git checkout <other commit>
+    python -m benchmarks.run --out after.json
+    python -m benchmarks.compare before.json after.json
+
+Run from the root of the repository (the directory containing ``mmf`` and
+``mmexp``).
+"""
@@ -0,0 +1,77 @@
+"""
+Compares two result files of ``benchmarks.run``, e.g. of two commits:
+
+    python -m benchmarks.compare before.json after.json --threshold 0.1
+
+Prints every timing, throughput and memory value of both files with their
+relative change. Regressions beyond the threshold are marked, and the exit
+code is 1 if there are any.
+"""
+
+import argparse
+import json
+import sys
+
+
+# higher values of these keys are better, of all others lower is better
+HIGHER_IS_BETTER = ("throughput_samples_per_s",)
+# keys which are not compared
+IGNORED = ("repeats", "parameters", "trainable_parameters")
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description="Compare two benchmark results.")
+    parser.add_argument("before", help="json file of the baseline")
+    parser.add_argument("after", help="json file to compare to the baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        help="relative change counted as regression",
+        default=0.1,
+    )
+    return parser.parse_args()
+
+
+def flatten(results, prefix=""):
+    values = {}
+    for key, value in results.items():
+        name = f"{prefix}/{key}" if prefix else key
+        if isinstance(value, dict):
+            values.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            if key not in IGNORED:
+                values[name] = value
+    return values
+
+
+def main():
+    args = get_args()
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    print(f"before: {before['meta']['commit']}, after: {after['meta']['commit']}")
+
+    before = flatten({key: before[key] for key in ("models", "helpers")})
+    after = flatten({key: after[key] for key in ("models", "helpers")})
+
+    regressions = 0
+    for name in sorted(set(before) & set(after)):
+        if before[name] == 0:
+            continue
+        change = after[name] / before[name] - 1
+        higher_is_better = any(key in name for key in HIGHER_IS_BETTER)
+        regressed = (-change if higher_is_better else change) > args.threshold
+        regressions += regressed
+        mark = "  REGRESSION" if regressed else ""
+        values = f"{before[name]:>12.2f} {after[name]:>12.2f} {change:>+8.1%}"
+        print(f"{name:<80} {values}{mark}")
+
+    for name in sorted(set(before) ^ set(after)):
+        print(f"{name:<80} only in {'before' if name in before else 'after'}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+"""
+Builds Qlarifais from a shipped experiment config on top of the synthetic
+resources and measures it, see ``benchmark_model`` and ``benchmark_helpers``.
+"""
+
+import argparse
+import copy
+import os
+import resource
+import time
+import traceback
+
+import numpy as np
+import torch
+from omegaconf import OmegaConf, open_dict
+
+from benchmarks.synthetic import SyntheticResources
+
+
+# the detectron2 configs of the image encoder are read relative to the working
+# directory, from ../mmf/mmf/configs, i.e. from any directory next to mmf
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def timeit(fn, repeats=5, warmup=1):
+    """Wall clock times of ``fn`` in milliseconds, after ``warmup`` calls"""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeats):
+        tic = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - tic) * 1000)
+    times = np.array(times)
+    return {
+        "mean_ms": float(times.mean()),
+        "median_ms": float(np.median(times)),
+        "min_ms": float(times.min()),
+        "repeats": repeats,
+    }
+
+
+def peak_memory_mb():
+    memory = {"peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+    if torch.cuda.is_available():
+        memory["peak_cuda_mb"] = torch.cuda.max_memory_allocated() / 2 ** 20
+    return memory
+
+
+def measure(results, key, fn):
+    # a failing measurement is recorded instead of stopping the whole run
+    try:
+        results[key] = fn()
+    except Exception as e:
+        results[key] = {"error": f"{type(e).__name__}: {e}"}
+        traceback.print_exc()
+
+
+def build_config(experiment, resources):
+    """Full config of ``configs/experiments/<experiment>``, pointed at the
+    synthetic resources and with randomly initialized encoders"""
+    from mmf.utils.build import build_config as build_mmf_config
+    from mmf.utils.configuration import Configuration
+
+    args = argparse.Namespace(config_override=None)
+    args.opts = [
+        f"config=configs/experiments/{experiment}",
+        "model=qlarifais",
+        "dataset=okvqa",
+        "datasets=okvqa",
+        f"env.data_dir={resources.data_dir}",
+        f"env.save_dir={resources.save_dir}",
+        f"env.cache_dir={resources.root}",
+    ]
+    configuration = Configuration(args)
+    config = configuration.get_config()
+    with open_dict(config):
+        processors = config.dataset_config.okvqa.processors
+        processors.text_processor.params.tokenizer_config.type = resources.tokenizer_dir
+        processors.answer_processor.params.vocab_file = resources.answer_vocab_file
+        config.dataset_config.embedding_models.numberbatch.filepath = (
+            resources.numberbatch_file
+        )
+
+        model_config = config.model_config.qlarifais
+        model_config.model = "qlarifais"
+        model_config.text_encoder.params.name = resources.tokenizer_dir
+        model_config.text_encoder.params.random_init = True
+        model_config.image_encoder.params.random_init = True
+        model_config.graph_encoder.filepath = resources.numberbatch_file
+    return build_mmf_config(configuration)
+
+
+def build_processors(config, keys=("text_processor", "answer_processor")):
+    from mmf.common.registry import registry
+    from mmf.utils.build import build_processors as build_mmf_processors
+
+    okvqa = config.dataset_config.okvqa
+    processors_config = OmegaConf.create(
+        {key: OmegaConf.to_container(okvqa.processors[key]) for key in keys}
+    )
+    processors = build_mmf_processors(processors_config, data_dir=okvqa.data_dir)
+    # the metrics look up the answer processor of the dataset
+    for key, processor in processors.items():
+        registry.register(f"okvqa_{key}", processor)
+    return processors
+
+
+def build_model(config):
+    from mmf.utils.build import build_model as build_mmf_model
+
+    cwd = os.getcwd()
+    os.chdir(PACKAGE_DIR)
+    try:
+        return build_mmf_model(config.model_config.qlarifais)
+    finally:
+        os.chdir(cwd)
+
+
+def build_sample_list(model, processors, resources, batch_size):
+    """Batch as the okvqa dataset and its numberbatch processor produce it"""
+    from mmf.common.sample import Sample, SampleList
+
+    samples = []
+    questions = resources.questions(batch_size)
+    answer_lists = resources.answer_lists(batch_size)
+    for question, answers in zip(questions, answer_lists):
+        sample = Sample()
+        sample.update(processors["text_processor"]({"text": question}))
+        sample.answers = answers
+        sample.targets = processors["answer_processor"]({"answers": answers})[
+            "answers_scores"
+        ]
+        samples.append(sample)
+
+    sample_list = SampleList(samples)
+    sample_list.image = resources.image_tensor(batch_size)
+    with torch.no_grad():
+        if model.config.graph_encoder.use:
+            sample_list.graph_embedding = model.graph_encoder(sample_list.tokens)
+        sample_list.avg_embedded_answers = model.graph_encoder(answer_lists)
+    sample_list.dataset_name = "okvqa"
+    sample_list.dataset_type = "train"
+    return sample_list
+
+
+def benchmark_model(experiment, resources, batch_sizes=(1, 8, 32), repeats=5):
+    """Build time, parameters, forward latency, training step latency (forward
+    with losses and backward), throughput per batch size and peak memory of
+    the model of one experiment config"""
+    results = {}
+    tic = time.perf_counter()
+    config = build_config(experiment, resources)
+    model = build_model(config)
+    processors = build_processors(config)
+    results["build_s"] = time.perf_counter() - tic
+    results["parameters"] = sum(p.numel() for p in model.parameters())
+    results["trainable_parameters"] = sum(
+        p.numel() for p in model.parameters() if p.requires_grad
+    )
+    results["memory_after_build"] = peak_memory_mb()
+
+    batch_size = max(batch_sizes)
+    sample_list = build_sample_list(model, processors, resources, batch_size)
+
+    @torch.no_grad()
+    def forward():
+        model(sample_list)
+
+    def train_step():
+        output = model(sample_list)
+        sum(output["losses"].values()).backward()
+        model.zero_grad(set_to_none=True)
+
+    model.eval()
+    measure(results, "forward", lambda: timeit(forward, repeats))
+    model.train()
+    measure(results, "train_step", lambda: timeit(train_step, repeats))
+    model.eval()
+
+    def throughput():
+        samples_per_s = {}
+        for size in batch_sizes:
+            batch = build_sample_list(model, processors, resources, size)
+            with torch.no_grad():
+                timing = timeit(lambda: model(batch), repeats)
+            samples_per_s[str(size)] = size / timing["median_ms"] * 1000
+        return samples_per_s
+
+    measure(results, "throughput_samples_per_s", throughput)
+    results["memory"] = peak_memory_mb()
+    return results
+
+
+def benchmark_helpers(experiment, resources, batch_size=32, repeats=5):
+    """Hot helpers around the model of one experiment config: Numberbatch
+    lookups, losses, metrics and the explainability methods"""
+    from mmf.models.interfaces.qlarifais import QlarifaisInterface
+    from mmf.modules.metrics import Metrics
+
+    config = build_config(experiment, resources)
+    model = build_model(config)
+    processors = build_processors(config)
+    sample_list = build_sample_list(model, processors, resources, batch_size)
+    model.eval()
+    with torch.no_grad():
+        output = model(sample_list)
+
+    results = {}
+
+    def numberbatch_load():
+        from mmf.modules import graphnetwork
+        from mmf.utils.build import build_graph_encoder
+
+        # the parsed file is cached per process
+        graphnetwork._numberbatch_cache.clear()
+        encoder = build_graph_encoder(config.model_config.qlarifais.graph_encoder)
+        return timeit(encoder.load, repeats=1, warmup=0)
+
+    measure(results, "numberbatch_load", numberbatch_load)
+    measure(
+        results,
+        "numberbatch_lookup",
+        lambda: timeit(lambda: model.graph_encoder(sample_list.tokens), repeats),
+    )
+    measure(
+        results,
+        "losses",
+        lambda: timeit(lambda: model.losses(sample_list, output), repeats),
+    )
+
+    def metrics():
+        metrics = Metrics(config.evaluation.metrics)
+        return timeit(lambda: metrics(sample_list, dict(output)), repeats)
+
+    measure(results, "metrics", metrics)
+
+    def explainability():
+        from mmexp.methods.torchray.multimodal_gradcam import multimodal_gradcam
+        from mmexp.methods.torchray.multimodal_gradient import multimodal_gradient
+
+        # the interface builds the processors again, without the ones which
+        # need files that are not synthesized
+        interface_config = copy.deepcopy(config)
+        with open_dict(interface_config):
+            processors_config = interface_config.dataset_config.okvqa.processors
+            for key in list(processors_config):
+                if key not in ("text_processor", "answer_processor", "image_processor"):
+                    del processors_config[key]
+        interface = QlarifaisInterface(model, interface_config, resources.root)
+
+        image = resources.images(1)[0]
+        question = resources.questions(1)[0]
+        timings = {}
+        for name, method in [
+            ("MMGradient", multimodal_gradient),
+            ("MMGradCAM", multimodal_gradcam),
+        ]:
+            measure(
+                timings,
+                name,
+                lambda: timeit(lambda: method(interface, image, question, 1), repeats),
+            )
+        return timings
+
+    measure(results, "explainability", explainability)
+    results["memory"] = peak_memory_mb()
+    return results
+
+
+def run(kind, experiment, root, num_threads=None, **kwargs):
+    """Entry point of the benchmark processes, returns the results of
+    ``benchmark_<kind>`` with the synthetic resources in ``root``"""
+    from mmf.utils.env import setup_imports
+
+    if num_threads is not None:
+        torch.set_num_threads(num_threads)
+    setup_imports()
+    torch.manual_seed(0)
+    resources = SyntheticResources(root)
+    if kind == "model":
+        return benchmark_model(experiment, resources, **kwargs)
+    return benchmark_helpers(experiment, resources, **kwargs)
@@ -0,0 +1,147 @@
+"""
+Runs the benchmarks and writes their results as JSON:
+
+    python -m benchmarks.run --out results.json
+    python -m benchmarks.run --experiments baseline/ama.yaml --batch_sizes 1 8 \
+        --repeats 3 --out ama.json
+
+Every experiment config is benchmarked in a fresh process, so that the peak
+memory of one model does not carry over to the next and the configs do not
+share any state through the registry. Runs on CPU unless ``--cuda`` is set.
+"""
+
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import tempfile
+import time
+
+from benchmarks.qlarifais import PACKAGE_DIR, run
+from benchmarks.synthetic import SyntheticResources
+
+
+REPO_ROOT = os.path.dirname(PACKAGE_DIR)
+EXPERIMENTS_DIR = os.path.join(REPO_ROOT, "mmf", "mmf", "configs", "experiments")
+EXPERIMENT_GROUPS = ["baseline", "ablation1", "ablation2", "ablation3", "pilot"]
+
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description="Offline benchmarks of Qlarifais on synthetic data."
+    )
+    parser.add_argument(
+        "--experiments",
+        nargs="+",
+        help="experiment configs relative to configs/experiments, "
+        + "all of baseline, ablation1-3 and pilot if not given",
+        default=None,
+    )
+    parser.add_argument(
+        "--helpers_experiment",
+        help="experiment config whose model the helpers are benchmarked with",
+        default="baseline/ama.yaml",
+    )
+    parser.add_argument("--batch_sizes", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument(
+        "--repeats", type=int, help="timed calls per measurement", default=5
+    )
+    parser.add_argument(
+        "--num_threads",
+        type=int,
+        help="number of CPU threads used by torch",
+        default=None,
+    )
+    parser.add_argument("--cuda", action="store_true", help="allow running on cuda")
+    parser.add_argument(
+        "--root",
+        help="directory for the synthetic resources, temporary if not given",
+        default=None,
+    )
+    parser.add_argument("--out", required=True, help="json file for the results")
+    return parser.parse_args()
+
+
+def get_experiments():
+    experiments = []
+    for group in EXPERIMENT_GROUPS:
+        paths = sorted(glob.glob(os.path.join(EXPERIMENTS_DIR, group, "*.yaml")))
+        experiments.extend(os.path.relpath(path, EXPERIMENTS_DIR) for path in paths)
+    return experiments
+
+
+def get_meta(args):
+    import torch
+
+    try:
+        commit = subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "torch": torch.__version__,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "num_threads": args.num_threads or torch.get_num_threads(),
+        "cuda": args.cuda and torch.cuda.is_available(),
+        "batch_sizes": args.batch_sizes,
+        "repeats": args.repeats,
+    }
+
+
+def run_in_process(*args, **kwargs):
+    # spawn, so that nothing is inherited from this or earlier benchmarks
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        try:
+            return pool.apply(run, args, kwargs)
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+
+
+def main():
+    args = get_args()
+    if not args.cuda:
+        # inherited by the benchmark processes
+        os.environ["CUDA_VISIBLE_DEVICES"] = ""
+
+    root = args.root or tempfile.mkdtemp(prefix="qlarifais_benchmark_")
+    # written once, the benchmark processes only read them
+    SyntheticResources(root)
+
+    results = {"meta": get_meta(args), "models": {}}
+    for experiment in args.experiments or get_experiments():
+        print(f"Benchmarking {experiment}")
+        results["models"][experiment] = run_in_process(
+            "model",
+            experiment,
+            root,
+            num_threads=args.num_threads,
+            batch_sizes=args.batch_sizes,
+            repeats=args.repeats,
+        )
+
+    print(f"Benchmarking helpers with {args.helpers_experiment}")
+    results["helpers"] = run_in_process(
+        "helpers",
+        args.helpers_experiment,
+        root,
+        num_threads=args.num_threads,
+        batch_size=max(args.batch_sizes),
+        repeats=args.repeats,
+    )
+
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=4)
+    print(f"Wrote results to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
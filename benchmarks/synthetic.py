@@ -0,0 +1,124 @@
+"""
+Synthetic stand-ins for everything Qlarifais would otherwise download or read
+from the OK-VQA data directory: a WordPiece tokenizer with the DistilBERT
+architecture config, an answer vocabulary, a Numberbatch file, and random
+images and questions.
+"""
+
+import json
+import os
+import string
+
+import numpy as np
+import torch
+from PIL import Image
+
+
+SPECIAL_TOKENS = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "?"]
+
+
+class SyntheticResources:
+    """Writes the synthetic files to ``root``.
+
+    Args:
+        root (str): directory of the files, shaped like a torch cache, i.e.
+            the dataset lives in ``root/torch/mmf/data/datasets``
+        num_words (int): words of the tokenizer vocabulary and Numberbatch
+        num_answers (int): answers of the answer vocabulary, 2250 as OK-VQA
+        numberbatch_dim (int): dimension of the Numberbatch embeddings
+        seed (int): seed of the words and embeddings
+    """
+
+    def __init__(
+        self,
+        root,
+        num_words=5000,
+        num_answers=2250,
+        numberbatch_dim=300,
+        seed=0,
+    ):
+        self.root = root
+        # files and data are drawn separately, so that the data is the same
+        # whether the files are written or were already there
+        self.files_random_state = np.random.RandomState(seed)
+        self.random_state = np.random.RandomState(seed + 1)
+        self.words = self._make_words(num_words)
+        self.answers = self.words[:num_answers]
+
+        self.data_dir = os.path.join(root, "torch", "mmf", "data")
+        self.tokenizer_dir = os.path.join(root, "tokenizer")
+        self.answer_vocab_file = os.path.join(self.data_dir, "answers.txt")
+        self.numberbatch_file = os.path.join(self.data_dir, "numberbatch.txt")
+        self.save_dir = os.path.join(root, "save")
+
+        if not os.path.exists(self.numberbatch_file):
+            os.makedirs(os.path.join(self.data_dir, "datasets"), exist_ok=True)
+            os.makedirs(self.save_dir, exist_ok=True)
+            self._write_tokenizer()
+            self._write_answer_vocab()
+            self._write_numberbatch(numberbatch_dim)
+
+    def _make_words(self, num_words):
+        words = set()
+        letters = list(string.ascii_lowercase)
+        while len(words) < num_words:
+            length = self.files_random_state.randint(3, 9)
+            words.add("".join(self.files_random_state.choice(letters, length)))
+        return sorted(words)
+
+    def _write_tokenizer(self):
+        from transformers import DistilBertConfig
+
+        os.makedirs(self.tokenizer_dir, exist_ok=True)
+        # architecture of distilbert-base-uncased, the encoder is randomly
+        # initialized from it
+        DistilBertConfig().to_json_file(os.path.join(self.tokenizer_dir, "config.json"))
+        with open(os.path.join(self.tokenizer_dir, "vocab.txt"), "w") as f:
+            f.write("\n".join(SPECIAL_TOKENS + self.words))
+        with open(os.path.join(self.tokenizer_dir, "tokenizer_config.json"), "w") as f:
+            json.dump({"do_lower_case": True}, f)
+
+    def _write_answer_vocab(self):
+        with open(self.answer_vocab_file, "w") as f:
+            f.write("\n".join(["<unk>"] + self.answers))
+
+    def _write_numberbatch(self, dim):
+        vectors = self.files_random_state.randn(len(self.words), dim)
+        # written last, its existence marks complete resources
+        tmp_file = f"{self.numberbatch_file}.tmp"
+        with open(tmp_file, "w") as f:
+            f.write(f"{len(self.words)} {dim}\n")
+            for word, vector in zip(self.words, vectors):
+                f.write(word + " " + " ".join(f"{v:.4f}" for v in vector) + "\n")
+        os.rename(tmp_file, self.numberbatch_file)
+
+    def questions(self, num_questions, min_length=4, max_length=12):
+        lengths = self.random_state.randint(min_length, max_length + 1, num_questions)
+        return [
+            " ".join(self.random_state.choice(self.words, length)) + "?"
+            for length in lengths
+        ]
+
+    def answer_lists(self, num_questions, num_annotators=10):
+        # a few distinct answers per question, as annotators mostly agree
+        answer_lists = []
+        for _ in range(num_questions):
+            candidates = self.random_state.choice(self.answers, 3)
+            answer_lists.append(
+                [str(a) for a in self.random_state.choice(candidates, num_annotators)]
+            )
+        return answer_lists
+
+    def images(self, num_images, size=(480, 640)):
+        return [
+            Image.fromarray(
+                self.random_state.randint(0, 256, (*size, 3), dtype=np.uint8)
+            )
+            for _ in range(num_images)
+        ]
+
+    def image_tensor(self, batch_size, size=224):
+        # images as the okvqa image processor returns them, roughly normalized
+        return torch.from_numpy(
+            self.random_state.randn(batch_size, 3, size, size).astype(np.float32)
+        )
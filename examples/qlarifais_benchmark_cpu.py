@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compares the CPU inference profile of Qlarifais (int8 dynamic quantization,
+folded batch norms and channels-last backbone) against the fp32 baseline.
+
+Reports latency per batch, throughput, VQA accuracy and top-1 agreement
+between the two profiles on (a subset of) the OK-VQA val split.
+
+    python qlarifais_benchmark_cpu.py --model_dir /work3/s194253/save/models/optimized/baseline_ama \
+        --torch_cache /work3/s194253 --num_samples 500 --batch_size 8
+"""
+
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+import torch
+import torchvision.datasets.folder as tv_helpers
+
+from tqdm import tqdm
+from mmf.models import Qlarifais
+
+sys.path.append("..")
+from mmexp.utils.tools import paths_to_okvqa
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description='Benchmark the Qlarifais CPU inference profile.')
+    parser.add_argument(
+        "--model_dir",
+        required=True,
+        help="path to the directory with desired model name",
+    )
+    parser.add_argument(
+        "--torch_cache",
+        required=True,
+        help="path to your torch cache directory, where the dataset is stored",
+    )
+    parser.add_argument(
+        "--num_samples",
+        type=int,
+        help="number of val samples to evaluate on, all if not specified",
+        default=None,
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=8,
+    )
+    parser.add_argument(
+        "--num_threads",
+        type=int,
+        help="number of CPU threads used by torch",
+        default=None,
+    )
+    parser.add_argument(
+        "--save_path",
+        help="optional json file for the results",
+        default=None,
+    )
+    return parser.parse_args()
+
+
+def vqa_accuracy(prediction, answers):
+    return min(1.0, sum(prediction == answer for answer in answers) / 3)
+
+
+def run_profile(model, data, images_path, batch_size):
+    latencies, predictions = [], []
+    for start in tqdm(range(0, len(data), batch_size)):
+        batch = data.iloc[start:start + batch_size]
+        images = [tv_helpers.default_loader((images_path / name).as_posix() + '.jpg') for name in batch.image_name]
+
+        # time only the forward pass, not image loading
+        tic = time.perf_counter()
+        outputs = model.classify_batch(images, list(batch.question_str), top_k=1)
+        latencies.append(time.perf_counter() - tic)
+        predictions.extend([output["answers"][0] for output in outputs])
+
+    accuracy = np.mean([vqa_accuracy(pred, answers) for pred, answers in zip(predictions, data.answers)])
+    return {
+        "p50_batch_latency_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_batch_latency_ms": float(np.percentile(latencies, 99) * 1000),
+        "throughput_samples_per_s": float(len(data) / np.sum(latencies)),
+        "vqa_accuracy": float(accuracy),
+    }, predictions
+
+
+if __name__ == '__main__':
+
+    args = get_args()
+    if args.num_threads is not None:
+        torch.set_num_threads(args.num_threads)
+
+    # val split, stored as 'test' in the OK-VQA annotations
+    baseline = Qlarifais.from_pretrained(args.model_dir, args.torch_cache)
+    baseline.to(torch.device("cpu"))
+    baseline.eval()
+
+    data_path, images_path = paths_to_okvqa(baseline, run_type='test')
+    data = pd.DataFrame.from_records(np.load(data_path, allow_pickle=True)[1:])
+    if args.num_samples is not None:
+        data = data.iloc[:args.num_samples].reset_index(drop=True)
+
+    results = {}
+    results["fp32"], baseline_predictions = run_profile(baseline, data, images_path, args.batch_size)
+    del baseline
+
+    optimized = Qlarifais.from_pretrained(args.model_dir, args.torch_cache, cpu_inference=True)
+    optimized.eval()
+    results["cpu_int8"], optimized_predictions = run_profile(optimized, data, images_path, args.batch_size)
+
+    results["top1_agreement"] = float(np.mean([a == b for a, b in zip(baseline_predictions, optimized_predictions)]))
+    results["accuracy_drift"] = results["cpu_int8"]["vqa_accuracy"] - results["fp32"]["vqa_accuracy"]
+    results["speedup"] = results["cpu_int8"]["throughput_samples_per_s"] / results["fp32"]["throughput_samples_per_s"]
+
+    print(json.dumps(results, indent=4))
+    if args.save_path is not None:
+        with open(args.save_path, 'w') as f:
+            json.dump(results, f, indent=4)
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compares the throughput of Qlarifais on cpu in fp32 and with bfloat16 autocast,
+as used by `training.cpu_amp=True`. Evaluation times the full forward pass of
+the model and training times a forward and backward pass of the head (the
+encoders are frozen) with the loss computed in fp32.
+
+    python qlarifais_benchmark_cpu_amp.py --model_dir /work3/s194253/save/models/optimized/baseline_ama \
+        --torch_cache /work3/s194253 --image ../imgs/temp/rain/rain.jpg --batch_size 32
+"""
+
+import json
+import time
+import argparse
+
+import torch
+import torchvision.datasets.folder as tv_helpers
+
+from mmf.models import Qlarifais
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description='Benchmark bfloat16 autocast of Qlarifais on cpu.')
+    parser.add_argument(
+        "--model_dir",
+        required=True,
+        help="path to the directory with desired model name",
+    )
+    parser.add_argument(
+        "--torch_cache",
+        required=True,
+        help="path to your torch cache directory, where the dataset is stored",
+    )
+    parser.add_argument(
+        "--image",
+        required=True,
+        help="image used for all samples in the batch",
+    )
+    parser.add_argument(
+        "--question",
+        default="What is in the image?",
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=32,
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        help="number of timed batches per variant",
+        default=20,
+    )
+    return parser.parse_args()
+
+
+def throughput(step, batch_size, repeats):
+    # warm up
+    output = step()
+    tic = time.perf_counter()
+    for _ in range(repeats):
+        step()
+    return output, batch_size * repeats / (time.perf_counter() - tic)
+
+
+def benchmark(model, sample_list, features, targets, cpu_amp, args):
+    autocast = lambda: torch.autocast(device_type="cpu", dtype=torch.bfloat16, enabled=cpu_amp)
+
+    @torch.no_grad()
+    def evaluation_step():
+        with autocast():
+            return model(sample_list)["scores"].float()
+
+    def training_step():
+        with autocast():
+            scores = model.forward_head(features)["scores"]
+        loss = torch.nn.functional.binary_cross_entropy_with_logits(scores.float(), targets)
+        loss.backward()
+        model.zero_grad(set_to_none=True)
+        return loss
+
+    model.eval()
+    scores, evaluation = throughput(evaluation_step, args.batch_size, args.repeats)
+    model.train()
+    _, training = throughput(training_step, args.batch_size, args.repeats)
+    model.eval()
+    return scores, {"evaluation_samples_per_s": evaluation, "training_samples_per_s": training}
+
+
+if __name__ == '__main__':
+
+    args = get_args()
+
+    model = Qlarifais.from_pretrained(args.model_dir, args.torch_cache)
+    model.to(torch.device("cpu"))
+    model.eval()
+
+    image = tv_helpers.default_loader(args.image)
+    sample_list = model.build_sample_list([image] * args.batch_size, [args.question] * args.batch_size)
+    with torch.no_grad():
+        features = model.model.extract_features(sample_list)
+    num_answers = model.model.forward_head(features)["scores"].size(-1)
+    targets = torch.rand(args.batch_size, num_answers)
+
+    results = {}
+    expected, results["fp32"] = benchmark(model.model, sample_list, features, targets, False, args)
+    output, results["bf16"] = benchmark(model.model, sample_list, features, targets, True, args)
+
+    for key in results["fp32"]:
+        results[f"{key}_speedup"] = results["bf16"][key] / results["fp32"][key]
+    results["top1_agreement"] = (expected.argmax(-1) == output.argmax(-1)).float().mean().item()
+    print(json.dumps(results, indent=4))
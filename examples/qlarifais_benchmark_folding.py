@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compares the latency of the Qlarifais head (attention, fusion and classifier)
+before and after `fold_for_inference`, which folds the weight norms into plain
+weights and drops the dropouts. The frozen encoders are run only once, so the
+timings isolate the part of the model that is affected by the folding.
+
+    python qlarifais_benchmark_folding.py --model_dir /work3/s194253/save/models/optimized/baseline_ama \
+        --torch_cache /work3/s194253 --image ../imgs/temp/rain/rain.jpg --batch_size 32
+"""
+
+import copy
+import json
+import time
+import argparse
+
+import numpy as np
+import torch
+import torchvision.datasets.folder as tv_helpers
+
+from mmf.models import Qlarifais
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description='Benchmark folding of the Qlarifais head.')
+    parser.add_argument(
+        "--model_dir",
+        required=True,
+        help="path to the directory with desired model name",
+    )
+    parser.add_argument(
+        "--torch_cache",
+        required=True,
+        help="path to your torch cache directory, where the dataset is stored",
+    )
+    parser.add_argument(
+        "--image",
+        required=True,
+        help="image used for all samples in the batch",
+    )
+    parser.add_argument(
+        "--question",
+        default="What is in the image?",
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=32,
+    )
+    parser.add_argument(
+        "--repeats",
+        type=int,
+        help="number of timed forward passes per variant",
+        default=100,
+    )
+    return parser.parse_args()
+
+
+@torch.no_grad()
+def time_head(model, features, repeats):
+    # warm up
+    output = model.forward_head(features)
+    latencies = []
+    for _ in range(repeats):
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+        tic = time.perf_counter()
+        model.forward_head(features)
+        if torch.cuda.is_available():
+            torch.cuda.synchronize()
+        latencies.append(time.perf_counter() - tic)
+    return output, {
+        "p50_latency_ms": float(np.percentile(latencies, 50) * 1000),
+        "p99_latency_ms": float(np.percentile(latencies, 99) * 1000),
+    }
+
+
+if __name__ == '__main__':
+
+    args = get_args()
+
+    model = Qlarifais.from_pretrained(args.model_dir, args.torch_cache)
+    model.to(torch.device("cuda:0" if torch.cuda.is_available() else "cpu"))
+    model.eval()
+
+    image = tv_helpers.default_loader(args.image)
+    sample_list = model.build_sample_list([image] * args.batch_size, [args.question] * args.batch_size)
+    with torch.no_grad():
+        features = model.model.extract_features(sample_list)
+
+    results = {}
+    expected, results["weight_norm"] = time_head(model.model, features, args.repeats)
+
+    # only the head is folded, the copy shares the frozen encoders with the
+    # original instead of copying them (numberbatch alone takes gigabytes)
+    shared = [model.model.vision_module, model.model.language_module, model.model.graph_encoder]
+    folded = copy.deepcopy(model.model, memo={id(module): module for module in shared})
+    folded.fold_for_inference()
+    output, results["folded"] = time_head(folded, features, args.repeats)
+
+    results["speedup"] = results["weight_norm"]["p50_latency_ms"] / results["folded"]["p50_latency_ms"]
+    results["max_abs_difference"] = (expected["scores"] - output["scores"]).abs().max().item()
+    print(json.dumps(results, indent=4))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exports a trained Qlarifais model to a TorchScript file with a tensor-only
+signature, which can be run without MMF or OmegaConf:
+
+    python qlarifais_export.py --model_dir /work3/s194253/save/models/optimized/baseline_ama \
+        --torch_cache /work3/s194253 --save_path qlarifais.pt --image ../imgs/temp/rain/rain.jpg
+
+    # lean runtime
+    extra_files = {"answers.txt": "", "output_type": ""}
+    module = torch.jit.load("qlarifais.pt", _extra_files=extra_files)
+    answers = extra_files["answers.txt"].decode("utf-8").split("\\n")
+    scores, prediction_scores = module(image, input_ids, graph_embedding)
+"""
+
+import argparse
+
+import torch
+import torchvision.datasets.folder as tv_helpers
+
+from mmf.models import Qlarifais
+from mmf.models.qlarifais import QlarifaisInference
+
+
+def get_args():
+    parser = argparse.ArgumentParser(description='Export Qlarifais to TorchScript.')
+    parser.add_argument(
+        "--model_dir",
+        required=True,
+        help="path to the directory with desired model name",
+    )
+    parser.add_argument(
+        "--torch_cache",
+        required=True,
+        help="path to your torch cache directory, where the dataset is stored",
+    )
+    parser.add_argument(
+        "--save_path",
+        required=True,
+        help="where to store the exported module",
+    )
+    parser.add_argument(
+        "--image",
+        required=True,
+        help="example image used for tracing",
+    )
+    parser.add_argument(
+        "--question",
+        help="example question used for tracing",
+        default="What is in the image?",
+    )
+    parser.add_argument(
+        "--cpu_inference",
+        help="apply the CPU inference profile (int8 quantization) before exporting",
+        action="store_true",
+    )
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+
+    args = get_args()
+
+    model = Qlarifais.from_pretrained(args.model_dir, args.torch_cache, cpu_inference=args.cpu_inference)
+    if not args.cpu_inference:
+        model.to(torch.device("cuda:0" if torch.cuda.is_available() else "cpu"))
+    model.eval()
+
+    image = tv_helpers.default_loader(args.image)
+    sample_list = model.build_sample_list([image], [args.question])
+
+    traced = model.model.export_torchscript(sample_list, args.save_path)
+
+    # sanity check against the eager model
+    with torch.no_grad():
+        expected = model.model(sample_list)["prediction_scores"]
+        _, prediction_scores = traced(*QlarifaisInference(model.model).example_inputs(sample_list))
+    max_diff = (expected - prediction_scores).abs().max().item()
+    print(f"Exported Qlarifais to {args.save_path} (max abs. difference to eager model: {max_diff:.2e})")
@@ -21,6 +21,7 @@ from mmf.models import Qlarifais
 sys.path.append("..")
 from mmexp.analyzer import *
 from mmexp.utils.tools import paths_to_okvqa, str_to_class, fetch_test_embeddings
+from mmexp.utils.sharding import fetch_test_outputs_sharded
 from mmexp.utils.visualize import plot_stratified_results
 
 import argparse
@@ -80,6 +81,19 @@ def get_args():
             Requires stratification flag.",
         default='True',
     ) 
+    parser.add_argument(
+        "--num_workers",
+        type=int,
+        help="number of processes, each with its own model, that compute the test \
+            predictions and embeddings if they are not in report_dir yet.",
+        default=1,
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        help="batch size of the workers, when num_workers > 1",
+        default=32,
+    )
         
     return parser.parse_args()
 
@@ -129,7 +143,10 @@ if __name__ == '__main__':
         # load data-investigation pickles (json)
         data = pd.read_json(args.okvqa_file)
     
-    # Get predictions
+    # Get predictions, computed by sharded workers if requested
+    if args.num_workers > 1:
+        fetch_test_outputs_sharded(model, args.model_dir, args.torch_cache, args.report_dir,
+                                   args.num_workers, batch_size=args.batch_size)
     data = prediction_dataframe(model=model, data=data, report_dir=args.report_dir)
     embeddings = fetch_test_embeddings(model, args.report_dir)
 
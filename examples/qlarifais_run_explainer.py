@@ -9,17 +9,15 @@ Created on Tue May 24 20:16:46 2022
 import sys, os
 from pathlib import Path
 
-import numpy as np
-import glob
-
 import torch
-import cv2
 
 from mmf.models import Qlarifais
 
 sys.path.append("..")
 from mmexp.utils.tools import str_to_class, get_input, load_image
 from mmexp.utils.argument_wrapper import run_explainability, run_method
+from mmexp.utils.render import combine_images, write_image
+from mmexp.methods import QuestionPerturbationEngine
 
 import argparse
 import logging
@@ -74,6 +72,16 @@ def get_args():
         help="whether to save a combined image of the explainability methods",
         default='True',
     )    
+    parser.add_argument(
+        "--word_importance",
+        help="whether to also log the importance of each word of the question (LIME-style)",
+        default='False',
+    )
+    parser.add_argument(
+        "--publication_figures",
+        help="whether to also save matplotlib figures with titles (as pdf), slow",
+        default='False',
+    )
     return parser.parse_args()
 
 
@@ -95,6 +103,14 @@ def init_logger(args):
                 
     return logger
 
+def log_word_importance(engine, image, question, category_id, logger):
+    # all masked questions are batched through the head, the image is encoded once
+    importance, _ = engine.word_importance(image, question, target=category_id)
+    importance_str = '\nWord importance:\n'
+    for word, weight in zip(question.split(), importance):
+        importance_str += f"{word}: {weight:.4f}\n"
+    logger.info(importance_str)
+
 if __name__ == '__main__':
     
     # --model_dir /work3/s194262/save/models/optimized/baseline_ama --torch_cache /work3/s194253 --report_dir /work3/s194253/results/baseline_ama/reports --save_path /work3/s194253/results/baseline_ama --protocol_dir /work3/s194262/protocol --analysis_type OR VisualNoise TextualNoise --explainability_methods MMGradient --protocol_name pilotQ.txt --show_all True 
@@ -102,6 +118,8 @@ if __name__ == '__main__':
     # Get input
     args = get_args()
     args.show_all = args.show_all == 'True'
+    args.publication_figures = args.publication_figures == 'True'
+    args.word_importance = args.word_importance == 'True'
     args.analysis_type.insert(0, 'Normal')
     
     protocol_dict = get_input(args.protocol_dir, args.protocol_name)
@@ -110,6 +128,7 @@ if __name__ == '__main__':
     model = Qlarifais.from_pretrained(args.model_dir, args.torch_cache)
     model.to(torch.device("cuda:0" if torch.cuda.is_available() else "cpu"))
     model_name = args.model_dir.split("/")[-1]
+    engine = QuestionPerturbationEngine(model) if args.word_importance else None
     
     # Initialize logger
     logger = init_logger(args)
@@ -144,6 +163,9 @@ if __name__ == '__main__':
                 
                 logger.info(f'\n\n\n\nPREDICTIONS: \n\nQuestion: "{question}"\nImage: {image_name}\nAnswer: {answer}\n')
                 
+                # Rendered examples by analysis number
+                panels = {}
+
                 # Choose analysis types
                 for analysis_type in args.analysis_type:
                     if analysis_type == 'Normal':
@@ -163,13 +185,16 @@ if __name__ == '__main__':
 
                         # Run xplainability
                         save_name = Path(args.save_path) / f"explainability/{explainability_method}/{image_name.split('.')[0]}/{question.strip('?').replace(' ', '_').lower()}/{analysis_num}_{analysis_type.lower()}"
-                        run_method(model, model_name, 
+                        panels[analysis_num] = run_method(model, model_name, 
                                    mod_image, image_name, 
                                    mod_question, category_id, 
                                    explainability_method,
                                    save_path=save_name.as_posix(),
                                    analysis_type=analysis_type,
+                                   publication=args.publication_figures,
                                    )
+                        if engine is not None:
+                            log_word_importance(engine, mod_image, mod_question, category_id, logger)
                         
                     elif analysis_type == 'OR' and remove_object != None:
                         # Remove object                        
@@ -204,13 +229,16 @@ if __name__ == '__main__':
                         
                         # Run xplainability
                         save_name = Path(args.save_path) / f"explainability/{explainability_method}/{image_name.split('.')[0]}/{question.strip('?').replace(' ', '_').lower()}/{analysis_num}_{analysis_type.lower()}"
-                        run_method(model, model_name, 
+                        panels[analysis_num] = run_method(model, model_name, 
                                    mod_image, image_name, 
                                    mod_question, category_id, 
                                    explainability_method,
                                    save_path=save_name.as_posix(),
                                    analysis_type=analysis_type,
+                                   publication=args.publication_figures,
                                    )
+                        if engine is not None:
+                            log_word_importance(engine, mod_image, mod_question, category_id, logger)
 
                     elif analysis_type == 'VisualNoise':
                                    
@@ -231,13 +259,16 @@ if __name__ == '__main__':
 
                         # Run xplainability
                         save_name = Path(args.save_path) / f"explainability/{explainability_method}/{image_name.split('.')[0]}/{question.strip('?').replace(' ', '_').lower()}/{analysis_num}_{analysis_type.lower()}"
-                        run_method(model, model_name, 
+                        panels[analysis_num] = run_method(model, model_name, 
                                    mod_image, image_name, 
                                    mod_question, category_id, 
                                    explainability_method,
                                    save_path=save_name.as_posix(),
                                    analysis_type=analysis_type,
+                                   publication=args.publication_figures,
                                    )
+                        if engine is not None:
+                            log_word_importance(engine, mod_image, mod_question, category_id, logger)
                         
                     elif analysis_type == 'TextualNoise':
                         
@@ -258,41 +289,26 @@ if __name__ == '__main__':
 
                         # Run xplainability
                         save_name = Path(args.save_path) / f"explainability/{explainability_method}/{image_name.split('.')[0]}/{question.strip('?').replace(' ', '_').lower()}/{analysis_num}_{analysis_type.lower()}"
-                        run_method(model, model_name, 
+                        panels[analysis_num] = run_method(model, model_name, 
                                    mod_image, image_name, 
                                    mod_question, category_id, 
                                    explainability_method,
                                    save_path=save_name.as_posix(),
                                    analysis_type=analysis_type,
+                                   publication=args.publication_figures,
                                    )
+                        if engine is not None:
+                            log_word_importance(engine, mod_image, mod_question, category_id, logger)
                         
                     else:
                         if remove_object != None:
                             logger.warning(f"Analysis type - {analysis_type} - is not implemented...")
                             raise NotImplementedError(f"Analysis type - {analysis_type} - is not implemented...")
                     
-                if args.show_all == True:
+                if args.show_all == True and panels:
                     
-                    where = Path(args.save_path) / f"explainability/{explainability_method}/{image_name.split('.')[0]}/{question.strip('?').replace(' ', '_').lower()}/*"
-                    explainer_img = None
-                    filenames_imgs = glob.glob(where.as_posix())
-                    for i, file in enumerate(sorted(filenames_imgs)):
-                        if file.split("/")[-1] != 'combined.png':
-                            read_img = cv2.imread(file) #orig
-                            
-                            try:
-                                if explainer_img == None:
-                                    explainer_img = read_img
-                            except ValueError:
-                                explainer_img = np.concatenate((explainer_img, read_img), axis=0)
-
+                    where = Path(args.save_path) / f"explainability/{explainability_method}/{image_name.split('.')[0]}/{question.strip('?').replace(' ', '_').lower()}"
+                    explainer_img = combine_images([panels[num] for num in sorted(panels)])
 
                     # SAVE
-                    combined_filename = ("/").join(where.as_posix().split("/")[:-1]) + '/combined.png'
-                    cv2.imwrite(combined_filename, explainer_img)
-            
-        
-        
-                    
-        
-        
\ No newline at end of file
+                    write_image((where / 'combined.png').as_posix(), explainer_img)
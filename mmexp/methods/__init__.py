@@ -12,12 +12,14 @@ from .torchray.multimodal_gradient import multimodal_gradient as MMGradient
 from .torchray.multimodal_gradcam import multimodal_gradcam as MMGradCAM
 from .qlarifais.random_noise import random_image as VisualNoise
 from .qlarifais.random_noise import random_question as TextualNoise
+from .qlarifais.question_perturbation import QuestionPerturbationEngine
 from .qlarifais.attention_map import attention_map
 
 __all__ = [
     "OR",
     "VisualNoise",
     "TextualNoise",
+    "QuestionPerturbationEngine",
     "MMEP",
     "MMGradient",
     "MMGradCAM",   
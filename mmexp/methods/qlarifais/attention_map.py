@@ -6,48 +6,40 @@ Created on Mon Jun  6 16:35:53 2022
 @author: s194253
 """
 
-import numpy as np
-from PIL import Image
-import skimage
-import matplotlib.pyplot as plt
-
-def attention_map(image, attention, opacity=False):
-    
-    
-    att = attention.detach().numpy()
-    grid_shape = (7,7)
-    im = np.transpose(image.squeeze(0).detach().numpy(), axes=[1,2,0])
-    
-    softmax = np.reshape(att, grid_shape)
-    att_map = skimage.transform.resize(softmax, im.shape[:2], order=3)
-    
-    if opacity == True:
-        att_map = att_map[..., np.newaxis]
-        att_map = att_map*0.95+0.05
-    else:
-        att_map = skimage.filters.gaussian(att_map, 0.02*max(im.shape[:2]))
-        att_map -= att_map.min()
-        att_map /= att_map.max()
-        
-        # color attention map
-        cmap = plt.get_cmap('jet')
-        att_map = cmap(att_map)
-        att_map = np.delete(att_map, 3, 2)
-        
-    # convert to bgr
-    im = im[:, :, [2, 1, 0]]
-    orig_im = (im - im.min()) / (im.max() - im.min())
-    
-    # plot figure
-    fig, ax = plt.subplots(1, 2, dpi=400)
-    ax[0].imshow(orig_im)
-    ax[0].axis('off')
-    ax[0].set_title('Original')
-    #ax[1].imshow(im / 255)
-    #ax[1].axis('off')
-    #ax[1].set_title('Model input')
-    ax[1].imshow(np.clip(im, 0, 255) / 255)
-    ax[1].imshow(att_map, alpha=0.5)
-    ax[1].axis('off')
-    ax[1].set_title('Attention map')
-    plt.show()
\ No newline at end of file
+from mmexp.utils.render import panel, render_overlays, write_image
+
+
+def attention_map(image, attention, opacity=False, grid_shape=(7, 7), save_path=None,
+                  show=False):
+    """Overlays of the attention over the image regions.
+
+    Args:
+        image (torch.Tensor): [batch_size, 3, H, W] BGR model input.
+        attention (torch.Tensor): [batch_size, num_regions] or
+            [batch_size, num_regions, 1] attention weights.
+        opacity (bool): darken the unattended regions instead of coloring
+            the attention.
+        save_path (str, optional): where to write the images next to their
+            overlays.
+        show (bool): show the images and overlays with matplotlib.
+
+    Returns:
+        torch.Tensor: uint8 [batch_size, 3, H, W] RGB overlays.
+    """
+    # convert to rgb
+    image = image.detach()[:, [2, 1, 0]]
+    attention = attention.detach().reshape(len(image), -1)
+
+    sigma = 0 if opacity else 0.02 * max(image.shape[-2:])
+    overlays = render_overlays(image, attention, sigma=sigma, grid_shape=grid_shape,
+                               opacity=opacity)
+    if save_path:
+        write_image(save_path, panel(image, overlays))
+
+    if show:
+        import matplotlib.pyplot as plt
+
+        plt.imshow(panel(image, overlays).permute(1, 2, 0).numpy())
+        plt.axis('off')
+        plt.show()
+    return overlays
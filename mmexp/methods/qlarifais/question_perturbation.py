@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batched question perturbation and word importance for Qlarifais.
+
+All masked / noised variants of a question are generated at once and run
+through the text encoder and the Qlarifais head in large batches, while the
+image features are computed only once (and cached by the interface, see
+`QlarifaisInterface.encode_images`) and reused for every variant. The
+LIME-style word importance regression is solved in closed form.
+
+    engine = QuestionPerturbationEngine(model)
+    importance = engine.word_importance(image, "What is the man holding?")
+"""
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from .word_sampler import get_word_sampler
+
+MASK_TOKEN = "NOWORD"
+
+
+class QuestionPerturbationEngine:
+
+    def __init__(self, model, batch_size=256, random_state=None):
+        """
+        model : QlarifaisInterface, e.g. from `Qlarifais.from_pretrained`
+        batch_size : number of question variants per forward pass
+        """
+        self.interface = model
+        self.model = model.model
+        self.batch_size = batch_size
+        self.random_state = np.random.RandomState(random_state)
+        self.device = next(self.model.parameters()).device
+
+    def encode_image(self, image):
+        """Image features (and the mask of region features) for a single image"""
+        return self.interface.encode_images([image])
+
+    def perturbation_masks(self, num_words, num_samples):
+        """Binary matrix of kept (1) and removed (0) words. The first row is the
+        original question, every other row removes between 1 and all words."""
+        num_samples = min(2 ** num_words, num_samples)
+        sizes = self.random_state.randint(1, num_words + 1, num_samples - 1)
+        # a random permutation per row, the `size` first positions are removed
+        ranks = self.random_state.random_sample((num_samples - 1, num_words)).argsort(1).argsort(1)
+
+        masks = np.ones((num_samples, num_words))
+        masks[1:][ranks < sizes[:, None]] = 0
+        return masks
+
+    def perturb(self, question, masks, noise=False):
+        """Builds the question variants from `masks`. Removed words are replaced
+        by `MASK_TOKEN`, or by words from the word sampler if `noise` is set."""
+        words = np.array(question.split())
+        variants = np.tile(words, (len(masks), 1)).astype(object)
+        removed = masks == 0
+        if noise:
+            variants[removed] = get_word_sampler().sample(removed.sum(), self.random_state)
+        else:
+            variants[removed] = MASK_TOKEN
+        return [" ".join(variant) for variant in variants]
+
+    @torch.no_grad()
+    def predict(self, questions, image_features):
+        """Softmax scores over the answer vocabulary for every question, all
+        paired with the same (cached) image features."""
+        text_processor = self.interface.processor_dict["text_processor"]
+        use_graph = self.model.config.graph_encoder.use
+
+        scores = []
+        for start in range(0, len(questions), self.batch_size):
+            processed = [text_processor({"text": question}) for question in questions[start:start + self.batch_size]]
+            input_ids = torch.stack([text["input_ids"] for text in processed]).to(self.device)
+
+            features = {"question": self.model.encode_question(input_ids)}
+            for key, value in image_features.items():
+                features[key] = value.expand(len(processed), *value.shape[1:])
+            if use_graph:
+                features["graph"] = self.model.graph_encoder([text["tokens"] for text in processed])
+
+            output = self.model.forward_head(features)
+            scores.append(F.softmax(output["prediction_scores"], dim=1))
+        return torch.cat(scores)
+
+    def word_importance(self, image, question, target=None, num_samples=800, noise=False, kernel_width=25, alpha=1.0):
+        """
+        Weights of a weighted ridge regression from kept words to the score of
+        `target` (defaults to the predicted answer of the original question).
+
+        returns :
+            importance : one weight per word in the question
+            target : index of the explained answer
+        """
+        image_features = self.encode_image(image)
+        masks = self.perturbation_masks(len(question.split()), num_samples)
+        scores = self.predict(self.perturb(question, masks, noise=noise), image_features)
+
+        if target is None:
+            target = scores[0].argmax().item()
+        labels = scores[:, target].cpu().numpy()
+
+        # cosine distance to the original question (the all ones row), in percent
+        distances = (1 - masks.sum(1) / np.sqrt(masks.sum(1) * masks.shape[1] + 1e-12)) * 100
+        weights = np.sqrt(np.exp(-(distances ** 2) / kernel_width ** 2))
+
+        return ridge_regression(masks, labels, weights, alpha), target
+
+
+def ridge_regression(X, y, sample_weight, alpha=1.0):
+    """Closed form of `Ridge(alpha, fit_intercept=True).fit(X, y, sample_weight).coef_`"""
+    X_offset = np.average(X, axis=0, weights=sample_weight)
+    y_offset = np.average(y, weights=sample_weight)
+    X_centered = (X - X_offset) * np.sqrt(sample_weight)[:, None]
+    y_centered = (y - y_offset) * np.sqrt(sample_weight)
+
+    gram = X_centered.T @ X_centered + alpha * np.eye(X.shape[1])
+    return np.linalg.solve(gram, X_centered.T @ y_centered)
@@ -9,9 +9,7 @@ Created on Thu May 19 17:03:04 2022
 from PIL import Image
 import numpy as np
 
-import nltk
-nltk.download('brown')
-from nltk.corpus import brown
+from .word_sampler import get_word_sampler
 
 
 def random_image(input_image):
@@ -30,5 +28,5 @@ def random_image(input_image):
     return PIL_image
 
 def random_question(orig_question, model):
-    random_words = np.random.choice(brown.words(), len(orig_question.split(" ")))
+    random_words = get_word_sampler().sample(len(orig_question.split(" ")))
     return (" ").join(random_words)
\ No newline at end of file
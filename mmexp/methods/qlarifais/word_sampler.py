@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Frequency-weighted word sampler used for textual noise.
+
+The words and their frequencies are precomputed from the Brown corpus once and
+stored as a NumPy artifact, so sampling needs neither NLTK nor network access.
+The default artifact is built on first use (with NLTK and network access), or
+ahead of time by:
+
+    python -m mmexp.methods.qlarifais.word_sampler
+
+Sampling from the artifact has the same distribution as sampling uniformly
+from `brown.words()`.
+"""
+
+import argparse
+import os
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+DEFAULT_PATH = Path(__file__).parent / 'brown_words.npz'
+
+
+def build_word_sampler(save_path=DEFAULT_PATH):
+    # only needed for building the artifact
+    import nltk
+    nltk.download('brown')
+    from nltk.corpus import brown
+
+    counts = Counter(brown.words())
+    words = np.array(list(counts.keys()))
+    frequencies = np.array(list(counts.values()), dtype=np.float64)
+
+    # write to a temporary file first, so that an existing artifact is always complete
+    save_path = Path(save_path)
+    tmp_path = save_path.with_suffix(f'.{os.getpid()}.tmp.npz')
+    np.savez_compressed(tmp_path, words=words, probabilities=frequencies / frequencies.sum())
+    os.replace(tmp_path, save_path)
+    return WordSampler(save_path)
+
+
+class WordSampler:
+
+    def __init__(self, path=DEFAULT_PATH):
+        artifact = np.load(path)
+        self.words = artifact['words']
+        self.cumulative = np.cumsum(artifact['probabilities'])
+        self.cumulative /= self.cumulative[-1]
+
+    def sample(self, size, random_state=None):
+        """Samples `size` (int or shape) words, with replacement."""
+        random_state = np.random if random_state is None else random_state
+        indices = np.searchsorted(self.cumulative, random_state.random_sample(size), side='right')
+        return self.words[np.minimum(indices, len(self.words) - 1)]
+
+
+_word_sampler = None
+
+
+def get_word_sampler():
+    """Loads the default artifact once, and builds it first if it does not exist."""
+    global _word_sampler
+    if _word_sampler is None:
+        if not DEFAULT_PATH.exists():
+            try:
+                build_word_sampler(DEFAULT_PATH)
+            except (ImportError, LookupError, OSError) as e:
+                raise FileNotFoundError(
+                    f"The word sampler artifact {DEFAULT_PATH} does not exist and could not "
+                    f"be built ({e}). Build it with `python -m mmexp.methods.qlarifais.word_sampler` "
+                    "(needs NLTK and network access) or copy it there from a machine that has it"
+                ) from e
+        _word_sampler = WordSampler(DEFAULT_PATH)
+    return _word_sampler
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the word sampler artifact from the Brown corpus.')
+    parser.add_argument(
+        "--save_path",
+        help="where to store the artifact",
+        default=DEFAULT_PATH.as_posix(),
+    )
+    args = parser.parse_args()
+    build_word_sampler(args.save_path)
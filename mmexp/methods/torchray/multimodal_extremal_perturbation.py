@@ -40,6 +40,8 @@ from torchray.attribution.extremal_perturbation import (
     contrastive_reward,
 )
 
+from ..qlarifais.question_perturbation import QuestionPerturbationEngine, ridge_regression
+
 
 
 BLUR_PERTURBATION = "blur"
@@ -414,6 +416,14 @@ def text_explainer(string, img_tensor, classifier_fn):
     doc_size = len(indexed)
     num_samples = min(2 ** doc_size, 800)
 
+    if hasattr(classifier_fn, "encode_images"):
+        # Qlarifais, the masked texts are run through the head in batches and
+        # the image is only encoded once
+        engine = QuestionPerturbationEngine(classifier_fn)
+        text_array = engine.perturbation_masks(doc_size, num_samples)
+        labels = engine.predict(engine.perturb(string, text_array), engine.encode_image(img_tensor))
+        return text_array, labels.cpu().numpy(), distance_fn(sp.sparse.csr_matrix(text_array))
+
     random_state = check_random_state(None)
     sample = random_state.randint(1, doc_size + 1, num_samples - 1)
 
@@ -465,25 +475,26 @@ def text_rebuilder(input_text, weight_factor):
     return Not_hateful, Hateful
 
 
-def explain_text(input_text, X, model):
+def explain_text(input_text, X, model, target=None):
     """
     args :
         input_text : original text
-        X : image tensor (3,224,244)
+        X : image tensor (3,224,244), or the image for Qlarifais
         model : classification model that is going to be explained
+        target : explained class, defaults to the predicted answer for
+                Qlarifais and to the first class otherwise
 
     returns :
         Results : weights of the linear model to represent to influence of
                 each words to the decision making
     """
     vectorized_text, labels, distances = text_explainer(input_text, X, model)
+    if target is None:
+        target = labels[0].argmax() if hasattr(model, "encode_images") else 0
 
     weights = np.sqrt(np.exp(-(distances ** 2) / 25 ** 2))
 
-    linear_model = Ridge(alpha=1, fit_intercept=True)
-    linear_model.fit(vectorized_text, labels, sample_weight=weights)
-
-    Result = linear_model.coef_[0]
+    Result = ridge_regression(vectorized_text, labels[:, target], weights, alpha=1)
     return Result
 
 
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import torch
+from torch import nn
+
+from mmexp.methods.qlarifais import question_perturbation, word_sampler
+from mmexp.methods.qlarifais.question_perturbation import (
+    MASK_TOKEN,
+    QuestionPerturbationEngine,
+    ridge_regression,
+)
+
+WORDS = ["<pad>", MASK_TOKEN, "what", "is", "the", "man", "holding", "cat", "dog"]
+
+
+class TinyQlarifais(nn.Module):
+    # the parts of Qlarifais that the engine uses
+    config = SimpleNamespace(graph_encoder=SimpleNamespace(use=False))
+
+    def __init__(self, num_answers=5):
+        super().__init__()
+        self.embedding = nn.Embedding(len(WORDS), 4)
+        self.vision = nn.Linear(3, 4)
+        self.head = nn.Linear(4, num_answers)
+
+    def vision_module(self, image):
+        return self.vision(image).unsqueeze(1)
+
+    def encode_question(self, input_ids):
+        return self.embedding(input_ids).mean(1)
+
+    def forward_head(self, features):
+        fused = features["question"] * features["image"].mean(1)
+        return {"prediction_scores": self.head(fused)}
+
+
+def text_processor(item, max_length=8):
+    ids = [WORDS.index(word) if word in WORDS else 0 for word in item["text"].split()]
+    ids = ids + [0] * (max_length - len(ids))
+    return {"input_ids": torch.tensor(ids)}
+
+
+class TestQuestionPerturbation(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(1234)
+        model = TinyQlarifais()
+        image_processor = lambda image: torch.as_tensor(image, dtype=torch.float)
+        self.interface = SimpleNamespace(
+            model=model,
+            processor_dict={"image_processor": image_processor, "text_processor": text_processor},
+            encode_images=lambda images: {
+                "image": model.vision_module(torch.stack([image_processor(image) for image in images]))
+            },
+        )
+        self.image = [0.1, 0.5, 0.9]
+        self.question = "what is the man holding"
+
+    def test_perturbation_masks(self):
+        engine = QuestionPerturbationEngine(self.interface, random_state=0)
+        masks = engine.perturbation_masks(4, 10)
+        self.assertEqual(masks.shape, (10, 4))
+        self.assertTrue(np.all(masks[0] == 1))
+        # every variant removes at least one word
+        self.assertTrue(np.all(masks[1:].min(1) == 0))
+        # no more variants than subsets of the words
+        self.assertEqual(len(engine.perturbation_masks(3, 800)), 8)
+
+    def test_perturb(self):
+        engine = QuestionPerturbationEngine(self.interface, random_state=0)
+        masks = np.array([[1, 1, 1], [0, 1, 0]])
+        self.assertEqual(
+            engine.perturb("what is this", masks),
+            ["what is this", f"{MASK_TOKEN} is {MASK_TOKEN}"],
+        )
+
+        sampler = SimpleNamespace(sample=lambda size, random_state: np.array(["cat"] * size))
+        with mock.patch.object(question_perturbation, "get_word_sampler", return_value=sampler):
+            self.assertEqual(engine.perturb("what is this", masks, noise=True)[1], "cat is cat")
+
+    def test_predict_batches(self):
+        questions = [self.question, "what is the cat holding", "dog"]
+        engine = QuestionPerturbationEngine(self.interface, batch_size=2)
+        image_features = engine.encode_image(self.image)
+        scores = engine.predict(questions, image_features)
+        self.assertEqual(scores.shape, (3, 5))
+        self.assertTrue(torch.allclose(scores.sum(1), torch.ones(3)))
+
+        single_batch = QuestionPerturbationEngine(self.interface, batch_size=256)
+        self.assertTrue(torch.allclose(scores, single_batch.predict(questions, image_features)))
+
+    def test_word_importance(self):
+        engine = QuestionPerturbationEngine(self.interface, random_state=0)
+        importance, target = engine.word_importance(self.image, self.question, num_samples=20)
+        self.assertEqual(importance.shape, (5,))
+        self.assertTrue(np.all(np.isfinite(importance)))
+
+        scores = engine.predict([self.question], engine.encode_image(self.image))
+        self.assertEqual(target, scores[0].argmax().item())
+
+    def test_ridge_regression(self):
+        random_state = np.random.RandomState(0)
+        X = random_state.randint(0, 2, (50, 4)).astype(np.float64)
+        y = X @ np.array([0.5, -1.0, 0.0, 2.0]) + 0.3 + random_state.normal(0, 0.01, 50)
+        weights = random_state.uniform(0.1, 1.0, 50)
+        alpha = 0.5
+
+        # weighted least squares with an unpenalized intercept
+        X_intercept = np.hstack([np.ones((50, 1)), X])
+        penalty = alpha * np.eye(5)
+        penalty[0, 0] = 0
+        gram = X_intercept.T @ (weights[:, None] * X_intercept) + penalty
+        expected = np.linalg.solve(gram, X_intercept.T @ (weights * y))[1:]
+
+        np.testing.assert_allclose(ridge_regression(X, y, weights, alpha), expected, rtol=1e-8)
+        # without regularization the coefficients are recovered
+        np.testing.assert_allclose(
+            ridge_regression(X, y, weights, 1e-9), [0.5, -1.0, 0.0, 2.0], atol=0.02
+        )
+
+
+class TestWordSampler(unittest.TestCase):
+    def test_sample(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "words.npz")
+            np.savez(path, words=np.array(["a", "b", "c"]), probabilities=np.array([0.0, 0.25, 0.75]))
+            sampler = word_sampler.WordSampler(path)
+
+            samples = sampler.sample(2000, np.random.RandomState(0))
+            self.assertNotIn("a", samples)
+            self.assertAlmostEqual((samples == "c").mean(), 0.75, delta=0.05)
+            self.assertEqual(sampler.sample((2, 3)).shape, (2, 3))
+
+    def test_built_on_first_use(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "words.npz"
+
+            def build(save_path):
+                np.savez(save_path, words=np.array(["a"]), probabilities=np.array([1.0]))
+
+            with mock.patch.object(word_sampler, "DEFAULT_PATH", path), \
+                    mock.patch.object(word_sampler, "_word_sampler", None), \
+                    mock.patch.object(word_sampler, "build_word_sampler", side_effect=build) as built:
+                self.assertEqual(list(word_sampler.get_word_sampler().sample(2)), ["a", "a"])
+                word_sampler.get_word_sampler()
+                built.assert_called_once_with(path)
+
+    def test_missing_artifact(self):
+        # e.g. without network access, nltk cannot find the corpus
+        with mock.patch.object(word_sampler, "DEFAULT_PATH", Path("/nonexistent/words.npz")), \
+                mock.patch.object(word_sampler, "_word_sampler", None), \
+                mock.patch.object(word_sampler, "build_word_sampler", side_effect=LookupError("brown")):
+            with self.assertRaisesRegex(FileNotFoundError, "mmexp.methods.qlarifais.word_sampler"):
+                word_sampler.get_word_sampler()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+
+import numpy as np
+import torch
+
+from mmexp.utils.render import apply_colormap, colormap_lut, gaussian_blur
+
+try:
+    from matplotlib import colormaps
+except ImportError:
+    colormaps = None
+
+try:
+    from skimage.filters import gaussian
+except ImportError:
+    gaussian = None
+
+
+class TestRender(unittest.TestCase):
+    def setUp(self):
+        self.maps = torch.from_numpy(np.random.RandomState(0).rand(2, 1, 17, 23))
+
+    @unittest.skipIf(gaussian is None, "needs scikit-image")
+    def test_gaussian_blur(self):
+        for sigma in [0.5, 1.0, 2.5, 6.0]:
+            blurred = gaussian_blur(self.maps, sigma).numpy()
+            expected = np.stack([
+                gaussian(m[0], sigma=sigma, mode='nearest', truncate=4.0, preserve_range=True)
+                for m in self.maps.numpy()
+            ])
+            np.testing.assert_allclose(blurred[:, 0], expected, atol=1e-10)
+
+        # too small to blur
+        self.assertTrue(torch.equal(gaussian_blur(self.maps, 0.1), self.maps))
+
+    @unittest.skipIf(colormaps is None, "needs matplotlib >= 3.5")
+    def test_apply_colormap(self):
+        maps = torch.linspace(0, 1, 1001).view(1, 1, 1, -1)
+        colors = apply_colormap(maps, 'jet')[0, :, 0].T.numpy()
+        expected = colormaps['jet'](maps.flatten().numpy())[:, :3]
+        # the piecewise linear approximation is close to matplotlib's jet
+        self.assertLess(np.abs(colors - expected).max(), 0.15)
+        self.assertLess(np.abs(colors - expected).mean(), 0.03)
+
+        # any other colormap is looked up in matplotlib
+        lut = colormap_lut('viridis').numpy()
+        np.testing.assert_allclose(
+            lut, colormaps['viridis'](np.linspace(0, 1, 256))[:, :3], atol=1e-6
+        )
+        colors = apply_colormap(maps, 'viridis')[0, :, 0].T.numpy()
+        expected = colormaps['viridis'](maps.flatten().numpy())[:, :3]
+        self.assertLess(np.abs(colors - expected).max(), 0.02)
@@ -7,10 +7,9 @@ Created on Sun May  8 19:11:06 2022
 """
 
 from pathlib import Path
-import matplotlib.pyplot as plt
 
 from mmexp.methods import *
-from mmexp.utils.visualize import plot_example
+from mmexp.utils.render import render_example
 from mmexp.utils.tools import load_image, str_to_class
 
 
@@ -20,7 +19,8 @@ def run_method(model, model_name,
                question, category_id, 
                explainability_method,
                save_path,
-               analysis_type):
+               analysis_type,
+               publication=False):
     
     # Answer vocabulary
     answer_vocab = model.processor_dict['answer_processor'].answer_vocab.word_list
@@ -33,16 +33,25 @@ def run_method(model, model_name,
                       category_id,
                       )
     # visualize gradient map
-    #plt.subplot(212)
-    plot_example(model.image_tensor[:, [2, 1, 0]], 
-                 saliency, 
-                 method=explainability_method, 
-                 category_id=category_id,
-                 answer_vocab=answer_vocab,
-                 show_plot=False,
-                 save_path=save_path + '.png',
-                 analysis_type=analysis_type,
-                 )
+    example = render_example(model.image_tensor[:, [2, 1, 0]],
+                             saliency,
+                             save_path=save_path + '.png',
+                             )
+    # matplotlib figure with titles
+    if publication:
+        # imports matplotlib, only when the figures are wanted
+        from mmexp.utils.visualize import plot_example
+
+        plot_example(model.image_tensor[:, [2, 1, 0]], 
+                     saliency, 
+                     method=explainability_method, 
+                     category_id=category_id,
+                     answer_vocab=answer_vocab,
+                     show_plot=False,
+                     save_path=save_path + '.pdf',
+                     analysis_type=analysis_type,
+                     )
+    return example
 
 
 def run_explainability(model, model_name, image, img_name, question, category_id, explainability_method):
@@ -59,14 +68,10 @@ def run_explainability(model, model_name, image, img_name, question, category_id
                           category_id,
                           )
         # visualize gradient map
-        plot_example(model.image_tensor[:, [2, 1, 0]], 
-                     saliency, 
-                     method=explainability_method, 
-                     category_id=category_id,
-                     answer_vocab=answer_vocab,
-                     show_plot=False,
-                     save_path=save_path + '.png',
-                     )
+        render_example(model.image_tensor[:, [2, 1, 0]],
+                       saliency,
+                       save_path=save_path + '.png',
+                       )
         save_path = save_path + '.png'
     
     else: # if OR
@@ -80,15 +85,10 @@ def run_explainability(model, model_name, image, img_name, question, category_id
                                category_id,
                                )
         # visualize gradient map
-        plt.subplot(211)
-        plot_example(model.image_tensor[:, [2, 1, 0]], 
-                     saliency_orig, 
-                     method=explainability_method, 
-                     category_id=category_id,
-                     answer_vocab=answer_vocab,
-                     show_plot=False,
-                     save_path=save_path + '.png',
-                     )
+        render_example(model.image_tensor[:, [2, 1, 0]],
+                       saliency_orig,
+                       save_path=save_path + '.png',
+                       )
         
         # remove objects from image
         OR = str_to_class('OR')
@@ -104,15 +104,10 @@ def run_explainability(model, model_name, image, img_name, question, category_id
                                    category_id,
                                    )
         # visualize gradient map
-        plt.subplot(212)
-        plot_example(model.image_tensor[:, [2, 1, 0]], 
-                     saliency_modified, 
-                     method=explainability_method, 
-                     category_id=category_id,
-                     answer_vocab=answer_vocab,
-                     show_plot=False,
-                     save_path=save_path + f'_removed_{OR_model.object_name}.png',
-                     )
+        render_example(model.image_tensor[:, [2, 1, 0]],
+                       saliency_modified,
+                       save_path=save_path + f'_removed_{OR_model.object_name}.png',
+                       )
         save_path = [save_path + '.png', save_path + f'_removed_{OR_model.object_name}.png']
     
     """
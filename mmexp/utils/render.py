@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batched rendering of saliency and attention maps.
+
+Upsampling, smoothing, colormap lookup and alpha blending are tensor ops on
+whole batches ([batch_size, 3, H, W] images and [batch_size, h, w] maps), and
+the results are written with cv2, so no matplotlib figure is drawn per image:
+
+    overlays = render_overlays(images, saliency)         # uint8 [B, 3, H, W]
+    write_image(path, panel(images, overlays))           # image | overlay rows
+    write_image(combined_path, combine_images(panels))   # panels on top of each other
+
+render_example is the fast counterpart of plot_example, which is kept for
+publication figures.
+"""
+
+import os
+from functools import lru_cache
+
+import cv2
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+
+def minmax(x):
+    """Rescales each sample of x to [0, 1]"""
+    x = x.float()
+    flat = x.flatten(1)
+    low = flat.min(1)[0].view(-1, *[1] * (x.dim() - 1))
+    high = flat.max(1)[0].view(-1, *[1] * (x.dim() - 1))
+    return (x - low) / (high - low).clamp(min=1e-12)
+
+
+def to_maps(maps, grid_shape=None):
+    # [batch_size, 1, h, w] from [batch_size, h * w], [batch_size, h, w] or itself
+    maps = maps.detach().float()
+    if grid_shape is not None:
+        maps = maps.reshape(len(maps), *grid_shape)
+    if maps.dim() == 3:
+        maps = maps.unsqueeze(1)
+    # saliency of each color channel, e.g. of gradients
+    if maps.size(1) > 1:
+        maps = maps.abs().max(1, keepdim=True)[0]
+    return maps
+
+
+def gaussian_blur(maps, sigma):
+    """Separable gaussian filter of [batch_size, 1, H, W] maps, truncated at 4
+    sigma with the edges repeated, as skimage.filters.gaussian"""
+    radius = int(4 * sigma + 0.5)
+    if radius < 1:
+        return maps
+    x = torch.arange(-radius, radius + 1, dtype=maps.dtype, device=maps.device)
+    kernel = torch.exp(-0.5 * (x / sigma) ** 2)
+    kernel = kernel / kernel.sum()
+    maps = F.pad(maps, (radius, radius, radius, radius), mode='replicate')
+    maps = F.conv2d(maps, kernel.view(1, 1, 1, -1))
+    return F.conv2d(maps, kernel.view(1, 1, -1, 1))
+
+
+@lru_cache(maxsize=None)
+def colormap_lut(name):
+    # [256, 3] lookup table of a matplotlib colormap, built once per colormap
+    import matplotlib
+
+    if hasattr(matplotlib, 'colormaps'):
+        colormap = matplotlib.colormaps[name]
+    else:
+        # matplotlib < 3.5
+        from matplotlib import cm
+        colormap = cm.get_cmap(name)
+    return torch.from_numpy(colormap(np.linspace(0, 1, 256))[:, :3]).float()
+
+
+def apply_colormap(maps, name='jet'):
+    """[batch_size, 3, H, W] colors of [batch_size, 1, H, W] maps in [0, 1]"""
+    maps = maps.clamp(0, 1)
+    if name == 'jet':
+        # piecewise linear approximation of matplotlib's jet
+        centers = torch.tensor([3.0, 2.0, 1.0], device=maps.device).view(1, 3, 1, 1)
+        return (1.5 - (4 * maps - centers).abs()).clamp(0, 1)
+    lut = colormap_lut(name).to(maps.device)
+    indices = (maps.squeeze(1) * 255).round().long()
+    return lut[indices].permute(0, 3, 1, 2)
+
+
+def to_uint8(images):
+    return (images * 255).round().clamp(0, 255).to(torch.uint8)
+
+
+def render_overlays(images, maps, alpha=0.5, sigma=0.0, grid_shape=None,
+                    colormap='jet', opacity=False):
+    """Blends the colored maps over the images.
+
+    Args:
+        images (torch.Tensor): [batch_size, 3, H, W] RGB images of any range,
+            each is rescaled to [0, 1].
+        maps (torch.Tensor): saliency or attention maps of any resolution,
+            upsampled bicubically to the images.
+        alpha (float): opacity of the colored maps.
+        sigma (float): standard deviation in pixels of the gaussian smoothing.
+        grid_shape (tuple, optional): (h, w) of flat maps, e.g. (7, 7).
+        colormap (str): 'jet' or the name of any matplotlib colormap.
+        opacity (bool): darken the images where the maps are low instead of
+            coloring them.
+
+    Returns:
+        torch.Tensor: uint8 [batch_size, 3, H, W] overlays, on the cpu.
+    """
+    images = minmax(images.detach())
+    maps = to_maps(maps, grid_shape).to(images.device)
+    maps = F.interpolate(maps, size=images.shape[-2:], mode='bicubic',
+                         align_corners=False)
+    maps = minmax(gaussian_blur(maps, sigma))
+
+    if opacity:
+        overlays = images * (maps * 0.95 + 0.05)
+    else:
+        overlays = (1 - alpha) * images + alpha * apply_colormap(maps, colormap)
+    return to_uint8(overlays).cpu()
+
+
+def panel(images, overlays):
+    """uint8 [3, batch_size * H, 2 * W] image with one row per sample of the
+    image next to its overlay"""
+    images = to_uint8(minmax(images.detach())).cpu()
+    rows = torch.cat([images, overlays], dim=3)
+    return torch.cat(list(rows), dim=1)
+
+
+def combine_images(images, fill=255):
+    """Stacks [3, H, W] images vertically, narrower ones are padded on the right"""
+    width = max(image.size(-1) for image in images)
+    return torch.cat(
+        [F.pad(image, (0, width - image.size(-1)), value=fill) for image in images],
+        dim=1,
+    )
+
+
+def write_image(path, image, compression=1):
+    """Writes a uint8 [3, H, W] RGB image, with fast png compression by default"""
+    save_dir = os.path.dirname(os.path.abspath(path))
+    os.makedirs(save_dir, exist_ok=True)
+    image = image.permute(1, 2, 0).numpy()[..., ::-1]
+    cv2.imwrite(path, np.ascontiguousarray(image),
+                [cv2.IMWRITE_PNG_COMPRESSION, compression])
+
+
+def render_example(images, maps, save_path=None, **kwargs):
+    """Panel of the images next to their overlays, written to save_path if
+    given. kwargs go to render_overlays"""
+    example = panel(images, render_overlays(images, maps, **kwargs))
+    if save_path:
+        write_image(save_path, example)
+    return example
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sharded computation of the test predictions and embeddings used by the analyzer.
+
+The OK-VQA test annotations are split into contiguous shards, each shard is run
+by its own worker process with its own model replica (the checkpoint is memory
+mapped, so the replicas share its pages) and written to
+<report_dir>/shards/. The shards are merged by question_id into the order of
+the annotations and saved as the test_predictions.csv and test_embeddings.npy
+files that fetch_test_predictions and fetch_test_embeddings load, so the
+PerformanceReport and Stratify stages run unchanged afterwards.
+
+Finished shards are kept, an interrupted run only recomputes the missing ones.
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import torch
+import torch.multiprocessing as mp
+import torchvision.datasets.folder as tv_helpers
+
+from mmexp.utils.tools import paths_to_okvqa
+
+
+def shard_path(report_dir, shard_idx, num_shards):
+    return Path(report_dir) / 'shards' / f'test_{shard_idx}_of_{num_shards}.npz'
+
+
+def split_shards(num_rows, num_shards):
+    # contiguous, so that each worker reads its images in annotation order
+    return np.array_split(np.arange(num_rows), num_shards)
+
+
+def shard_device(shard_idx):
+    if torch.cuda.is_available():
+        return torch.device(f"cuda:{shard_idx % torch.cuda.device_count()}")
+    return torch.device("cpu")
+
+
+def run_shard(shard_idx, num_shards, model_dir, torch_cache, shard, images_path,
+              output_path, batch_size, num_threads):
+    # runs in a fresh process, import the model there
+    from mmf.models import Qlarifais
+
+    torch.set_num_threads(num_threads)
+    model = Qlarifais.from_pretrained(model_dir, torch_cache)
+    model.to(shard_device(shard_idx))
+    model.model.eval()
+
+    predictions, topk, embeddings = [], [], []
+    for start in range(0, len(shard), batch_size):
+        batch = shard.iloc[start:start + batch_size]
+        images = [tv_helpers.default_loader((Path(images_path) / name).as_posix() + '.jpg')
+                  for name in batch.image_name]
+        outputs = model.classify_batch(images, list(batch.question_str), top_k=5,
+                                       embedding_output=True)
+        for output in outputs:
+            predictions.append(output['answers'][0])
+            # same format as fetch_test_predictions writes
+            topk.append(str(list(zip(output['confidences'], output['answers']))))
+            embeddings.append(output['embedding'])
+
+    # write to a temporary file first, an existing shard is always complete
+    tmp_path = output_path.with_suffix('.tmp.npz')
+    np.savez(tmp_path,
+             question_id=shard.question_id.to_numpy(dtype=np.int64),
+             prediction=np.array(predictions, dtype=object),
+             topk=np.array(topk, dtype=object),
+             embeddings=np.array(embeddings, dtype=np.float64).reshape(len(shard), -1))
+    os.replace(tmp_path, output_path)
+
+
+def merge_shards(report_dir, num_shards, question_ids):
+    """Concatenates the shards and orders them by question_id as question_ids"""
+    shards = [np.load(shard_path(report_dir, idx, num_shards), allow_pickle=True)
+              for idx in range(num_shards)]
+    shard_question_ids = np.concatenate([shard['question_id'] for shard in shards])
+    order = pd.Index(shard_question_ids).get_indexer(question_ids)
+    if (order < 0).any():
+        raise RuntimeError(f"{(order < 0).sum()} test questions are missing from the shards "
+                           f"in {Path(report_dir) / 'shards'}")
+
+    predictions = pd.DataFrame({
+        'question_id': shard_question_ids[order],
+        'prediction': np.concatenate([shard['prediction'] for shard in shards])[order],
+        'topk': np.concatenate([shard['topk'] for shard in shards])[order],
+    })
+    # [embedding_dim, num_questions], as fetch_test_embeddings
+    embeddings = np.concatenate([shard['embeddings'] for shard in shards])[order].T
+    return predictions, embeddings
+
+
+def fetch_test_outputs_sharded(model, model_dir, torch_cache, report_dir, num_workers,
+                               batch_size=32):
+    """Computes the test predictions and embeddings with num_workers processes,
+    unless report_dir already contains both of them"""
+    report_dir = Path(report_dir)
+    predictions_file = report_dir / 'test_predictions.csv'
+    embeddings_file = report_dir / 'test_embeddings.npy'
+    if predictions_file.exists() and embeddings_file.exists():
+        print("Found test predictions and embeddings, skipping the sharded run")
+        return
+
+    data_path, images_path = paths_to_okvqa(model, run_type='test')
+    okvqa_test = pd.DataFrame.from_records(np.load(data_path, allow_pickle=True)[1:])
+    okvqa_test = okvqa_test[['question_id', 'image_name', 'question_str']]
+
+    os.makedirs(report_dir / 'shards', exist_ok=True)
+    # the cpu cores are divided among the workers
+    num_threads = max(1, (os.cpu_count() or 1) // num_workers)
+    context = mp.get_context('spawn')
+    processes = {}
+    for idx, rows in enumerate(split_shards(len(okvqa_test), num_workers)):
+        output_path = shard_path(report_dir, idx, num_workers)
+        if output_path.exists():
+            continue
+        process = context.Process(
+            target=run_shard,
+            args=(idx, num_workers, model_dir, torch_cache,
+                  okvqa_test.iloc[rows].reset_index(drop=True), images_path,
+                  output_path, batch_size, num_threads),
+        )
+        process.start()
+        processes[idx] = process
+    print(f"Creating test predictions and embeddings with {len(processes)} workers...")
+
+    for process in processes.values():
+        process.join()
+    failed = [idx for idx, process in processes.items() if process.exitcode != 0]
+    if failed:
+        raise RuntimeError(f"Shards {failed} of {num_workers} failed, finished shards "
+                           f"are kept in {report_dir / 'shards'}")
+
+    predictions, embeddings = merge_shards(report_dir, num_workers,
+                                           okvqa_test.question_id.to_numpy(dtype=np.int64))
+    predictions.to_csv(predictions_file, index=False)
+    with open(embeddings_file, 'wb') as f:
+        np.save(f, embeddings)
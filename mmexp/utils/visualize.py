@@ -18,7 +18,8 @@ def plot_example(input,
                  show_plot=False,
                  save_path=None,
                  analysis_type=None):
-    """Plot an example.
+    """Plot an example as a matplotlib figure with titles, for publications.
+    mmexp.utils.render.render_example renders the same without matplotlib.
 
     Args:
         input (:class:`torch.Tensor`): 4D tensor containing input images.
@@ -1,15 +1,36 @@
 # Copyright (c) Facebook, Inc. and its affiliates.
 # isort:skip_file
 # flake8: noqa: F401
+import importlib
+
 from mmf.utils.patch import patch_transformers
 
 patch_transformers()
 
-from mmf import utils, common, modules, datasets, models
-from mmf.modules import losses, schedulers, optimizers, metrics, poolers
 from mmf.version import __version__
 
 
+# Submodules are imported on first access, the registry imports the modules
+# of models, datasets etc. when they are looked up, see mmf.common.registry
+_LAZY_SUBMODULES = {
+    "utils": "mmf.utils",
+    "common": "mmf.common",
+    "modules": "mmf.modules",
+    "datasets": "mmf.datasets",
+    "models": "mmf.models",
+    "losses": "mmf.modules.losses",
+    "poolers": "mmf.modules.poolers",
+    "schedulers": "mmf.modules.schedulers",
+    "optimizers": "mmf.modules.optimizers",
+    "metrics": "mmf.modules.metrics",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(_LAZY_SUBMODULES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "utils",
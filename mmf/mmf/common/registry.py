@@ -27,7 +27,15 @@ Various decorators for registry different kind of classes with unique keys
 - Register a transformer head: ``@registry.register_transformer_head``
 - Register a test reporter: ``@registry.register_test_reporter``
 - Register a pl datamodule: ``@registry.register_datamodule``
+
+The ``get_*_class`` lookups import the module which registers a name, if it
+is not registered yet, from the manifest in ``mmf.common.registry_manifest``.
+Regenerate it with ``tools/scripts/registry/generate_manifest.py`` after
+adding a new registered class to MMF.
 """
+import importlib
+
+from mmf.common.registry_manifest import MANIFEST
 from mmf.utils.env import setup_imports
 
 
@@ -510,69 +518,80 @@ class Registry:
 
         current[path[-1]] = obj
 
+    @classmethod
+    def _get_class(cls, mapping_name, name):
+        mapping = cls.mapping[mapping_name]
+        if name not in mapping:
+            # Import the module registering the name on its first lookup, so
+            # that only the used components need to be imported
+            module = MANIFEST.get(mapping_name, {}).get(name, None)
+            if module is not None:
+                importlib.import_module(module)
+        return mapping.get(name, None)
+
     @classmethod
     def get_trainer_class(cls, name):
-        return cls.mapping["trainer_name_mapping"].get(name, None)
+        return cls._get_class("trainer_name_mapping", name)
 
     @classmethod
     def get_builder_class(cls, name):
-        return cls.mapping["builder_name_mapping"].get(name, None)
+        return cls._get_class("builder_name_mapping", name)
 
     @classmethod
     def get_callback_class(cls, name):
-        return cls.mapping["callback_name_mapping"].get(name, None)
+        return cls._get_class("callback_name_mapping", name)
 
     @classmethod
     def get_model_class(cls, name):
-        return cls.mapping["model_name_mapping"].get(name, None)
+        return cls._get_class("model_name_mapping", name)
 
     @classmethod
     def get_processor_class(cls, name):
-        return cls.mapping["processor_name_mapping"].get(name, None)
+        return cls._get_class("processor_name_mapping", name)
 
     @classmethod
     def get_metric_class(cls, name):
-        return cls.mapping["metric_name_mapping"].get(name, None)
+        return cls._get_class("metric_name_mapping", name)
 
     @classmethod
     def get_loss_class(cls, name):
-        return cls.mapping["loss_name_mapping"].get(name, None)
+        return cls._get_class("loss_name_mapping", name)
 
     @classmethod
     def get_pool_class(cls, name):
-        return cls.mapping["pool_name_mapping"].get(name, None)
+        return cls._get_class("pool_name_mapping", name)
 
     @classmethod
     def get_optimizer_class(cls, name):
-        return cls.mapping["optimizer_name_mapping"].get(name, None)
+        return cls._get_class("optimizer_name_mapping", name)
 
     @classmethod
     def get_scheduler_class(cls, name):
-        return cls.mapping["scheduler_name_mapping"].get(name, None)
+        return cls._get_class("scheduler_name_mapping", name)
 
     @classmethod
     def get_decoder_class(cls, name):
-        return cls.mapping["decoder_name_mapping"].get(name, None)
+        return cls._get_class("decoder_name_mapping", name)
 
     @classmethod
     def get_encoder_class(cls, name):
-        return cls.mapping["encoder_name_mapping"].get(name, None)
+        return cls._get_class("encoder_name_mapping", name)
 
     @classmethod
     def get_iteration_strategy_class(cls, name):
-        return cls.mapping["iteration_strategy_name_mapping"].get(name, None)
+        return cls._get_class("iteration_strategy_name_mapping", name)
 
     @classmethod
     def get_transformer_backend_class(cls, name):
-        return cls.mapping["transformer_backend_name_mapping"].get(name, None)
+        return cls._get_class("transformer_backend_name_mapping", name)
 
     @classmethod
     def get_transformer_head_class(cls, name):
-        return cls.mapping["transformer_head_name_mapping"].get(name, None)
+        return cls._get_class("transformer_head_name_mapping", name)
 
     @classmethod
     def get_test_rerporter_class(cls, name):
-        return cls.mapping["test_reporter_mapping"].get(name, None)
+        return cls._get_class("test_reporter_mapping", name)
 
     @classmethod
     def get(cls, name, default=None, no_warning=False):
@@ -0,0 +1,288 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+# Generated by tools/scripts/registry/generate_manifest.py, do not edit.
+# flake8: noqa
+
+MANIFEST = {
+    "builder_name_mapping": {
+        "airstore": "mmf.datasets.builders.airstore.builder",
+        "charades": "mmf.datasets.builders.charades.builder",
+        "clevr": "mmf.datasets.builders.clevr.builder",
+        "coco": "mmf.datasets.builders.coco.builder",
+        "conceptual_captions": "mmf.datasets.builders.conceptual_captions.builder",
+        "detection_coco": "mmf.datasets.builders.coco.detection_builder",
+        "detection_visual_genome": "mmf.datasets.builders.visual_genome.detection_builder",
+        "glue_mnli_mismatched": "mmf.datasets.builders.glue.builder",
+        "glue_qnli": "mmf.datasets.builders.glue.builder",
+        "glue_qqp": "mmf.datasets.builders.glue.builder",
+        "glue_sst2": "mmf.datasets.builders.glue.builder",
+        "gqa": "mmf.datasets.builders.gqa.builder",
+        "hateful_memes": "mmf.datasets.builders.hateful_memes.builder",
+        "masked_coco": "mmf.datasets.builders.coco.masked_builder",
+        "masked_coco2017": "mmf.datasets.builders.coco2017.masked_builder",
+        "masked_conceptual_captions": "mmf.datasets.builders.conceptual_captions.masked_builder",
+        "masked_flickr30k": "mmf.datasets.builders.flickr30k.masked_builder",
+        "masked_gqa": "mmf.datasets.builders.gqa.masked_builder",
+        "masked_localized_narratives": "mmf.datasets.builders.localized_narratives.masked_builder",
+        "masked_mmimdb": "mmf.datasets.builders.mmimdb.masked_builder",
+        "masked_q_vqa2": "mmf.datasets.builders.vqa2.masked_q_vqa2_builder",
+        "masked_sbu": "mmf.datasets.builders.sbu_captions.masked_builder",
+        "masked_visual_genome": "mmf.datasets.builders.visual_genome.masked_builder",
+        "masked_vqa2": "mmf.datasets.builders.vqa2.masked_builder",
+        "mmimdb": "mmf.datasets.builders.mmimdb.builder",
+        "nlvr2": "mmf.datasets.builders.nlvr2.builder",
+        "okvqa": "mmf.datasets.builders.okvqa.builder",
+        "retrieval": "mmf.datasets.builders.retrieval.builder",
+        "textvqa": "mmf.datasets.builders.textvqa.builder",
+        "vinvl": "mmf.datasets.builders.vinvl.builder",
+        "visual_dialog": "mmf.datasets.builders.visual_dialog.builder",
+        "visual_entailment": "mmf.datasets.builders.visual_entailment.builder",
+        "visual_genome": "mmf.datasets.builders.visual_genome.builder",
+        "vizwiz": "mmf.datasets.builders.vizwiz.builder",
+        "vqa2": "mmf.datasets.builders.vqa2.builder",
+        "vqa2_train_val": "mmf.datasets.builders.vqa2.builder",
+        "vqacp_v2": "mmf.datasets.builders.vqacp_v2.builder",
+    },
+    "encoder_name_mapping": {
+        "albef_vit_encoder": "mmf.models.albef.vit",
+        "any_transformer": "mmf.modules.encoders",
+        "detectron2_resnet": "mmf.modules.encoders",
+        "finetune_faster_rcnn_fpn_fc7": "mmf.modules.encoders",
+        "frcnn": "mmf.modules.encoders",
+        "grid_feats_vqa": "mmf.modules.encoders",
+        "identity": "mmf.modules.encoders",
+        "pytorchvideo": "mmf.modules.encoders",
+        "r2plus1d_18": "mmf.modules.encoders",
+        "resnet152": "mmf.modules.encoders",
+        "resnet18": "mmf.modules.encoders",
+        "resnet18_audio": "mmf.modules.encoders",
+        "text_embedding": "mmf.modules.encoders",
+        "torchvision_resnet": "mmf.modules.encoders",
+        "transformer": "mmf.modules.encoders",
+        "vit": "mmf.modules.encoders",
+    },
+    "fusion_name_mapping": {
+        "block": "mmf.modules.fusions",
+        "block_tucker": "mmf.modules.fusions",
+        "concat_mlp": "mmf.modules.fusions",
+        "linear_sum": "mmf.modules.fusions",
+        "mcb": "mmf.modules.fusions",
+        "mfb": "mmf.modules.fusions",
+        "mfh": "mmf.modules.fusions",
+        "mlb": "mmf.modules.fusions",
+        "mutan": "mmf.modules.fusions",
+        "tucker": "mmf.modules.fusions",
+    },
+    "iteration_strategy_name_mapping": {
+        "constant": "mmf.datasets.iteration_strategies",
+        "random": "mmf.datasets.iteration_strategies",
+        "ratios": "mmf.datasets.iteration_strategies",
+        "round_robin": "mmf.datasets.iteration_strategies",
+        "size_proportional": "mmf.datasets.iteration_strategies",
+    },
+    "loss_name_mapping": {
+        "attention_supervision": "mmf.modules.losses",
+        "bce": "mmf.modules.losses",
+        "bce_and_contrastive_loss": "mmf.modules.losses",
+        "bce_kl": "mmf.modules.losses",
+        "bce_kl_combined": "mmf.modules.losses",
+        "caption_cross_entropy": "mmf.modules.losses",
+        "contrastive_loss": "mmf.modules.losses",
+        "cos_emb_loss": "mmf.modules.losses",
+        "cross_entropy": "mmf.modules.losses",
+        "in_batch_hinge": "mmf.modules.losses",
+        "label_smoothing_cross_entropy": "mmf.modules.losses",
+        "logit_bce": "mmf.modules.losses",
+        "m4c_decoding_bce_with_mask": "mmf.modules.losses",
+        "ms_loss": "mmf.modules.losses",
+        "mse": "mmf.modules.losses",
+        "multi": "mmf.modules.losses",
+        "nll_loss": "mmf.modules.losses",
+        "refiner_contrastive_loss": "mmf.modules.losses",
+        "refiner_ms": "mmf.modules.losses",
+        "soft_label_cross_entropy": "mmf.modules.losses",
+        "softmax_kldiv": "mmf.modules.losses",
+        "triple_logit_bce": "mmf.modules.losses",
+        "weighted_softmax": "mmf.modules.losses",
+        "wrong": "mmf.modules.losses",
+    },
+    "metric_name_mapping": {
+        "accuracy": "mmf.modules.metrics",
+        "ap": "mmf.modules.metrics",
+        "binary_ap": "mmf.modules.metrics",
+        "binary_f1": "mmf.modules.metrics",
+        "binary_f1_precision_recall": "mmf.modules.metrics",
+        "caption_bleu4": "mmf.modules.metrics",
+        "detection_mean_ap": "mmf.modules.metrics",
+        "f1": "mmf.modules.metrics",
+        "f1_precision_recall": "mmf.modules.metrics",
+        "macro_ap": "mmf.modules.metrics",
+        "macro_f1": "mmf.modules.metrics",
+        "macro_f1_precision_recall": "mmf.modules.metrics",
+        "macro_roc_auc": "mmf.modules.metrics",
+        "mean_r": "mmf.modules.metrics",
+        "mean_rr": "mmf.modules.metrics",
+        "micro_ap": "mmf.modules.metrics",
+        "micro_f1": "mmf.modules.metrics",
+        "micro_f1_precision_recall": "mmf.modules.metrics",
+        "micro_roc_auc": "mmf.modules.metrics",
+        "multilabel_f1": "mmf.modules.metrics",
+        "multilabel_macro_f1": "mmf.modules.metrics",
+        "multilabel_micro_f1": "mmf.modules.metrics",
+        "numberbatch_score": "mmf.modules.metrics",
+        "ocrvqa_accuracy": "mmf.modules.metrics",
+        "r@1": "mmf.modules.metrics",
+        "r@10": "mmf.modules.metrics",
+        "r@10_retrieval": "mmf.modules.metrics",
+        "r@10_rev_retrieval": "mmf.modules.metrics",
+        "r@1_retrieval": "mmf.modules.metrics",
+        "r@1_rev_retrieval": "mmf.modules.metrics",
+        "r@5": "mmf.modules.metrics",
+        "r@5_retrieval": "mmf.modules.metrics",
+        "r@5_rev_retrieval": "mmf.modules.metrics",
+        "r@k_retrieval": "mmf.modules.metrics",
+        "r@pk": "mmf.modules.metrics",
+        "roc_auc": "mmf.modules.metrics",
+        "stvqa_accuracy": "mmf.modules.metrics",
+        "stvqa_anls": "mmf.modules.metrics",
+        "textcaps_bleu4": "mmf.modules.metrics",
+        "textvqa_accuracy": "mmf.modules.metrics",
+        "topk_accuracy": "mmf.modules.metrics",
+        "vqa_accuracy": "mmf.modules.metrics",
+        "vqa_evalai_accuracy": "mmf.modules.metrics",
+    },
+    "model_name_mapping": {
+        "ban": "mmf.models.ban",
+        "butd": "mmf.models.butd",
+        "cm_shared_transformer": "mmf.models.alignment",
+        "cnn_lstm": "mmf.models.cnn_lstm",
+        "concat_bert": "mmf.models.fusions",
+        "concat_bow": "mmf.models.fusions",
+        "graph_network_bare": "mmf.modules.graphnetwork",
+        "krisp": "mmf.models.krisp",
+        "late_fusion": "mmf.models.fusions",
+        "lorra": "mmf.models.lorra",
+        "lxmert": "mmf.models.lxmert",
+        "m4c": "mmf.models.m4c",
+        "m4c_captioner": "mmf.models.m4c_captioner",
+        "mmbt": "mmf.models.mmbt",
+        "mmf_bert": "mmf.models.mmf_bert",
+        "mmf_transformer": "mmf.models.mmf_transformer",
+        "mmft": "mmf.models.mmf_transformer",
+        "movie_mcan": "mmf.models.movie_mcan",
+        "multihead": "mmf.models.pythia",
+        "pythia": "mmf.models.pythia",
+        "pythia_image_only": "mmf.models.pythia",
+        "pythia_question_only": "mmf.models.pythia",
+        "qlarifais": "mmf.models.qlarifais",
+        "top_down_bottom_up": "mmf.models.top_down_bottom_up",
+        "unimodal_image": "mmf.models.unimodal",
+        "unimodal_text": "mmf.models.unimodal",
+        "unit": "mmf.models.unit.unit",
+        "uniter": "mmf.models.uniter",
+        "vilbert": "mmf.models.vilbert",
+        "vilt": "mmf.models.vilt",
+        "vinvl": "mmf.models.vinvl",
+        "visual_bert": "mmf.models.visual_bert",
+    },
+    "optimizer_name_mapping": {
+        "adam_w": "mmf.modules.optimizers",
+        "adam_w_skip_params_with_zero_grad": "mmf.modules.optimizers",
+    },
+    "pool_name_mapping": {
+        "average_concat_last_k": "mmf.modules.poolers",
+        "average_k_from_last": "mmf.modules.poolers",
+        "average_sum_last_k": "mmf.modules.poolers",
+        "avg": "mmf.modules.poolers",
+        "cls": "mmf.modules.poolers",
+        "identity": "mmf.modules.poolers",
+    },
+    "processor_name_mapping": {
+        "GrayScaleTo3Channels": "mmf.datasets.processors.image_processors",
+        "NormalizeBGR255": "mmf.datasets.processors.image_processors",
+        "ResizeShortest": "mmf.datasets.processors.image_processors",
+        "ToUInt8Tensor": "mmf.datasets.processors.image_processors",
+        "bbox": "mmf.datasets.processors.processors",
+        "bert_tokenizer": "mmf.datasets.processors.bert_processors",
+        "caption": "mmf.datasets.processors.processors",
+        "copy": "mmf.datasets.processors.processors",
+        "detection_compose": "mmf.datasets.processors.detection_transforms",
+        "detection_normalize": "mmf.datasets.processors.detection_transforms",
+        "detection_random_horizontal_flip": "mmf.datasets.processors.detection_transforms",
+        "detection_random_resize": "mmf.datasets.processors.detection_transforms",
+        "detection_random_select": "mmf.datasets.processors.detection_transforms",
+        "detection_random_size_crop": "mmf.datasets.processors.detection_transforms",
+        "detection_to_tensor": "mmf.datasets.processors.detection_transforms",
+        "detr_image_and_target": "mmf.datasets.processors.processors",
+        "evalai_answer": "mmf.datasets.processors.processors",
+        "fasttext": "mmf.datasets.processors.processors",
+        "frcnn_preprocess": "mmf.datasets.processors.frcnn_processor",
+        "glove": "mmf.datasets.processors.processors",
+        "graph_vqa_answer": "mmf.datasets.processors.processors",
+        "m4c_answer": "mmf.datasets.processors.processors",
+        "m4c_caption": "mmf.datasets.processors.processors",
+        "masked_region": "mmf.datasets.processors.processors",
+        "masked_roberta_tokenizer": "mmf.datasets.processors.bert_processors",
+        "masked_token": "mmf.datasets.processors.bert_processors",
+        "multi_class_from_file": "mmf.datasets.processors.processors",
+        "multi_hot_answer_from_vocab": "mmf.datasets.processors.processors",
+        "multi_sentence_bert_tokenizer": "mmf.datasets.processors.bert_processors",
+        "multi_sentence_roberta_tokenizer": "mmf.datasets.processors.bert_processors",
+        "numberbatch": "mmf.datasets.processors.processors",
+        "permute_and_rescale": "mmf.datasets.processors.video_processors",
+        "phoc": "mmf.datasets.processors.processors",
+        "prediction.argmax": "mmf.datasets.processors.prediction_processors",
+        "roberta_tokenizer": "mmf.datasets.processors.bert_processors",
+        "simple_sentence": "mmf.datasets.processors.processors",
+        "simple_word": "mmf.datasets.processors.processors",
+        "soft_copy_answer": "mmf.datasets.processors.processors",
+        "torchvision_transforms": "mmf.datasets.processors.image_processors",
+        "transformer_bbox": "mmf.datasets.processors.processors",
+        "truncate_or_pad": "mmf.datasets.processors.video_processors",
+        "uniter_text_tokenizer": "mmf.datasets.processors.bert_processors",
+        "video_center_crop": "mmf.datasets.processors.video_processors",
+        "video_normalize": "mmf.datasets.processors.video_processors",
+        "video_pad": "mmf.datasets.processors.video_processors",
+        "video_random_crop": "mmf.datasets.processors.video_processors",
+        "video_random_horizontal_flip": "mmf.datasets.processors.video_processors",
+        "video_resize": "mmf.datasets.processors.video_processors",
+        "video_to_tensor": "mmf.datasets.processors.video_processors",
+        "video_transforms": "mmf.datasets.processors.video_processors",
+        "vilt_image_processor": "mmf.datasets.processors.image_processors",
+        "vilt_text_tokenizer": "mmf.datasets.processors.bert_processors",
+        "vinvl_text_tokenizer": "mmf.datasets.processors.bert_processors",
+        "vocab": "mmf.datasets.processors.processors",
+        "vqa_answer": "mmf.datasets.processors.processors",
+    },
+    "scheduler_name_mapping": {
+        "multi_step": "mmf.modules.schedulers",
+        "pythia": "mmf.modules.schedulers",
+        "warmup_cosine": "mmf.modules.schedulers",
+        "warmup_linear": "mmf.modules.schedulers",
+    },
+    "test_reporter_mapping": {
+        "default": "mmf.common.test_reporter",
+        "file": "mmf.common.test_reporter",
+    },
+    "trainer_name_mapping": {
+        "base": "mmf.trainers.base_trainer",
+        "head_sweep": "mmf.trainers.head_sweep_trainer",
+        "lightning": "mmf.trainers.lightning_trainer",
+        "mmf": "mmf.trainers.mmf_trainer",
+    },
+    "transformer_backend_name_mapping": {
+        "huggingface": "mmf.models.transformers.backends.huggingface",
+    },
+    "transformer_head_name_mapping": {
+        "contrastive_three_way": "mmf.models.transformers.heads.contrastive",
+        "itm": "mmf.models.transformers.heads.itm",
+        "mlm": "mmf.models.transformers.heads.mlm",
+        "mlm_multi": "mmf.models.transformers.heads.mlm",
+        "mlp": "mmf.models.transformers.heads.mlp",
+        "mrc": "mmf.models.transformers.heads.mrc",
+        "mrfr": "mmf.models.transformers.heads.mrfr",
+        "multilayer_mlp": "mmf.models.transformers.heads.mlp",
+        "refiner": "mmf.models.transformers.heads.refiner",
+        "refiner_classifier": "mmf.models.transformers.heads.refnet_classifier",
+        "wra": "mmf.models.transformers.heads.wra",
+    },
+}
@@ -0,0 +1,86 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import torch
+
+
+class SoftScoreTable:
+    """Sparse table of the VQA soft scores of every question, built once from
+    the static annotations instead of running the answer processor on every
+    fetch. Row ``i`` holds the answer ids with a non zero score for the
+    ``i``-th question, ``dense`` turns the rows of a batch into targets::
+
+        table = SoftScoreTable.build(all_answers, answer_processor)
+        targets = table.dense(torch.tensor([4, 2]))  # (2, vocab_size)
+
+    Args:
+        offsets (torch.Tensor): Start of each row in ``answer_ids``, one more
+            than the number of rows
+        answer_ids (torch.Tensor): Answer ids of all rows
+        scores (torch.Tensor): Score of each answer id
+        vocab_size (int): Number of answers of the dense targets
+    """
+
+    def __init__(
+        self,
+        offsets: torch.Tensor,
+        answer_ids: torch.Tensor,
+        scores: torch.Tensor,
+        vocab_size: int,
+    ):
+        self.offsets = offsets
+        self.answer_ids = answer_ids
+        self.scores = scores
+        self.vocab_size = vocab_size
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @classmethod
+    def build(
+        cls,
+        all_answers: Sequence[Optional[List[str]]],
+        answer_processor: Callable[[Dict[str, Any]], Dict[str, Any]],
+    ) -> "SoftScoreTable":
+        """Runs ``answer_processor`` once on the answers of every question,
+        questions without answers (None) get an empty row."""
+        lengths, answer_ids, scores = [], [], []
+        for answers in all_answers:
+            if answers is None:
+                lengths.append(0)
+                continue
+            answers_scores = answer_processor({"answers": answers})["answers_scores"]
+            ids = answers_scores.nonzero(as_tuple=True)[0]
+            lengths.append(len(ids))
+            answer_ids.append(ids)
+            scores.append(answers_scores[ids])
+
+        offsets = torch.zeros(len(lengths) + 1, dtype=torch.long)
+        offsets[1:] = torch.tensor(lengths, dtype=torch.long).cumsum(0)
+        return cls(
+            offsets,
+            torch.cat(answer_ids) if answer_ids else torch.zeros(0, dtype=torch.long),
+            torch.cat(scores) if scores else torch.zeros(0),
+            answer_processor.get_vocab_size(),
+        )
+
+    def dense(
+        self, rows: torch.Tensor, device: Optional[torch.device] = None
+    ) -> torch.Tensor:
+        """Dense targets of shape (len(rows), vocab_size) on ``device``"""
+        rows = rows.long().cpu()
+        starts = self.offsets[rows]
+        counts = self.offsets[rows + 1] - starts
+        # position in answer_ids of every entry of the batch
+        batch_rows = torch.repeat_interleave(torch.arange(len(rows)), counts)
+        first = torch.cumsum(counts, 0) - counts
+        positions = (
+            torch.arange(int(counts.sum())) - first[batch_rows] + starts[batch_rows]
+        )
+
+        targets = torch.zeros(len(rows), self.vocab_size, device=device)
+        targets[batch_rows.to(device), self.answer_ids[positions].to(device)] = (
+            self.scores[positions].to(device)
+        )
+        return targets
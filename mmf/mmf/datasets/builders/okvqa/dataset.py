@@ -1,9 +1,11 @@
 # Copyright (c) Facebook, Inc. and its affiliates.
 from typing import Type, Union
 
+import numpy as np
 import torch
 from mmf.common.sample import Sample
 from mmf.common.typings import MMFDatasetConfigType
+from mmf.datasets.answer_targets import SoftScoreTable
 from mmf.datasets.builders.okvqa.database import OKVQAAnnotationDatabase
 from mmf.datasets.mmf_dataset import MMFDataset
 from mmf.datasets.processors import GraphVQAAnswerProcessor
@@ -39,6 +41,33 @@ class OKVQADataset(MMFDataset):
         if hasattr(self, "image_db"):
             self.image_db.transform = self.image_processor
 
+        if self.config.get("precompute_answer_targets", False) and hasattr(
+            self, "answer_processor"
+        ):
+            self.answer_targets = SoftScoreTable.build(
+                [
+                    self.annotation_db[idx].get("answers")
+                    for idx in range(len(self.annotation_db))
+                ],
+                self.answer_processor,
+            )
+
+    def prepare_batch(self, batch):
+        batch = super().prepare_batch(batch)
+        # uint8 images are normalized once per batch on the device, see
+        # configs/datasets/okvqa/uint8_images.yaml
+        if (
+            hasattr(self, "batch_image_processor")
+            and "image" in batch
+            and batch.image.dtype == torch.uint8
+        ):
+            batch.image = self.batch_image_processor(batch.image)
+        if hasattr(self, "answer_targets") and "answer_targets_index" in batch:
+            batch.targets = self.answer_targets.dense(
+                batch.pop("answer_targets_index"), device=self._device
+            )
+        return batch
+
     def __getitem__(self, idx: int) -> Type[Sample]:
         sample_info = self.annotation_db[idx]
         current_sample = Sample()
@@ -50,6 +79,8 @@ class OKVQADataset(MMFDataset):
             }
         else:
             text_processor_argument = {"text": sample_info["question"]}
+        # lets the text processor look up pre-tokenized questions
+        text_processor_argument["question_id"] = sample_info["question_id"]
         processed_question = self.text_processor(text_processor_argument)
         current_sample.update(processed_question)
         current_sample.id = torch.tensor(
@@ -66,13 +97,36 @@ class OKVQADataset(MMFDataset):
         else:
             image_path = sample_info["image_name"] + ".jpg"
             current_sample.image = self.image_db.from_path(image_path)["images"][0]
-        current_sample = self.add_answer_info(sample_info, current_sample)
+        current_sample = self.add_answer_info(sample_info, current_sample, idx)
 
+        if hasattr(self, "graph_processor"):
+            graph_processor_argument = {
+                "tokens": processed_question.get("tokens", processed_question["text"])
+            }
+            if "answers" in sample_info:
+                graph_processor_argument["answers"] = sample_info["answers"]
+            current_sample.update(self.graph_processor(graph_processor_argument))
 
         return current_sample
 
-    def add_answer_info(self, sample_info, sample):
-        if "answers" in sample_info:
+    def get_text_lengths(self):
+        """Number of tokens of every question, including the special tokens of
+        BERT tokenizers. Used to batch questions of similar length together.
+        """
+        tokenize = getattr(self.text_processor, "tokenize", str.split)
+        lengths = []
+        for idx in range(len(self.annotation_db)):
+            sample_info = self.annotation_db[idx]
+            question = sample_info.get("question_str", sample_info.get("question"))
+            lengths.append(len(tokenize(question)) + 2)
+        return lengths
+
+    def add_answer_info(self, sample_info, sample, idx=None):
+        if "answers" in sample_info and hasattr(self, "answer_targets"):
+            # the targets are built from the precomputed table per batch
+            sample.answers = sample_info["answers"]
+            sample.answer_targets_index = torch.tensor(idx, dtype=torch.long)
+        elif "answers" in sample_info:
             answers = sample_info["answers"]
             answer_processor_arg = {"answers": answers}
             processed_soft_copy_answers = self.answer_processor(answer_processor_arg)
@@ -86,86 +140,90 @@ class OKVQADataset(MMFDataset):
     def idx_to_answer(self, idx):
         return self.answer_processor.convert_idx_to_answer(idx)
 
+    def _graph_to_vocab_index(self):
+        # index of every graph answer in the regular answer vocabulary
+        if not hasattr(self, "_graph_to_vocab"):
+            answer_vocab = self.answer_processor.answer_vocab
+            index = [
+                answer_vocab.word2idx(graph_ans)
+                for graph_ans in self.answer_processor.graph_vocab
+            ]
+            # Again, assumes graph ans is subset of all answers
+            assert all(
+                reg_idx != answer_vocab.UNK_INDEX
+                and reg_idx < self.answer_processor.get_true_vocab_size()
+                for reg_idx in index
+            )
+            self._graph_to_vocab = torch.tensor(index, dtype=torch.long)
+        return self._graph_to_vocab
+
+    def _collapse_graph_scores(self, scores):
+        """Copies the confs of the graph answers over the regular ones if they
+        are greater and sets the graph confs to -inf"""
+        reg_vocab_sz = self.answer_processor.get_true_vocab_size()
+        index = self._graph_to_vocab_index()
+        graph_end = reg_vocab_sz + len(index)
+
+        scores = scores.detach().float().cpu().clone()
+        scores[:, :reg_vocab_sz] = scores[:, :reg_vocab_sz].scatter_reduce(
+            1,
+            index.expand(scores.size(0), -1),
+            scores[:, reg_vocab_sz:graph_end],
+            reduce="amax",
+        )
+        scores[:, reg_vocab_sz:graph_end] = -float("Inf")
+        return scores
+
+    def _decode_answers(self, answer_ids, report):
+        """Answer strings of a 2d tensor of answer ids, ids past the answer
+        space point to the context tokens of the sample"""
+        answer_space_size = self.answer_processor.get_true_vocab_size()
+        if getattr(self, "_answer_strings", None) is None:
+            self._answer_strings = np.array(
+                [
+                    self.answer_processor.idx2word(idx).replace(" 's", "'s")
+                    for idx in range(answer_space_size)
+                ],
+                dtype=object,
+            )
+
+        answer_ids = answer_ids.cpu().numpy()
+        in_vocab = answer_ids < answer_space_size
+        answers = self._answer_strings[np.where(in_vocab, answer_ids, 0)]
+        for idx, k in zip(*np.nonzero(~in_vocab)):
+            answer = report.context_tokens[idx][answer_ids[idx, k] - answer_space_size]
+            if answer == self.context_processor.PAD_TOKEN:
+                answer = "unanswerable"
+            answers[idx, k] = answer.replace(" 's", "'s")
+        return answers
+
     def format_for_prediction(self, report):
         # Check for case of scores coming from graph
         reg_vocab_sz = self.answer_processor.get_true_vocab_size()
         if report.scores.size(1) > reg_vocab_sz:
             # Should actually have the graph_vqa_answer
             assert type(self.answer_processor.processor) is GraphVQAAnswerProcessor
-
-            # Collapse into one set of confs (i.e. copy graph ones over if conf is greater)
-            # Again, assumes graph ans is subset of all answers
-            scores = torch.Tensor(report.scores.shape).copy_(report.scores)
-            for batch_ind in range(report.scores.size(0)):
-                for graph_ind, graph_ans in enumerate(
-                    self.answer_processor.graph_vocab
-                ):
-                    # Get graph conf
-                    graph_conf = scores[batch_ind, reg_vocab_sz + graph_ind].item()
-
-                    # Get non-graph conf
-                    reg_idx = self.answer_processor.answer_vocab.word2idx(graph_ans)
-                    assert (
-                        reg_idx != self.answer_processor.answer_vocab.UNK_INDEX
-                        and reg_idx < reg_vocab_sz
-                    )
-                    reg_conf = scores[batch_ind, reg_idx].item()
-
-                    # Set to max, zero out graph ind
-                    scores[batch_ind, reg_idx] = max(graph_conf, reg_conf)
-                    scores[batch_ind, reg_vocab_sz + graph_ind] = -float("Inf")
+            scores = self._collapse_graph_scores(report.scores)
         else:
             scores = report.scores
 
         # Get top 5 answers and scores
         topkscores, topkinds = torch.topk(scores, 5, dim=1)
-
         answers = scores.argmax(dim=1)
 
-        predictions = []
-        answer_space_size = self.answer_processor.get_true_vocab_size()
+        topk_answers = self._decode_answers(topkinds, report).tolist()
+        answers = self._decode_answers(answers.unsqueeze(1), report)[:, 0].tolist()
 
-        for idx, question_id in enumerate(report.id):
-            # Dictionary to append for prediction
-            pred_dict = {}
-            pred_dict["question_id"] = question_id.item()
-
-            # Get top-k answers
-            assert (
-                len(topkscores[idx]) == len(topkinds[idx]) and len(topkscores[idx]) == 5
+        predictions = []
+        for question_id, topk_ans, topk_scores, answer in zip(
+            report.id.tolist(), topk_answers, topkscores.tolist(), answers
+        ):
+            predictions.append(
+                {
+                    "question_id": question_id,
+                    "topk": list(zip(topk_ans, topk_scores)),
+                    "answer": answer,
+                }
             )
-            topk_ans_scores = []
-            for score, aid in zip(topkscores[idx], topkinds[idx]):
-                score = score.item()
-                kaid = aid.item()
-
-                if kaid >= answer_space_size:
-                    kaid -= answer_space_size
-                    kanswer = report.context_tokens[idx][kaid]
-                    if kanswer == self.context_processor.PAD_TOKEN:
-                        kanswer = "unanswerable"
-                else:
-                    kanswer = self.answer_processor.idx2word(kaid)
-                kanswer = kanswer.replace(" 's", "'s")
-                topk_ans_scores.append((kanswer, score))
-            pred_dict["topk"] = topk_ans_scores
-
-            # Now get regular answer
-            answer_id = answers[idx].item()
-            if answer_id >= answer_space_size:
-                answer_id -= answer_space_size
-                answer = report.context_tokens[idx][answer_id]
-                if answer == self.context_processor.PAD_TOKEN:
-                    answer = "unanswerable"
-            else:
-                answer = self.answer_processor.idx2word(answer_id)
-
-            answer = answer.replace(" 's", "'s")
-            pred_dict["answer"] = answer
-            predictions.append(pred_dict)
-
-            # Dump the info
-            info = {}
-            info["scores"] = report.scores[idx].cpu()
 
         return predictions
@@ -12,6 +12,7 @@ from mmf.datasets.processors.processors import (
     GloVeProcessor,
     GraphVQAAnswerProcessor,
     MultiHotAnswerFromVocabProcessor,
+    NumberbatchProcessor,
     Processor,
     SimpleSentenceProcessor,
     SimpleWordProcessor,
@@ -30,6 +31,7 @@ __all__ = [
     "VQAAnswerProcessor",
     "GraphVQAAnswerProcessor",
     "MultiHotAnswerFromVocabProcessor",
+    "NumberbatchProcessor",
     "SoftCopyAnswerProcessor",
     "SimpleWordProcessor",
     "SimpleSentenceProcessor",
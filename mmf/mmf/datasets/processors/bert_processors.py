@@ -1,16 +1,26 @@
 # Copyright (c) Facebook, Inc. and its affiliates.
 
 import copy
+import logging
+import os
 import random
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+import numpy as np
 import torch
 from mmf.common.registry import registry
 from mmf.common.sample import Sample, SampleList
 from mmf.datasets.processors.processors import BaseProcessor
+from mmf.datasets.processors.tokenized_store import TokenizedTextStore
+from mmf.utils.file_io import PathManager
+from mmf.utils.general import get_absolute_path
+from omegaconf import OmegaConf
 from transformers.tokenization_auto import AutoTokenizer
 
 
+logger = logging.getLogger(__name__)
+
+
 @registry.register_processor("masked_token")
 class MaskedTokenProcessor(BaseProcessor):
     _CLS_TOKEN = "[CLS]"
@@ -174,9 +184,62 @@ class MaskedTokenProcessor(BaseProcessor):
 
 @registry.register_processor("bert_tokenizer")
 class BertTokenizer(MaskedTokenProcessor):
+    """Tokenizes ``text`` (or ``text_a``, ``tokens``) and optionally ``text_b``.
+
+    ``tokenized_store`` can point to a store written by
+    ``tools/scripts/bert/pretokenize_questions.py``, texts found in it (by
+    ``question_id`` of the item, or by text) are not tokenized again.
+    """
+
     def __init__(self, config, *args, **kwargs):
         super().__init__(config, *args, **kwargs)
         self._probability = config.get("mask_probability", 0)
+        self._store = self._load_tokenized_store(config, kwargs.get("data_dir", None))
+
+    def tokenized_store_meta(self, config) -> Dict[str, Any]:
+        return {
+            "tokenizer_config": OmegaConf.to_container(
+                config.tokenizer_config, resolve=True
+            ),
+            "max_seq_length": self._max_seq_length,
+        }
+
+    def _load_tokenized_store(self, config, data_dir=None):
+        path = config.get("tokenized_store", None)
+        if not path:
+            return None
+        if not PathManager.exists(path) and data_dir is not None:
+            path = get_absolute_path(os.path.join(data_dir, path))
+        if not PathManager.exists(path):
+            logger.warning(f"Tokenized store {path} not found, tokenizing live")
+            return None
+
+        store = TokenizedTextStore(path)
+        meta = self.tokenized_store_meta(config)
+        if self._probability > 0 or any(
+            store.meta.get(key) != value for key, value in meta.items()
+        ):
+            logger.warning(
+                f"Tokenized store {path} was written for {store.meta}, which "
+                + "does not match this tokenizer or masking is used, tokenizing live"
+            )
+            return None
+        logger.info(f"Using tokenized store {path} with {len(store)} texts")
+        return store
+
+    def _from_input_ids(self, input_ids: np.ndarray) -> Dict[str, Any]:
+        length = len(input_ids)
+        tokens = self._convert_ids_to_tokens(input_ids.tolist())
+        output = {
+            "input_ids": torch.zeros(self._max_seq_length, dtype=torch.long),
+            "input_mask": torch.zeros(self._max_seq_length, dtype=torch.long),
+            "segment_ids": torch.zeros(self._max_seq_length, dtype=torch.long),
+            "lm_label_ids": torch.full((self._max_seq_length,), -1, dtype=torch.long),
+            "tokens": tokens,
+        }
+        output["input_ids"][:length] = torch.from_numpy(input_ids.astype(np.int64))
+        output["input_mask"][:length] = 1
+        return output
 
     def __call__(self, item: Dict[str, Any]):
         if "text" in item:
@@ -189,6 +252,13 @@ class BertTokenizer(MaskedTokenProcessor):
         if isinstance(text_a, list):
             text_a = " ".join(text_a)
 
+        if self._store is not None and not item.get("text_b", None):
+            input_ids = self._store.get(text_a, item.get("question_id", None))
+            if input_ids is not None:
+                output = self._from_input_ids(input_ids)
+                output["text"] = output["tokens"]
+                return output
+
         tokens_a = self.tokenize(text_a)
 
         # 'text_b' can be defined in the dataset preparation
@@ -101,6 +101,33 @@ class GrayScaleTo3Channels(BaseProcessor):
         return x
 
 
+@registry.register_processor("ToUInt8Tensor")
+class ToUInt8Tensor(BaseProcessor):
+    """Converts a PIL image to an uint8 tensor of shape (H, W, 3), instead of
+    a float tensor like ToTensor. Meant to be the last transform run in the
+    dataloader workers, uint8 batches are 4 times smaller to send to the main
+    process. ``NormalizeBGR255`` then converts and normalizes whole batches on
+    the device, see ``datasets/okvqa/uint8_images.yaml``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        return
+
+    def __call__(self, x):
+        if isinstance(x, collections.abc.Mapping):
+            x = x["image"]
+            return {"image": self.transform(x)}
+        else:
+            return self.transform(x)
+
+    def transform(self, x):
+        x = np.array(x, dtype=np.uint8)
+        # Handle grayscale, tile 3 times
+        if x.ndim == 2:
+            x = np.repeat(x[:, :, None], 3, axis=2)
+        return torch.from_numpy(x)
+
+
 @registry.register_processor("ResizeShortest")
 class ResizeShortest(BaseProcessor):
     def __init__(self, *args, **kwargs):
@@ -160,15 +187,21 @@ class NormalizeBGR255(BaseProcessor):
 
     def __call__(self, image):
         #image = self.convert_to_tensor(image)
+        if image.dtype == torch.uint8:
+            # (N, H, W, 3) batches or single images from ToUInt8Tensor, scaled
+            # as ToTensor does
+            image = image.movedim(-1, -3).float().div(255)
         if self.to_bgr255:
-            image = image[[2, 1, 0]] * 255
+            image = image[..., [2, 1, 0], :, :] * 255
         image = transforms.functional.normalize(image, mean=self.mean, std=self.std)
         if self.pad_size > 0:
             assert (
-                self.pad_size >= image.shape[1] and self.pad_size >= image.shape[2]
+                self.pad_size >= image.shape[-2] and self.pad_size >= image.shape[-1]
             ), f"image size: {image.shape}"
-            padded_image = image.new_zeros(3, self.pad_size, self.pad_size)
-            padded_image[:, : image.shape[1], : image.shape[2]] = image.clone()
+            padded_image = image.new_zeros(
+                *image.shape[:-2], self.pad_size, self.pad_size
+            )
+            padded_image[..., : image.shape[-2], : image.shape[-1]] = image.clone()
 
             return padded_image
         return image
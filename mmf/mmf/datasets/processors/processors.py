@@ -950,6 +950,33 @@ class GraphVQAAnswerProcessor(BaseProcessor):
         return tokens
 
 
+@registry.register_processor("numberbatch")
+class NumberbatchProcessor(BaseProcessor):
+    """Embeds the question and the annotator answers with Numberbatch, so that the
+    concept matching and lookups run in the dataloader workers instead of in the
+    model's forward. Takes in a dict with "tokens" (or "text") and optionally
+    "answers". Params are the same as for the numberbatch graph encoder,
+    i.e. "filepath" and "max_seq_length".
+
+    Returns:
+        Dict: with "graph_embedding" and, if answers were passed,
+        "avg_embedded_answers", both l2 normalized tensors of numberbatch dim.
+    """
+
+    def __init__(self, config, *args, **kwargs):
+        from mmf.modules.graphnetwork import Numberbatch
+
+        # load before the dataloader workers are forked, so they share it
+        self.numberbatch = Numberbatch(config).load()
+
+    def __call__(self, item):
+        tokens = item["tokens"] if "tokens" in item else item["text"]
+        output = {"graph_embedding": self.numberbatch.embed(tokens)}
+        if "answers" in item:
+            output["avg_embedded_answers"] = self.numberbatch.embed(item["answers"])
+        return output
+
+
 @registry.register_processor("multi_hot_answer_from_vocab")
 class MultiHotAnswerFromVocabProcessor(VQAAnswerProcessor):
     def __init__(self, config, *args, **kwargs):
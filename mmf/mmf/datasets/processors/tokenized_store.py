@@ -0,0 +1,104 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+"""
+Store of pre-tokenized texts, so that texts which never change (e.g. the
+questions of a dataset) are tokenized once instead of on every epoch.
+
+The token ids of all texts are concatenated in one int array, which is memory
+mapped and thereby shared by the dataloader workers. Texts are looked up by
+question id, with the hash of the text to catch changed annotations, or only
+by their text::
+
+    TokenizedTextStore.write(path, input_ids, texts, question_ids, meta)
+    store = TokenizedTextStore(path)
+    store.get("what is in the image?", question_id=5)  # array of ids or None
+
+Written by ``tools/scripts/bert/pretokenize_questions.py`` and used by the
+``bert_tokenizer`` processor through its ``tokenized_store`` param.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from mmf.utils.file_io import PathManager
+
+
+class TokenizedTextStore:
+    def __init__(self, path: str):
+        self.path = path
+        with PathManager.open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+
+        self.input_ids = self._load("input_ids")
+        self.offsets = self._load("offsets")
+        self.text_hashes = self._load("text_hashes")
+        question_ids = self._load("question_ids")
+
+        self._by_question_id = {
+            int(question_id): row for row, question_id in enumerate(question_ids)
+        }
+        self._by_text_hash = {
+            int(text_hash): row for row, text_hash in enumerate(self.text_hashes)
+        }
+
+    def _load(self, name: str) -> np.ndarray:
+        local_path = PathManager.get_local_path(os.path.join(self.path, f"{name}.npy"))
+        return np.load(local_path, mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self.text_hashes)
+
+    @staticmethod
+    def text_hash(text: str) -> int:
+        digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little", signed=True)
+
+    def get(self, text: str, question_id: Any = None) -> Optional[np.ndarray]:
+        """Token ids (including the special tokens) of ``text``, None if it
+        is not in the store"""
+        text_hash = self.text_hash(text)
+        row = None
+        if question_id is not None:
+            row = self._by_question_id.get(int(question_id))
+        if row is None or self.text_hashes[row] != text_hash:
+            row = self._by_text_hash.get(text_hash)
+        if row is None:
+            return None
+        return self.input_ids[self.offsets[row] : self.offsets[row + 1]]
+
+    @staticmethod
+    def write(
+        path: str,
+        input_ids: Sequence[List[int]],
+        texts: Sequence[str],
+        question_ids: Sequence[int],
+        meta: Dict[str, Any],
+    ):
+        """Writes the unpadded ``input_ids`` of ``texts`` to ``path``. ``meta``
+        describes the tokenizer, the store is only used by tokenizers with
+        the same meta."""
+        PathManager.mkdirs(path)
+        lengths = np.array([len(ids) for ids in input_ids], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        flat_ids = np.fromiter(
+            (i for ids in input_ids for i in ids), dtype=np.int64, count=offsets[-1]
+        )
+        # uint16 covers the vocabularies of BERT like tokenizers
+        dtype = np.uint16 if flat_ids.max(initial=0) < 2 ** 16 else np.int32
+
+        arrays = {
+            "input_ids": flat_ids.astype(dtype),
+            "offsets": offsets,
+            "text_hashes": np.array(
+                [TokenizedTextStore.text_hash(text) for text in texts], dtype=np.int64
+            ),
+            "question_ids": np.asarray(question_ids, dtype=np.int64),
+        }
+        for name, array in arrays.items():
+            with PathManager.open(os.path.join(path, f"{name}.npy"), "wb") as f:
+                np.save(f, array)
+        with PathManager.open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({**meta, "num_texts": len(texts)}, f, indent=4)
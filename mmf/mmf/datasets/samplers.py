@@ -0,0 +1,97 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+import math
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+import torch
+from mmf.utils.distributed import get_rank, get_world_size
+
+
+class LengthBucketBatchSampler(torch.utils.data.Sampler):
+    """Batch sampler which groups samples of similar (text) length, so that
+    batches can be trimmed to their longest sequence with little padding.
+
+    When shuffling, the indices are shuffled and split into pools of
+    ``batch_size * bucket_size_multiplier`` samples, each pool is sorted by
+    length and cut into batches, and the order of all batches is shuffled
+    again. Without shuffling the whole dataset is sorted by length.
+
+    In distributed mode, every replica gets every ``num_replicas``-th batch,
+    all replicas get the same number of batches.
+
+    Args:
+        lengths (Sequence[int]): Length of each sample in the dataset
+        batch_size (int): Number of samples per batch
+        shuffle (bool): Whether to shuffle, reshuffled by ``set_epoch``
+        drop_last (bool): Whether to drop the last incomplete batch
+        bucket_size_multiplier (int): Batches per pool that is sorted by length
+        seed (int): Seed of the shuffling, must be the same on all replicas
+    """
+
+    def __init__(
+        self,
+        lengths: Sequence[int],
+        batch_size: int,
+        shuffle: bool = True,
+        drop_last: bool = False,
+        bucket_size_multiplier: int = 100,
+        seed: int = 0,
+        num_replicas: Optional[int] = None,
+        rank: Optional[int] = None,
+    ):
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.bucket_size = batch_size * bucket_size_multiplier
+        self.seed = seed
+        self.epoch = 0
+        # reshuffles between iterations even if set_epoch is not called
+        self._iteration = 0
+        self.num_replicas = get_world_size() if num_replicas is None else num_replicas
+        self.rank = get_rank() if rank is None else rank
+
+    def set_epoch(self, epoch: int):
+        self.epoch = epoch
+
+    def _batches(self) -> List[np.ndarray]:
+        if not self.shuffle:
+            order = np.argsort(self.lengths, kind="stable")
+            return self._split(order)
+
+        random_state = np.random.RandomState([self.seed, self.epoch, self._iteration])
+        indices = random_state.permutation(len(self.lengths))
+        batches = []
+        for start in range(0, len(indices), self.bucket_size):
+            bucket = indices[start : start + self.bucket_size]
+            bucket = bucket[np.argsort(self.lengths[bucket], kind="stable")]
+            batches.extend(self._split(bucket))
+        return [batches[i] for i in random_state.permutation(len(batches))]
+
+    def _split(self, indices: np.ndarray) -> List[np.ndarray]:
+        batches = [
+            indices[start : start + self.batch_size]
+            for start in range(0, len(indices), self.batch_size)
+        ]
+        if self.drop_last and len(batches[-1]) < self.batch_size:
+            batches = batches[:-1]
+        return batches
+
+    def __iter__(self) -> Iterator[List[int]]:
+        batches = self._batches()
+        self._iteration += 1
+        # every replica iterates over the same number of batches
+        num_batches = len(self) * self.num_replicas
+        batches = (batches * math.ceil(num_batches / max(len(batches), 1)))[
+            :num_batches
+        ]
+        for batch in batches[self.rank :: self.num_replicas]:
+            yield batch.tolist()
+
+    def __len__(self) -> int:
+        if self.drop_last:
+            num_batches = len(self.lengths) // self.batch_size
+        else:
+            num_batches = math.ceil(len(self.lengths) / self.batch_size)
+        return math.ceil(num_batches / self.num_replicas)
@@ -1,26 +1,50 @@
 # Copyright (c) Facebook, Inc. and its affiliates.
-# isort:skip_file
-
-from .albef.vit import AlbefVitEncoder
-from .ban import BAN
-from .base_model import BaseModel
-from .butd import BUTD
-from .cnn_lstm import CNNLSTM
-from .fusions import FusionBase, ConcatBERT, ConcatBoW, LateFusion
-from .lorra import LoRRA
-from .m4c import M4C
-from .m4c_captioner import M4CCaptioner
-from .mmbt import MMBT, MMBTForClassification, MMBTForPreTraining
-from .mmf_transformer import MMFTransformer
-from .pythia import Pythia
-from .top_down_bottom_up import TopDownBottomUp
-from .unimodal import UnimodalBase, UnimodalText, UnimodalModal
-from .uniter import UNITER
-from .vilbert import ViLBERT
-from .vilt import ViLT
-from .vinvl import VinVL
-from .visual_bert import VisualBERT
-from .qlarifais import Qlarifais
+import importlib
+
+
+# Models are imported on first access, so that e.g. ``from mmf.models import
+# Qlarifais`` does not import every other model and its dependencies
+_LAZY_IMPORTS = {
+    "AlbefVitEncoder": "albef.vit",
+    "BAN": "ban",
+    "BaseModel": "base_model",
+    "BUTD": "butd",
+    "CNNLSTM": "cnn_lstm",
+    "FusionBase": "fusions",
+    "ConcatBERT": "fusions",
+    "ConcatBoW": "fusions",
+    "LateFusion": "fusions",
+    "LoRRA": "lorra",
+    "M4C": "m4c",
+    "M4CCaptioner": "m4c_captioner",
+    "MMBT": "mmbt",
+    "MMBTForClassification": "mmbt",
+    "MMBTForPreTraining": "mmbt",
+    "MMFTransformer": "mmf_transformer",
+    "Pythia": "pythia",
+    "TopDownBottomUp": "top_down_bottom_up",
+    "UnimodalBase": "unimodal",
+    "UnimodalText": "unimodal",
+    "UnimodalModal": "unimodal",
+    "UNITER": "uniter",
+    "ViLBERT": "vilbert",
+    "ViLT": "vilt",
+    "VinVL": "vinvl",
+    "VisualBERT": "visual_bert",
+    "Qlarifais": "qlarifais",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(f"{__name__}.{_LAZY_IMPORTS[name]}")
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
+
 
 __all__ = [
     "TopDownBottomUp",
@@ -49,5 +73,5 @@ __all__ = [
     "ViLT",
     "UNITER",
     "VinVL",
-    "Qlarifais"
+    "Qlarifais",
 ]
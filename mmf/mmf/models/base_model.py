@@ -48,6 +48,7 @@ from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Union
 
 import pytorch_lightning as pl
+import torch
 from mmf.common.registry import registry
 from mmf.common.report import Report
 from mmf.common.sample import SampleList, to_device
@@ -56,8 +57,9 @@ from mmf.utils.checkpoint import load_pretrained_model
 from mmf.utils.checkpoint_updater import MMFToPLCheckpointUpdater
 from mmf.utils.download import download_pretrained_model
 from mmf.utils.file_io import PathManager
-from mmf.utils.general import get_current_device
+from mmf.utils.general import get_current_device, is_cpu_autocast_enabled
 from mmf.utils.logger import log_class_usage
+from mmf.utils.profiling import span
 from omegaconf import MISSING, DictConfig, OmegaConf
 
 
@@ -318,6 +320,13 @@ class BaseModel(pl.LightningModule):
             model_output, collections.abc.Mapping
         ), "A dict must be returned from the forward of the model."
 
+        cpu_autocast = is_cpu_autocast_enabled()
+        if cpu_autocast:
+            # losses and metrics use the bfloat16 outputs of the model in fp32
+            for key, value in model_output.items():
+                if torch.is_tensor(value) and value.dtype == torch.bfloat16:
+                    model_output[key] = value.float()
+
         if "losses" in model_output:
             if not self._logged_warning["losses_present"]:
                 warnings.warn(
@@ -330,7 +339,12 @@ class BaseModel(pl.LightningModule):
                 model_output["losses"], collections.abc.Mapping
             ), "'losses' must be a dict."
         elif hasattr(self, "losses"):
-            model_output["losses"] = self.losses(sample_list, model_output)
+            with span("loss"):
+                if cpu_autocast:
+                    with torch.autocast(device_type="cpu", enabled=False):
+                        model_output["losses"] = self.losses(sample_list, model_output)
+                else:
+                    model_output["losses"] = self.losses(sample_list, model_output)
         else:
             model_output["losses"] = {}
 
@@ -380,6 +394,8 @@ class BaseModel(pl.LightningModule):
 
         instance = cls(config)
         instance.is_pretrained = True
+        # config of the whole run the checkpoint comes from, e.g. its processors
+        instance.pretrained_full_config = full_config
         instance.build()
         incompatible_keys = instance.load_state_dict(checkpoint, strict=False)
 
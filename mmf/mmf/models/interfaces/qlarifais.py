@@ -7,16 +7,17 @@ import os
 import tempfile
 import pandas as pd
 from pathlib import Path
-from typing import Type, Union
+from typing import Dict, List, Optional, Type, Union
 
 import pdb
 import torch
-import torchvision.datasets.folder as tv_helpers
 from omegaconf import DictConfig
 from mmf.common.sample import Sample, SampleList
 from mmf.models.base_model import BaseModel
+from mmf.modules.encoders import pack_regions
 from mmf.utils.build import build_processors
 from mmf.utils.download import download
+from mmf.utils.encoder_cache import EncoderCache, content_hash
 from PIL import Image
 from torch import nn
 
@@ -25,18 +26,52 @@ ImageType = Union[Type[Image.Image], str]
 PathType = Union[Type[Path], str]
 BaseModelType = Type[BaseModel]
 
+# memory limits of the encoder caches, see QlarifaisInterface.encode
+DEFAULT_ENCODER_CACHE_MB = {"image": 1024, "question": 64, "graph": 16}
+
 
 class QlarifaisInterface(nn.Module):
-    def __init__(self, model: BaseModelType, config: DictConfig, path_to_torch_cache: str):
+    def __init__(
+        self,
+        model: BaseModelType,
+        config: DictConfig,
+        path_to_torch_cache: str,
+        encoder_cache_mb: Optional[Dict[str, float]] = None,
+    ):
         super().__init__()
         self.model = model
         self.config = config
         self.path_to_torch_cache = path_to_torch_cache
         self.init_processors()
+        self.encoder_cache = EncoderCache(
+            {**DEFAULT_ENCODER_CACHE_MB, **(encoder_cache_mb or {})}
+        )
+        self._cache_device = None
 
     def forward(self, *args, **kwargs):
         return self.model(*args, **kwargs)
 
+    def fold_for_inference(self):
+        """See ``Qlarifais.fold_for_inference``"""
+        self.model.fold_for_inference()
+        self.encoder_cache.clear()
+        return self
+
+    def optimize_for_cpu(self, *args, **kwargs):
+        """See ``Qlarifais.optimize_for_cpu``"""
+        self.model.optimize_for_cpu(*args, **kwargs)
+        self.encoder_cache.clear()
+        return self
+
+    def load_state_dict(self, *args, **kwargs):
+        self.encoder_cache.clear()
+        return super().load_state_dict(*args, **kwargs)
+
+    def _apply(self, fn, *args, **kwargs):
+        # .to(), .cuda(), .half() etc. change the outputs of the encoders
+        self.encoder_cache.clear()
+        return super()._apply(fn, *args, **kwargs)
+
     def init_processors(self):
         config = self.config.dataset_config.okvqa 
         
@@ -48,6 +83,15 @@ class QlarifaisInterface(nn.Module):
         extra_params = {"data_dir": data_dir.as_posix()}
         self.processor_dict = build_processors(config.processors, **extra_params)
 
+        if "batch_image_processor" in self.processor_dict:
+            # models trained on uint8 images, which the dataset normalizes per
+            # batch, normalize each image here
+            image_processor = self.processor_dict["image_processor"]
+            batch_image_processor = self.processor_dict.pop("batch_image_processor")
+            self.processor_dict["image_processor"] = lambda image: batch_image_processor(
+                image_processor(image)
+            )
+
     def classify(
         self,
         image: ImageType,
@@ -68,25 +112,33 @@ class QlarifaisInterface(nn.Module):
         Returns:
             {"label": '1930s', "confidence": 0.56}
         """
-        sample = Sample()
+        answer = self.processor_dict["answer_processor"]
 
-        self.image_tensor = image = self.processor_dict["image_processor"](image).unsqueeze(0)
-        self.image_tensor.requires_grad_(True)
+        if explain:
+            # explainers need the gradients w.r.t. the image, i.e. a full forward
+            sample = Sample()
 
-        self.text = text = self.processor_dict["text_processor"]({"text": text})
-        answer = self.processor_dict["answer_processor"]
+            self.image_tensor = image = self.processor_dict["image_processor"](image).unsqueeze(0)
+            self.image_tensor.requires_grad_(True)
 
-        sample.image = self.image_tensor.squeeze(0)
-        sample.text = text["text"]
-        
-        if "input_ids" in text:
-            sample.update(text)
+            self.text = text = self.processor_dict["text_processor"]({"text": text})
 
-        sample_list = SampleList([sample])
-        sample_list = sample_list.to(next(self.model.parameters()).device)
-        sample_list['answers'] = 'empty'    
-        
-        output = self.model(sample_list)
+            sample.image = self.image_tensor.squeeze(0)
+            sample.text = text["text"]
+
+            if "input_ids" in text:
+                sample.update(text)
+
+            sample_list = SampleList([sample])
+            sample_list = sample_list.to(next(self.model.parameters()).device)
+            sample_list['answers'] = 'empty'
+
+            output = self.model(sample_list)
+
+        else:
+            # only the head runs for images and questions seen before
+            with torch.no_grad():
+                output = self.model.forward_head(self.encode([image], [text]))
         
         if embedding_output:
             return output['scores']
@@ -109,4 +161,150 @@ class QlarifaisInterface(nn.Module):
             else:
                 confidence, index = torch.max(scores, dim=1)
                 return {"label": index.item(), "confidence": confidence.item()}
+
+    @torch.no_grad()
+    def encode(self, images: List[ImageType], texts: List[str]):
+        """Features of (image, question) pairs as ``Qlarifais.extract_features``
+        returns them, for the head. Image features are cached by the content of
+        the image, question and Numberbatch features by the tokenized question,
+        so the frozen encoders only run for inputs that were not seen recently.
+        See ``encoder_cache.stats()`` for hit and miss counts.
+
+        The cache is cleared when the model changes through the interface
+        (``to``, ``load_state_dict``, ``fold_for_inference``,
+        ``optimize_for_cpu``). Call ``encoder_cache.clear()`` after changing
+        ``self.model`` directly.
+        """
+        features = self.encode_images(images)
+        device = next(self.model.parameters()).device
+        texts = [self.processor_dict["text_processor"]({"text": text}) for text in texts]
+
+        def encode_questions(input_ids):
+            return list(self.model.encode_question(torch.stack(input_ids).to(device)))
+
+        features["question"] = torch.stack(
+            self._encode_cached(
+                "question",
+                [tuple(text["input_ids"].tolist()) for text in texts],
+                [text["input_ids"] for text in texts],
+                encode_questions,
+            )
+        )
+
+        if self.model.config.graph_encoder.use:
+            features["graph"] = torch.stack(
+                self._encode_cached(
+                    "graph",
+                    [tuple(text["tokens"]) for text in texts],
+                    [text["tokens"] for text in texts],
+                    lambda tokens: list(self.model.graph_encoder(tokens)),
+                )
+            ).to(device)
+        return features
+
+    @torch.no_grad()
+    def encode_images(self, images: List[ImageType]):
+        """The "image" (and "image_mask") features of ``encode``, cached by the
+        content of the images"""
+        device = next(self.model.parameters()).device
+        if device != self._cache_device:
+            # e.g. after self.model.to(device)
+            self.encoder_cache.clear()
+            self._cache_device = device
+
+        def encode_fn(images):
+            image_tensor = torch.stack(
+                [self.processor_dict["image_processor"](image) for image in images]
+            )
+            image_features = self.model.vision_module(image_tensor.to(device))
+            if isinstance(image_features, tuple):
+                # region features are stored without their padding
+                return [
+                    (regions[mask], mask[mask]) for regions, mask in zip(*image_features)
+                ]
+            return list(image_features)
+
+        features = {}
+        image_features = self._encode_cached(
+            "image", [content_hash(image) for image in images], images, encode_fn
+        )
+        if isinstance(image_features[0], tuple):
+            features["image"], features["image_mask"] = pack_regions(
+                [regions for regions, _ in image_features]
+            )
+        else:
+            features["image"] = torch.stack(image_features)
+        return features
+
+    def _encode_cached(self, name, keys, inputs, encode_fn):
+        # runs `encode_fn` once on the inputs of all (unique) cache misses
+        entries, missing = {}, {}
+        for key, item in zip(keys, inputs):
+            if key in entries or key in missing:
+                continue
+            entry = self.encoder_cache.get(name, key)
+            if entry is None:
+                missing[key] = item
+            else:
+                entries[key] = entry
+
+        if len(missing) > 0:
+            for key, entry in zip(missing, encode_fn(list(missing.values()))):
+                self.encoder_cache.put(name, key, entry)
+                entries[key] = entry
+        return [entries[key] for key in keys]
+
+    def build_sample_list(self, images: List[ImageType], texts: List[str]):
+        """Processes (image, question) pairs into a batched SampleList"""
+        samples = []
+        for image, text in zip(images, texts):
+            sample = Sample()
+            sample.image = self.processor_dict["image_processor"](image)
+            text = self.processor_dict["text_processor"]({"text": text})
+            sample.text = text["text"]
+            if "input_ids" in text:
+                sample.update(text)
+            samples.append(sample)
+
+        sample_list = SampleList(samples)
+        sample_list = sample_list.to(next(self.model.parameters()).device)
+        sample_list["answers"] = "empty"
+        return sample_list
+
+    def classify_batch(
+        self,
+        images: List[ImageType],
+        texts: List[str],
+        top_k: int = 5,
+        embedding_output: bool = False,
+    ):
+        """Classifies a batch of (image, question) pairs in a single forward pass.
+
+        Args:
+            images (List[ImageType]): PIL images to be classified
+            texts (List[str]): Questions, one per image
+            top_k (int): Number of answers to return per question
+            embedding_output (bool): Also return the predicted answer embeddings
+
+        Returns:
+            List of {"answers": [...], "confidences": [...]} dicts, with an
+            additional "embedding" list if `embedding_output` is set.
+        """
+        answer = self.processor_dict["answer_processor"]
+
+        with torch.no_grad():
+            output = self.model.forward_head(self.encode(images, texts))
+        scores = nn.functional.softmax(output["prediction_scores"], dim=1)
+        confidences, indices = scores.topk(top_k, dim=1)
+
+        results = []
+        for idx in range(len(texts)):
+            result = {
+                "answers": [answer.idx2word(i) for i in indices[idx].tolist()],
+                "confidences": confidences[idx].tolist(),
+            }
+            if embedding_output:
+                result["embedding"] = output["scores"][idx].tolist()
+            results.append(result)
+        return results
             
\ No newline at end of file
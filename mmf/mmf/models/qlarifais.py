@@ -1,20 +1,33 @@
 
+import copy
+import logging
+import time
 import torch
-import numpy as np
 from pathlib import Path
 
-from omegaconf import OmegaConf
+from omegaconf import OmegaConf, open_dict
 from mmf.models.interfaces.qlarifais import QlarifaisInterface
 
 from mmf.models.base_model import BaseModel
 from mmf.common.registry import registry
-from mmf.utils.checkpoint import load_pretrained_model
 from mmf.utils.configuration import get_mmf_cache_dir, get_global_config
 from mmf.utils.text import *
 from mmf.utils.vocab import EmbeddedVocab
 import os
 
-from mmf.utils.general import get_current_device
+from mmf.utils.general import (
+    get_current_device,
+    reset_missing_parameters,
+    skip_init_weights,
+)
+from mmf.utils.profiling import span
+from mmf.utils.cpu_inference import (
+    fold_frozen_batchnorm,
+    fuse_linear_layers,
+    quantize_linear_layers,
+    remove_weight_norms,
+    to_channels_last,
+)
 
 from mmf.utils.build import (
     build_image_encoder,
@@ -27,6 +40,8 @@ from mmf.utils.build import (
 
 #from mmexp.methods import attention_map
 
+logger = logging.getLogger(__name__)
+
 '''
 mmf_run config='configs/experiments/ablation1/regions.yaml' model=qlarifais dataset=okvqa run_type=train_val
 
@@ -39,14 +54,59 @@ class Qlarifais(BaseModel):
     def __init__(self, config):
         super().__init__(config)
         self.global_config = get_global_config()
-        self.build()
+        # built by build_model or from_pretrained
 
     @classmethod
-    def from_pretrained(cls, model_name, path_to_torch_cache, *args, **kwargs):
+    def from_pretrained(cls, model_name, path_to_torch_cache, *args, cpu_inference=False, encoder_cache_mb=None, **kwargs):
+        tic = time.perf_counter()
         model = super().from_pretrained(model_name, *args, **kwargs)
-        config = load_pretrained_model(model_name)["full_config"]
+        if cpu_inference:
+            model.optimize_for_cpu()
+        config = model.pretrained_full_config
         OmegaConf.set_struct(config, True)
-        return QlarifaisInterface(model, config, path_to_torch_cache)
+        logger.info(f"Loaded {model_name} in {time.perf_counter() - tic:.1f}s")
+        return QlarifaisInterface(model, config, path_to_torch_cache, encoder_cache_mb=encoder_cache_mb)
+
+    def optimize_for_cpu(self, quantize=True, channels_last=True):
+        """Opt-in CPU inference profile, changes the model in place.
+
+        Linear layers of the text encoder, attention, fusion and classifier
+        are dynamically quantized to int8. The frozen batch norms of the
+        image backbone are folded into its convolutions and the backbone
+        runs channels-last. Not reversible, and only meant for inference.
+        """
+        self.to("cpu")
+        self.fold_for_inference()
+
+        if channels_last:
+            folded = fold_frozen_batchnorm(self.vision_module)
+            self.vision_module = to_channels_last(self.vision_module)
+            self.vision_module.channels_last = True
+            logger.info(f"Folded {folded} batch norms into the image backbone")
+
+        if quantize:
+            for name in ["language_module", "attention_module", "fusion_module", "classifier"]:
+                if hasattr(self, name):
+                    setattr(self, name, quantize_linear_layers(getattr(self, name)))
+        return self
+
+    def fold_for_inference(self):
+        """Folds the weight norms of the attention, fusion and classifier
+        layers into plain weights, so they are not recomputed on every forward
+        pass, and drops their dropouts (fusing the linear layers around them
+        where that is cheaper). Puts the model in eval mode, changes it in
+        place and is not reversible, so only use it for inference.
+        """
+        self.eval()
+        removed_norms, removed_layers = 0, 0
+        for name in ["attention_module", "fusion_module", "classifier"]:
+            if hasattr(self, name):
+                removed_norms += remove_weight_norms(getattr(self, name))
+                removed_layers += fuse_linear_layers(getattr(self, name))
+        logger.info(
+            f"Folded {removed_norms} weight norms and removed {removed_layers} layers"
+        )
+        return self
 
     @classmethod
     def config_path(cls):
@@ -63,86 +123,248 @@ class Qlarifais(BaseModel):
 
     def build(self):
 
-        # building general modules
-        self.vision_module = build_image_encoder(self.config.image_encoder)
-        self.language_module = build_text_encoder(self.config.text_encoder)
-        self.fusion_module = build_fusion_module(self.config.fusion)
-        self.classifier = build_classifier(self.config.classifier)
+        # building general modules, a checkpoint (from_pretrained) replaces
+        # the pretrained weights of the frozen encoders, so they are neither
+        # loaded nor randomly initialized
+        if getattr(self, "is_pretrained", False):
+            with skip_init_weights():
+                self.vision_module = build_image_encoder(self._random_init(self.config.image_encoder))
+                self.language_module = build_text_encoder(self._random_init(self.config.text_encoder))
+        else:
+            self.vision_module = build_image_encoder(self.config.image_encoder)
+            self.language_module = build_text_encoder(self.config.text_encoder)
 
-        # external knowledge
+        # external knowledge, numberbatch is loaded on first use
         self.graph_encoder = build_graph_encoder(self.config.graph_encoder)
 
-        # attention
-        if self.config.attention.use:
-            # initiating attention module
-            self.attention_module = build_attention_module(self.config.attention.params)
+        # trainable head (fusion, classifier and attention)
+        for name, module in self.build_head(self.config).items():
+            setattr(self, name, module)
 
         # initialized and used when generating predictions w.r.t. answer vocabulary
         self.answer_vocab = VocabDict(self.mmf_indirect(self.config.vocab_file))
-        self.embedded_answer_vocab = self.graph_encoder(self.answer_vocab.word_list)
+        self._embedded_answer_vocab = None
 
-    def forward(self, sample_list):
+    def load_state_dict(self, state_dict, *args, **kwargs):
+        incompatible_keys = super().load_state_dict(state_dict, *args, **kwargs)
+        if getattr(self, "is_pretrained", False):
+            # the encoders were built without initializing their weights, so
+            # weights missing from the checkpoint would be left uninitialized
+            missing = [
+                key
+                for key in incompatible_keys.missing_keys
+                if key.split(".")[0] in ["vision_module", "language_module"]
+            ]
+            if len(missing) > 0:
+                reset = reset_missing_parameters(self, missing)
+                logger.warning(f"Randomly initialized {reset}, missing from the checkpoint")
+        return incompatible_keys
+
+    @staticmethod
+    def _random_init(encoder_config):
+        # copy, so that the flag does not end up in the config of the model
+        encoder_config = copy.deepcopy(encoder_config)
+        with open_dict(encoder_config):
+            encoder_config.params.random_init = True
+        return encoder_config
 
+    @property
+    def embedded_answer_vocab(self):
+        # needs numberbatch, so only computed when it is used
+        if self._embedded_answer_vocab is None:
+            self._embedded_answer_vocab = self.graph_encoder(self.answer_vocab.word_list)
+        return self._embedded_answer_vocab
+
+    def build_head(self, config):
+        """Builds the trainable part of Qlarifais from a model config, i.e.
+        everything on top of the frozen text, image and graph encoders.
+
+        Returns:
+            nn.ModuleDict: with ``fusion_module``, ``classifier`` and, if
+            attention is used, ``attention_module``.
+        """
+        head = torch.nn.ModuleDict()
+        head["fusion_module"] = build_fusion_module(config.fusion)
+        head["classifier"] = build_classifier(config.classifier)
+        if config.attention.use:
+            # initiating attention module
+            head["attention_module"] = build_attention_module(config.attention.params)
+        return head
+
+    def encode_question(self, input_ids, input_mask=None, trim=True):
+        """CLS vector of the (padded) question token ids. With
+        ``text_encoder.trim_padding`` the padding is masked out in the
+        attention and, if ``trim`` is set, cut off to the longest question in
+        the batch, so the cost follows the actual question lengths.
+        """
+        if not self.config.text_encoder.get("trim_padding", False):
+            return self.language_module(input_ids)
+        if trim:
+            input_ids, input_mask = trim_padding(input_ids, input_mask)
+        elif input_mask is None:
+            input_mask = (input_ids != 0).long()
+        return self.language_module(input_ids, attention_mask=input_mask)
+
+    def extract_features(self, sample_list):
+        """Runs the frozen encoders. The output only depends on the inputs and
+        can therefore be reused across heads, e.g. when sweeping head configs.
+        """
+        features = {}
         # --- QUESTION EMBEDDINGS ---
         # text input features will be in "input_ids" key
-        question = sample_list["input_ids"]
-        # get the text and image features from the encoders
-        question_features = self.language_module(question)
+        with span("text_encoder"):
+            features["question"] = self.encode_question(sample_list["input_ids"], sample_list.get("input_mask"))
         # IMAGE FEATURES
-        image = sample_list["image"]
-        image_features = self.vision_module(image) # [batch_size, num_features, i_dim]
-
+        with span("image_encoder"):
+            image_features = self.vision_module(sample_list["image"]) # [batch_size, num_features, i_dim]
+        if isinstance(image_features, tuple):
+            # region features are packed with a mask of the actual regions
+            image_features, features["image_mask"] = image_features
+        features["image"] = image_features
 
         # --- GRAPH EMBEDDINGS ---
+        # precomputed in the dataloader workers if the dataset has a numberbatch processor
         if self.config.graph_encoder.use:
-            graph_features = self.graph_encoder(sample_list['tokens']) # [batch_size, g_dim]
+            if "graph_embedding" in sample_list:
+                features["graph"] = sample_list["graph_embedding"]
+            else:
+                with span("graph_features"):
+                    features["graph"] = self.graph_encoder(sample_list['tokens']) # [batch_size, g_dim]
+
+        # average embedded annotator answer for type contrastive loss
+        if "avg_embedded_answers" in sample_list:
+            features["avg_embedded_answers"] = sample_list["avg_embedded_answers"]
+        else:
+            with span("graph_features"):
+                features["avg_embedded_answers"] = self.graph_encoder(sample_list['answers'])
+        return features
 
+    def forward_head(self, features, head=None, config=None):
+        """Runs attention, fusion and classification on the output of
+        ``extract_features``. ``head`` and ``config`` default to the model's own
+        modules and config, but can be any head built by ``build_head``.
+        """
+        head = self if head is None else head
+        config = self.config if config is None else config
+
+        question_features = features["question"]
+        image_features = features["image"]
+        graph_features = features.get("graph")
+        # [batch_size, num_features], only for (padded) region features
+        image_mask = features.get("image_mask")
 
         # --- ATTENTION ---
-        if self.config.attention.use:
-            # getting correct input shape
-            #image_features = image_features.flatten(2,3).permute(0, 2, 1) # [batch_size, num_features, i_dim]
-            # extracting attention based on defined attention mechanism
-            if self.config.attention.type == 'question_guided':
-                attention = self.attention_module(image_features, question_features)
-            if self.config.attention.type == 'graph_guided':
-                attention = self.attention_module(image_features, graph_features)
-            if self.config.attention.type == 'question_graph_guided':
-                attention = self.attention_module(image_features, question_features, graph_features)
-            # attention: [batch_size, num_features, 1]
-            # weighted average of image features
-            image_features = attention * image_features
-            image_features = torch.nan_to_num(image_features, nan=0, neginf=0).sum(1)
-            
-            plot_attention = False
-            if plot_attention:
-                attention_map(image, attention)
-    
-        # if not using attention
-        else:
-            if self.config.image_encoder.resize == 'average_pooling':
-                # average pooling of K features of size 2048
-                image_features = image_features.mean(dim=1) # [batch_size, i_dim]
+        with span("attention"):
+            if config.attention.use:
+                # extracting attention based on defined attention mechanism
+                if config.attention.type == 'question_guided':
+                    attention = head.attention_module(image_features, question_features, mask=image_mask)
+                if config.attention.type == 'graph_guided':
+                    attention = head.attention_module(image_features, graph_features, mask=image_mask)
+                if config.attention.type == 'question_graph_guided':
+                    attention = head.attention_module(image_features, question_features, graph_features, mask=image_mask)
+                # attention: [batch_size, num_features, 1]
+                # weighted average of image features
+                image_features = (attention * image_features).sum(1)
+
+            # if not using attention
+            else:
+                if config.image_encoder.resize == 'average_pooling':
+                    # average pooling of K features of size 2048
+                    if image_mask is None:
+                        image_features = image_features.mean(dim=1) # [batch_size, i_dim]
+                    else:
+                        image_mask = image_mask.unsqueeze(-1).to(image_features.dtype)
+                        image_features = (image_features * image_mask).sum(1) / image_mask.sum(1).clamp(min=1)
 
         # --- FUSION ---
         # type of fusion based on inputs
-        if self.config.graph_encoder.use:
-            fused_features = self.fusion_module(image_features, question_features, graph_features)
-        else:
-            fused_features = self.fusion_module(image_features, question_features) # [batch_size, answer_vocab_dim/embedding_dim]
+        with span("fusion"):
+            if config.graph_encoder.use:
+                fused_features = head.fusion_module(image_features, question_features, graph_features)
+            else:
+                fused_features = head.fusion_module(image_features, question_features) # [batch_size, answer_vocab_dim/embedding_dim]
 
         # --- CLASSIFICATION ---
         # embeddings
-        logits = self.classifier(fused_features)
-        # average embedded annotator answer for type contrastive loss
-        avg_embedded_answers = self.graph_encoder(sample_list['answers'])
-        if self.config.classifier.output_type == 'embeddings':
-            logits = torch.nn.functional.normalize(logits)
-            prediction_scores = torch.nansum(logits.unsqueeze(dim=1) * self.embedded_answer_vocab, dim=2)
+        with span("classifier"):
+            logits = head.classifier(fused_features)
+        if config.classifier.output_type == 'embeddings':
+            with span("answer_scoring"):
+                logits = torch.nn.functional.normalize(logits)
+                prediction_scores = torch.nansum(logits.unsqueeze(dim=1) * self.embedded_answer_vocab, dim=2)
 
         else:
             prediction_scores = logits
 
-        output = {"scores": logits, "output_type": self.config.classifier.output_type,
-                  "avg_embedded_answers": avg_embedded_answers, 'prediction_scores': prediction_scores}
+        output = {"scores": logits, "output_type": config.classifier.output_type,
+                  "avg_embedded_answers": features.get("avg_embedded_answers"), 'prediction_scores': prediction_scores}
         return output
+
+    def forward(self, sample_list):
+        features = self.extract_features(sample_list)
+        return self.forward_head(features)
+
+    def export_torchscript(self, sample_list, path=None):
+        """Traces the inference forward into a TorchScript module with the
+        tensor-only signature of ``QlarifaisInference``. The answer vocabulary
+        is stored in the saved file as ``answers.txt`` so predictions can be
+        decoded without MMF::
+
+            extra_files = {"answers.txt": ""}
+            module = torch.jit.load(path, _extra_files=extra_files)
+            scores, prediction_scores = module(image, input_ids, graph)
+
+        Args:
+            sample_list (SampleList): example batch used for tracing, needs
+                ``image``, ``input_ids`` and, if the graph encoder is used, ``tokens``
+            path (str): if given, the traced module is saved here
+        """
+        module = QlarifaisInference(self).eval()
+        with torch.no_grad():
+            example_inputs = module.example_inputs(sample_list)
+            traced = torch.jit.trace(module, example_inputs, strict=False, check_trace=False)
+
+        if path is not None:
+            extra_files = {
+                "answers.txt": "\n".join(self.answer_vocab.word_list),
+                "output_type": self.config.classifier.output_type,
+            }
+            torch.jit.save(traced, path, _extra_files=extra_files)
+        return traced
+
+
+class QlarifaisInference(torch.nn.Module):
+    """Tensor-only inference wrapper around a built Qlarifais model, for export.
+
+    The Numberbatch graph encoder works on python strings and is therefore not
+    part of the module, the graph embedding of the question is an input instead.
+    Config branches are resolved when tracing and the training-only outputs
+    (e.g. ``avg_embedded_answers``) are dropped.
+    """
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+        self.use_graph = model.config.graph_encoder.use
+
+    def example_inputs(self, sample_list):
+        image = sample_list["image"]
+        input_ids = sample_list["input_ids"]
+        if self.use_graph:
+            graph = self.model.graph_encoder(sample_list["tokens"])
+        else:
+            graph = torch.zeros(image.size(0), 1, device=image.device)
+        return image, input_ids, graph
+
+    def forward(self, image, input_ids, graph):
+        image_features = self.model.vision_module(image)
+        # trimming to the longest question would be fixed when tracing
+        features = {"question": self.model.encode_question(input_ids, trim=False)}
+        if isinstance(image_features, tuple):
+            image_features, features["image_mask"] = image_features
+        features["image"] = image_features
+        if self.use_graph:
+            features["graph"] = graph
+        output = self.model.forward_head(features)
+        return output["scores"], output["prediction_scores"]
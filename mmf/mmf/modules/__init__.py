@@ -1,5 +1,13 @@
 # Copyright (c) Facebook, Inc. and its affiliates.
-import mmf.modules.losses
-import mmf.modules.metrics
-import mmf.modules.optimizers
-import mmf.modules.schedulers
+import importlib
+
+
+# Imported on first access, the registry imports them when a loss, metric,
+# optimizer or scheduler is looked up
+_LAZY_SUBMODULES = ["losses", "metrics", "optimizers", "schedulers"]
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -36,8 +36,16 @@ class DualOneWayTopDown(nn.Module):
         #self.norm = get_norm(config.norm)
         self.norm = nn.Softmax(dim=1) # todo with dim
 
-    def forward(self, i, q):
-        attention = self.norm(self.transform(self.fusion_module(i, q)))
+    def forward(self, i, q, mask=None):
+        attention = self.transform(self.fusion_module(i, q))
+        # padded regions are not attended to, images without any regions
+        # get no attention (instead of the nan of a softmax over -inf)
+        if mask is not None:
+            mask = mask.unsqueeze(-1)
+            attention = attention.masked_fill(~mask, torch.finfo(attention.dtype).min)
+            attention = self.norm(attention) * mask
+        else:
+            attention = self.norm(attention)
         # nan sum if some regions are nan because of padding, become 0 in softmax
         #attention = self.norm(torch.nan_to_num(self.transform(self.fusion_module(i, q)), nan=-np.inf))
 
@@ -57,9 +65,17 @@ class TripleOneWayTopDown(nn.Module):
         self.norm = nn.Softmax(dim=1)
 
 
-    def forward(self, i, q1, q2):
+    def forward(self, i, q1, q2, mask=None):
 
-        attention = self.norm(self.transform(self.fusion_module(i, q1, q2)))
+        attention = self.transform(self.fusion_module(i, q1, q2))
+        # padded regions are not attended to, images without any regions
+        # get no attention (instead of the nan of a softmax over -inf)
+        if mask is not None:
+            mask = mask.unsqueeze(-1)
+            attention = attention.masked_fill(~mask, torch.finfo(attention.dtype).min)
+            attention = self.norm(attention) * mask
+        else:
+            attention = self.norm(attention)
         #attention = nn.Softmax(torch.nan_to_num(self.transform(self.fusion_module(i, q1, q2)), nan=-np.inf), dim=1)
 
         return attention
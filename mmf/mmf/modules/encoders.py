@@ -8,13 +8,12 @@ from collections import OrderedDict
 from copy import deepcopy
 from dataclasses import asdict, dataclass
 from enum import Enum
-from typing import Any
+from typing import Any, List, Optional, Tuple
 import yaml
 
 import torch
 import torchvision
 from mmf.common.registry import registry
-from mmf.models.frcnn import GeneralizedRCNN
 from mmf.modules.embeddings import ProjectionEmbedding, TextEmbedding
 from mmf.modules.hf_layers import BertModelJit
 from mmf.modules.layers import Identity
@@ -48,7 +47,6 @@ try:
 except ImportError:
     pass
 
-import numpy as np
 logger = logging.getLogger()
 
 
@@ -514,6 +512,9 @@ class FRCNNImageEncoder(Encoder):
         pretrained_path: str = None
 
     def __init__(self, config: Config, *args, **kwargs):
+        # the FRCNN stack is large, only import it when it is used
+        from mmf.models.frcnn import GeneralizedRCNN
+
         super().__init__()
         self.config = config
         pretrained = config.get("pretrained", False)
@@ -549,10 +550,15 @@ class gfvqaImageEncoder(Encoder):
     @dataclass
     class Config(Encoder.Config):
         name: str = "grid_feats_vqa"
+        # region models only, keep the proposals with the highest objectness
+        max_regions: Optional[int] = None
+        # skip loading the pretrained weights, e.g. if a checkpoint supplies them
+        random_init: bool = False
 
     def __init__(self, config: Config, *args, **kwargs):
         super().__init__()
         self.config = config
+        self.max_regions = self.config.get("max_regions", None)
 
         # setting up config file for the defined model
         self.cfg = self.setup(args, self.config)
@@ -573,10 +579,13 @@ class gfvqaImageEncoder(Encoder):
 
         # activating the model
         self.grid_feats_vqa = build_model(self.cfg)
-        DetectionCheckpointer(self.grid_feats_vqa, save_dir=self.cfg.OUTPUT_DIR).resume_or_load(self.cfg.MODEL.WEIGHTS, resume=True)
+        if not self.config.get("random_init", False):
+            DetectionCheckpointer(self.grid_feats_vqa, save_dir=self.cfg.OUTPUT_DIR).resume_or_load(self.cfg.MODEL.WEIGHTS, resume=True)
         for param in self.grid_feats_vqa.parameters():
             param.requires_grad = False
 
+        # feed the backbone channels-last inputs, see mmf.utils.cpu_inference
+        self.channels_last = False
 
         #self.grid_feats_vqa.eval()
 
@@ -606,39 +615,75 @@ class gfvqaImageEncoder(Encoder):
         return cfg
 
 
+    def _backbone_input(self, tensor: torch.Tensor):
+        if self.channels_last:
+            return tensor.contiguous(memory_format=torch.channels_last)
+        return tensor
+
+    def _preprocess_batch(self, images: torch.Tensor):
+        # Same as preprocess_image for a batch of equally sized images, but
+        # without looping over the images, which also keeps it traceable
+        model = self.grid_feats_vqa
+        images = (images.to(model.device) - model.pixel_mean) / model.pixel_std
+        size_divisibility = model.backbone.size_divisibility
+        if size_divisibility > 1:
+            height, width = images.shape[-2:]
+            pad_height = (size_divisibility - height % size_divisibility) % size_divisibility
+            pad_width = (size_divisibility - width % size_divisibility) % size_divisibility
+            images = nn.functional.pad(images, (0, pad_width, 0, pad_height))
+        return images
+
     def forward(self, images: torch.Tensor, sizes: torch.Tensor = None):
 
         batch_size = len(images)
-        # constructing desired imput
-        inputs = [{"image": image} for image in images]
 
         #self.grid_feats_vqa.eval()
         #with inference_context(self.grid_feats_vqa):
 
         if self.type == 'grid':
-            images = self.grid_feats_vqa.preprocess_image(inputs) # Normalize, pad and batch the input images.
-            features = self.grid_feats_vqa.backbone(images.tensor) # features from backbone
+            if torch.is_tensor(images):
+                images = self._preprocess_batch(images)
+            else:
+                # Normalize, pad and batch the input images.
+                images = self.grid_feats_vqa.preprocess_image([{"image": image} for image in images]).tensor
+            features = self.grid_feats_vqa.backbone(self._backbone_input(images)) # features from backbone
             outputs = self.grid_feats_vqa.roi_heads.get_conv5_features(features) # [batch_size, i_dim, sqrt(max_features), sqrt(max_features)]
             outputs = outputs.flatten(2, 3).permute(0, 2, 1)  # [batch_size, num_features, i_dim]
 
         elif self.type == 'region':
+            # constructing desired imput
+            inputs = [{"image": image} for image in images]
             # compute features and proposals
             images = self.grid_feats_vqa.preprocess_image(inputs)
-            features = self.grid_feats_vqa.backbone(images.tensor)
+            features = self.grid_feats_vqa.backbone(self._backbone_input(images.tensor))
             proposals, _ = self.grid_feats_vqa.proposal_generator(images, features)
+            # keep the top-K proposals, which bounds the cost of the roi heads
+            if self.max_regions is not None:
+                proposals = [
+                    p[p.objectness_logits.topk(min(self.max_regions, len(p))).indices]
+                    for p in proposals
+                ]
             # pooled features and box predictions
             box_features, pooled_features_fc7, pooled_features_fc6 = self.grid_feats_vqa.roi_heads.get_roi_features(features, proposals)
             # chosen regions within each batch
             # getting the batch shape back
             set_proposals = [len(p) for p in proposals] # originally found boxes (split based on batch)
-            #accum = [sum(set_proposals[:i+1]) for i, j in enumerate(set_proposals[:-1])]
-            #pooled_features_fc7 = np.array(np.split(pooled_features_fc7.numpy(), accum, axis=0), dtype=object)
-            pooled_features_fc7 = torch.nn.utils.rnn.pad_sequence(list(torch.split(pooled_features_fc7, set_proposals)),
-                                                                  batch_first=True, padding_value=-np.inf)
-            outputs = pooled_features_fc7
+            # [batch_size, num_regions, i_dim] and [batch_size, num_regions]
+            outputs = pack_regions(torch.split(pooled_features_fc7, set_proposals))
         return outputs
 
 
+def pack_regions(regions: List[Tensor]) -> Tuple[Tensor, Tensor]:
+    """Pads per-image region features with zeros to the largest number of
+    regions in the batch. Returns the packed features together with a boolean
+    mask which is ``True`` for actual regions.
+    """
+    num_regions = torch.tensor([len(r) for r in regions], device=regions[0].device)
+    packed = torch.nn.utils.rnn.pad_sequence(list(regions), batch_first=True)
+    mask = torch.arange(packed.size(1), device=packed.device) < num_regions[:, None]
+    return packed, mask
+
+
 
 
 class TextEncoderTypes(Enum):
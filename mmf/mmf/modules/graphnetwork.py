@@ -43,6 +43,41 @@ class Graph_Module(nn.Module):
         return self.module(*args, **kwargs)
 
 
+# Numberbatch files are large, keep one copy per file per process, shared by
+# the graph encoder and the numberbatch processors of all datasets
+_numberbatch_cache = {}
+
+
+def load_numberbatch(filepath):
+    """Loads a numberbatch .txt file into a dict from word to a float32 tensor.
+
+    Returns:
+        (dict, int): the embeddings and their dimension
+    """
+    full_path = mmf_indirect(filepath)
+    if full_path in _numberbatch_cache:
+        return _numberbatch_cache[full_path]
+
+    print('Loading Numberbatch...')
+    numberbatch = {}
+    with open(full_path, 'rb') as f:
+
+        info = f.readlines(1)
+        lines, numberbatch_dim = (int(x) for x in info[0].decode('utf-8').strip("\n").split(" "))
+
+        for line in tqdm(f, total=lines):
+            l = line.decode('utf-8')
+            l = l.strip("\n")
+
+            # create tensor-dictionary
+            word = l.split(' ')[0]
+            numberbatch[word] = torch.tensor(list(map(float, l.split(' ')[1:])), dtype=torch.float32)
+    print('Finished loading Numberbatch.')
+
+    _numberbatch_cache[full_path] = (numberbatch, numberbatch_dim)
+    return numberbatch, numberbatch_dim
+
+
 class Numberbatch(nn.Module):
     """The generic class for graph networks
     Can be generically added to any other kind of network
@@ -53,53 +88,22 @@ class Numberbatch(nn.Module):
         self.config = config
 
         self.max_seq_length = self.config.max_seq_length
-        try:
-            if self.numberbatch == dict():
-                pass
-        except AttributeError:
-            self.device = get_current_device()
+        self.device = get_current_device()
+        # parsing the file takes long, it is loaded on first use
+        self._numberbatch = None
 
-            # todo: write that we are loading and have finished loading numberbatch
-
-            #self.numberbatch_dim = self.config.g_dim
-
-
-            print('Loading Numberbatch...')
-            '''
-            # path to saved pickle
-            #numberbatch_file = os.path.join('/'.join(self.config.filepath.split('/')[:-1]), 'numberbatch.pkl')
-            #full_path = mmf_indirect(numberbatch_file)
-            if os.path.exists(full_path):
-                file = open(full_path, "rb")
-                self.numberbatch = pickle.load(file)
-                file.close()
-                #self.numberbatch = np.load(full_path, allow_pickle=True).item()
-            # opening as .txt file
-            else:
-            '''
-            self.numberbatch = {}
+    def load(self):
+        if self._numberbatch is None:
+            self._numberbatch = load_numberbatch(self.config.filepath)
+        return self
 
-            with open(mmf_indirect(self.config.filepath), 'rb') as f:
+    @property
+    def numberbatch(self):
+        return self.load()._numberbatch[0]
 
-                info = f.readlines(1)
-                lines, self.numberbatch_dim = (int(x) for x in info[0].decode('utf-8').strip("\n").split(" "))
-
-                for line in tqdm(f, total=lines):
-                    l = line.decode('utf-8')
-                    l = l.strip("\n")
-
-                    # create tensor-dictionary
-                    word = l.split(' ')[0]
-                    #tensor = torch.tensor(list(map(float, l.split(' ')[1:])), dtype=torch.float32)
-                    tensor = torch.tensor(list(map(float, l.split(' ')[1:])), dtype=torch.float32)
-                    self.numberbatch[word] = tensor
-                #print('Saving Numberbatch as .npy file')
-                #file = open(full_path, "wb")
-                #pickle.dump(self.numberbatch, file)
-                #file.close()
-                #np.save(full_path, self.numberbatch)
-
-        print('Finished loading Numberbatch.')
+    @property
+    def numberbatch_dim(self):
+        return self.load()._numberbatch[1]
 
 
     def conceptualize(self, tokenized_sentence):
@@ -130,45 +134,39 @@ class Numberbatch(nn.Module):
 
         return concepts_found
 
+    def embed(self, tokens):
+        """Embedding of a single question or answer list: the l2 normalized mean
+        of the numberbatch embeddings of its concepts, zeros if it has none.
+
+        Input:
+        tokens (str or list): string or (bert) tokens
+
+        Output:
+        embedding (torch.Tensor): [numberbatch_dim] on cpu
+        """
+        # if input is a string it needs tokenization
+        if type(tokens) == str: # i.e. text is not tokenized
+            tokens = tokens.split(' ')
+        else:
+            tokens = list(tokens)
+
+        # if bert has tokenized the text
+        if '[SEP]' in tokens:
+            tokens.remove('[CLS]')
+            tokens.remove('[SEP]')
+
+        concepts = self.conceptualize(tokens)[:self.max_seq_length]
+        if len(concepts) == 0:
+            return torch.zeros(self.numberbatch_dim)
+
+        # average embeddings and apply l2 norm to get a unit vector
+        embedding = torch.stack([self.numberbatch[concept] for concept in concepts]).mean(0)
+        return F.normalize(embedding, dim=0)
 
     def forward(self, text):
         # input can be batch with list containing tokens or list of strings
-
-        batch_size = len(text)
-        # initializing graph embeddings
-        X = torch.ones((batch_size, self.numberbatch_dim, self.max_seq_length))
-        # todo: write other than batch?
-        # looping tokens for each batch
-        for batch, tokens in enumerate(text):
-            # if input is a string it needs tokenization
-            if type(tokens) == str: # i.e. text is not tokenized
-                tokens = tokens.split(' ') #
-
-            # if bert has tokenized the text
-            if '[CLS]' and '[SEP]' in tokens:
-                tokens.remove('[CLS]')
-                tokens.remove('[SEP]')
-
-            tokens = self.conceptualize(tokens) # if bert has tokenized
-            # set to nan values as default
-            X[batch] *= np.nan
-
-            # if no token found create one empty numberbatch embedding
-            if tokens == []:
-                X[batch][:,0] = torch.zeros(self.numberbatch_dim)
-
-            for i, token in enumerate(tokens):
-                # check if token is present in numberbatch
-                try:
-                    # extrach embeddings
-                    X[batch][:, i] = self.numberbatch[token]
-                except KeyError:
-                    pass
-        # average embeddings
-        X = torch.from_numpy(np.nanmean(X, axis=2)).to(get_current_device())
-        # applying l2 norm to get a unit vector
-        X = F.normalize(X)
-        return X
+        X = torch.stack([self.embed(tokens) for tokens in text])
+        return X.to(get_current_device())
 
 
 
@@ -182,12 +182,7 @@ class Metrics:
 
         return metrics
 
-    def __call__(self, sample_list, model_output, *args, **kwargs):
-        values = {}
-
-        dataset_type = sample_list.dataset_type
-        dataset_name = sample_list.dataset_name
-
+    def _prepare_model_output(self, model_output):
         # todo: general?
         try:
             if model_output['output_type'] == 'multilabel': # model output is based on answer vocabulary
@@ -214,35 +209,84 @@ class Metrics:
         except KeyError: # todo: does this work
             pass
 
+    def __call__(self, sample_list, model_output, *args, **kwargs):
+        dataset_type = sample_list.dataset_type
+        dataset_name = sample_list.dataset_name
+
+        self._prepare_model_output(model_output)
 
+        results = {}
         with torch.no_grad():
             for metric_name, metric_object in self.metrics.items():
                 if not metric_object.is_dataset_applicable(dataset_name):
                     continue
 
-                metric_result = metric_object._calculate_with_checks(
+                results[metric_name] = metric_object._calculate_with_checks(
                     sample_list, model_output, *args, **kwargs
                 )
 
-                if not isinstance(metric_result, collections.abc.Mapping):
-                    metric_result = {"": metric_result}
+        return self._collect_values(dataset_type, dataset_name, results)
 
-                for child_metric_name, child_metric_result in metric_result.items():
-                    key = f"{dataset_type}/{dataset_name}/{metric_name}"
-                    key = f"{key}/{child_metric_name}" if child_metric_name else key
+    @property
+    def supports_streaming(self):
+        """Whether all metrics can be accumulated batch by batch with
+        ``update`` and ``compute`` instead of on the whole dataset at once.
+        """
+        return "__prediction_report__" not in self.required_params and all(
+            metric.supports_streaming for metric in self.metrics.values()
+        )
 
-                    values[key] = child_metric_result
+    def reset(self):
+        for metric_object in self.metrics.values():
+            metric_object.reset()
 
-                    if not isinstance(values[key], torch.Tensor):
-                        values[key] = torch.tensor(values[key], dtype=torch.float)
-                    else:
-                        values[key] = values[key].float()
+    def update(self, sample_list, model_output, *args, **kwargs):
+        """Adds the sufficient statistics of a batch to every applicable
+        metric. Nothing is synchronized with the device here, so the update
+        overlaps with the forward pass of the next batch.
+        """
+        dataset_name = sample_list.dataset_name
 
-                    if values[key].dim() == 0:
-                        values[key] = values[key].view(1)
+        self._prepare_model_output(model_output)
+
+        with torch.no_grad():
+            for metric_object in self.metrics.values():
+                if metric_object.is_dataset_applicable(dataset_name):
+                    metric_object.update(sample_list, model_output, *args, **kwargs)
+
+    def compute(self, dataset_type, dataset_name):
+        """Returns the metrics accumulated by ``update`` since the last
+        ``reset``, in the same format as ``__call__``.
+        """
+        results = {
+            metric_name: metric_object.compute()
+            for metric_name, metric_object in self.metrics.items()
+            if metric_object.is_dataset_applicable(dataset_name)
+        }
+        return self._collect_values(dataset_type, dataset_name, results)
+
+    def _collect_values(self, dataset_type, dataset_name, results):
+        values = {}
+        for metric_name, metric_result in results.items():
+            if not isinstance(metric_result, collections.abc.Mapping):
+                metric_result = {"": metric_result}
+
+            for child_metric_name, child_metric_result in metric_result.items():
+                key = f"{dataset_type}/{dataset_name}/{metric_name}"
+                key = f"{key}/{child_metric_name}" if child_metric_name else key
+
+                values[key] = child_metric_result
+
+                if not isinstance(values[key], torch.Tensor):
+                    values[key] = torch.tensor(values[key], dtype=torch.float)
+                else:
+                    values[key] = values[key].float()
+
+                if values[key].dim() == 0:
+                    values[key] = values[key].view(1)
 
         registry.register(
-            "{}.{}.{}".format("metrics", sample_list.dataset_name, dataset_type), values
+            "{}.{}.{}".format("metrics", dataset_name, dataset_type), values
         )
 
         return values
@@ -264,6 +308,7 @@ class BaseMetric:
         # the set of datasets where this metric will be applied
         # an empty set means it will be applied on *all* datasets
         self._dataset_names = set()
+        self.reset()
         log_class_usage("Metric", self.__class__)
 
     @property
@@ -292,6 +337,43 @@ class BaseMetric:
         # Override in your child class
         raise NotImplementedError("'calculate' must be implemented in the child class")
 
+    def sufficient_statistics(self, sample_list, model_output, *args, **kwargs):
+        """Optional method for metrics that average a per-sample value. Returns
+        the sum of the value over the batch and the number of samples, which
+        lets the metric be accumulated over a dataset with ``update`` and
+        ``compute`` in constant memory.
+
+        Returns:
+            Tuple[torch.Tensor, int]: Sum of the per-sample values and count.
+
+        """
+        raise NotImplementedError(
+            f"'{self.name}' can only be calculated on the whole dataset"
+        )
+
+    @property
+    def supports_streaming(self):
+        return (
+            type(self).sufficient_statistics is not BaseMetric.sufficient_statistics
+        )
+
+    def reset(self):
+        self._total = None
+        self._count = 0
+
+    def update(self, sample_list, model_output, *args, **kwargs):
+        total, count = self.sufficient_statistics(
+            sample_list, model_output, *args, **kwargs
+        )
+        # keep the running sum as a tensor on the device to avoid syncs
+        self._total = total if self._total is None else self._total + total
+        self._count += count
+
+    def compute(self):
+        if self._total is None:
+            raise RuntimeError(f"'{self.name}' has not been updated since reset")
+        return self._total / self._count
+
     def __call__(self, *args, **kwargs):
         return self.calculate(*args, **kwargs)
 
@@ -330,11 +412,18 @@ class NumberbatchScore(BaseMetric):
         self.required_params = ["scores", "answers", "avg_embedded_answers"]
 
 
+    def sufficient_statistics(self, sample_list, model_output, *args, **kwargs):
+        # answers are averaged by numberbatch, unless already done by the dataset
+        if "avg_embedded_answers" in sample_list:
+            avg_embedded_answers = sample_list["avg_embedded_answers"]
+        else:
+            avg_embedded_answers = self.numberbatch(sample_list['answers'])
+        sim = self.cos(model_output['embeddings'], avg_embedded_answers)
+        return sim.sum(), sim.size(0)
+
     def calculate(self, sample_list, model_output, *args, **kwargs):
-        # answers are averaged by numberbatch
-        sim = torch.mean(self.cos(model_output['embeddings'], self.numberbatch(sample_list['answers'])))
-        #sim = torch.mean(self.cos(model_output['embeddings'], model_output['avg_embedded_answers']))
-        return sim
+        total, count = self.sufficient_statistics(sample_list, model_output)
+        return total / count
 
 
 @registry.register_metric("accuracy")
@@ -350,18 +439,8 @@ class Accuracy(BaseMetric):
         self.target_key = target_key
         self.topk = topk
 
-    def calculate(self, sample_list, model_output, *args, **kwargs):
-        """Calculate accuracy and return it back.
-
-        Args:
-            sample_list (SampleList): SampleList provided by DataLoader for
-                                current iteration
-            model_output (Dict): Dict returned by model.
-
-        Returns:
-            torch.FloatTensor: accuracy.
-
-        """
+    def sufficient_statistics(self, sample_list, model_output, *args, **kwargs):
+        """Number of (top-k) hits and number of samples in the batch."""
         output = model_output[self.score_key]
         batch_size = output.shape[0]
         expected = sample_list[self.target_key]
@@ -382,6 +461,21 @@ class Accuracy(BaseMetric):
             expected = expected.topk(self.topk, 1, True, True)[1].t().squeeze()
 
         correct = (expected == output.squeeze()).sum().float()
+        return correct, batch_size
+
+    def calculate(self, sample_list, model_output, *args, **kwargs):
+        """Calculate accuracy and return it back.
+
+        Args:
+            sample_list (SampleList): SampleList provided by DataLoader for
+                                current iteration
+            model_output (Dict): Dict returned by model.
+
+        Returns:
+            torch.FloatTensor: accuracy.
+
+        """
+        correct, batch_size = self.sufficient_statistics(sample_list, model_output)
         return correct / batch_size
 
 
@@ -469,18 +563,8 @@ class VQAAccuracy(BaseMetric):
         y = x1 / x1_sum
         return y
 
-    def calculate(self, sample_list, model_output, *args, **kwargs):
-        """Calculate vqa accuracy and return it back.
-
-        Args:
-            sample_list (SampleList): SampleList provided by DataLoader for
-                                current iteration
-            model_output (Dict): Dict returned by model.
-
-        Returns:
-            torch.FloatTensor: VQA Accuracy
-
-        """
+    def sufficient_statistics(self, sample_list, model_output, *args, **kwargs):
+        """Sum of the soft VQA scores and number of samples in the batch."""
         output = model_output["scores"]
         # for three branch movie+mcan model
         if output.dim() == 3:
@@ -493,9 +577,22 @@ class VQAAccuracy(BaseMetric):
         one_hots = expected.new_zeros(*expected.size())
         one_hots.scatter_(1, output.view(-1, 1), 1)
         scores = one_hots * expected
-        accuracy = torch.sum(scores) / expected.size(0)
+        return torch.sum(scores), expected.size(0)
 
-        return accuracy
+    def calculate(self, sample_list, model_output, *args, **kwargs):
+        """Calculate vqa accuracy and return it back.
+
+        Args:
+            sample_list (SampleList): SampleList provided by DataLoader for
+                                current iteration
+            model_output (Dict): Dict returned by model.
+
+        Returns:
+            torch.FloatTensor: VQA Accuracy
+
+        """
+        total, count = self.sufficient_statistics(sample_list, model_output)
+        return total / count
 
 
 @registry.register_metric("vqa_evalai_accuracy")
@@ -522,18 +619,8 @@ class VQAEvalAIAccuracy(BaseMetric):
         y = x1 / x1_sum
         return y
 
-    def calculate(self, sample_list, model_output, *args, **kwargs):
-        """Calculate vqa accuracy and return it back.
-
-        Args:
-            sample_list (SampleList): SampleList provided by DataLoader for
-                                current iteration
-            model_output (Dict): Dict returned by model.
-
-        Returns:
-            torch.FloatTensor: VQA Accuracy
-
-        """
+    def sufficient_statistics(self, sample_list, model_output, *args, **kwargs):
+        """Sum of the soft VQA scores and number of samples in the batch."""
         output = model_output["scores"]
         expected = sample_list["answers"]
 
@@ -565,9 +652,23 @@ class VQAEvalAIAccuracy(BaseMetric):
             avgGTAcc = float(sum(gt_acc)) / len(gt_acc)
             accuracy.append(avgGTAcc)
 
-        accuracy = float(sum(accuracy)) / len(accuracy)
+        total = model_output["scores"].new_tensor(sum(accuracy), dtype=torch.float)
+        return total, len(accuracy)
+
+    def calculate(self, sample_list, model_output, *args, **kwargs):
+        """Calculate Eval AI VQA accuracy and return it back.
+
+        Args:
+            sample_list (SampleList): SampleList provided by DataLoader for
+                                current iteration
+            model_output (Dict): Dict returned by model.
 
-        return model_output["scores"].new_tensor(accuracy, dtype=torch.float)
+        Returns:
+            torch.FloatTensor: Eval AI VQA Accuracy
+
+        """
+        total, count = self.sufficient_statistics(sample_list, model_output)
+        return total / count
 
 
 class RecallAtK(BaseMetric):
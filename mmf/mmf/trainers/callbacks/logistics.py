@@ -11,6 +11,7 @@ from mmf.utils.logger import (
     setup_output_folder,
     summarize_report,
 )
+from mmf.utils.profiling import get_profiler
 from mmf.utils.timer import Timer
 
 
@@ -115,11 +116,14 @@ class LogisticsCallback(Callback):
             tb_writer=self.tb_writer,
             wandb_logger=self.wandb_logger,
         )
+        get_profiler().emit(self.trainer.current_iteration, self.tb_writer)
 
     def on_validation_start(self, **kwargs):
         self.snapshot_timer.reset()
 
     def on_validation_end(self, **kwargs):
+        # the spans of the validation would be mixed into the next interval
+        get_profiler().reset()
         max_updates = getattr(self.trainer, "max_updates", None)
         num_updates = getattr(self.trainer, "num_updates", None)
         extra = {
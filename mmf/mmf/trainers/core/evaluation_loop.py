@@ -11,6 +11,7 @@ from mmf.common.meter import Meter
 from mmf.common.report import Report
 from mmf.common.sample import to_device
 from mmf.utils.distributed import gather_tensor, is_main, is_xla
+from mmf.utils.general import get_autocast
 
 
 logger = logging.getLogger(__name__)
@@ -23,6 +24,12 @@ class TrainerEvaluationLoopMixin(ABC):
         meter = Meter()
         reporter = self.dataset_loader.get_test_reporter(dataset_type)
         use_cpu = self.config.evaluation.get("use_cpu", False)
+        # accumulate metrics batch by batch instead of on the concatenated
+        # outputs of the whole dataset, if all metrics support it
+        streaming = (
+            self.config.evaluation.get("streaming_metrics", True)
+            and self.metrics.supports_streaming
+        )
         loaded_batches = 0
         skipped_batches = 0
 
@@ -32,6 +39,8 @@ class TrainerEvaluationLoopMixin(ABC):
             while reporter.next_dataset(flush_report=False):
                 dataloader = reporter.get_dataloader()
                 combined_report = None
+                if streaming:
+                    self.metrics.reset()
 
                 if self._can_use_tqdm(dataloader):
                     dataloader = tqdm.tqdm(dataloader, disable=disable_tqdm)
@@ -46,7 +55,8 @@ class TrainerEvaluationLoopMixin(ABC):
                             logger.info("Skip batch due to uneven batch sizes.")
                             skipped_batches += 1
                             continue
-                        model_output = self.model(prepared_batch)
+                        with get_autocast(self.training_config):
+                            model_output = self.model(prepared_batch)
                         report = Report(prepared_batch, model_output)
                         report = report.detach()
 
@@ -66,9 +76,13 @@ class TrainerEvaluationLoopMixin(ABC):
                             combined_report = moved_report.copy()
                         else:
                             combined_report.accumulate_tensor_fields_and_loss(
-                                moved_report, self.metrics.required_params
+                                moved_report,
+                                [] if streaming else self.metrics.required_params,
                             )
                             combined_report.batch_size += moved_report.batch_size
+
+                        if streaming:
+                            self.metrics.update(report, report)
                         # Each node generates a separate copy of predict JSON from the
                         # report, which will be used to evaluate dataset-level metrics
                         # (such as mAP in object detection or CIDEr in image captioning)
@@ -93,10 +107,14 @@ class TrainerEvaluationLoopMixin(ABC):
                 # add prediction_report is used for set-level metrics
                 combined_report.prediction_report = reporter.report
 
-
-
-
-                combined_report.metrics = self.metrics(combined_report, combined_report)
+                if streaming:
+                    combined_report.metrics = self.metrics.compute(
+                        combined_report.dataset_type, combined_report.dataset_name
+                    )
+                else:
+                    combined_report.metrics = self.metrics(
+                        combined_report, combined_report
+                    )
 
                 # Since update_meter will reduce the metrics over GPUs, we need to
                 # move them back to GPU but we will only move metrics and losses
@@ -138,7 +156,7 @@ class TrainerEvaluationLoopMixin(ABC):
                             logger.info("Skip batch due to unequal batch sizes.")
                             skipped_batches += 1
                             continue
-                        with torch.cuda.amp.autocast(enabled=self.training_config.fp16):
+                        with get_autocast(self.training_config):
                             model_output = self.model(prepared_batch)
 
                         report = Report(prepared_batch, model_output)
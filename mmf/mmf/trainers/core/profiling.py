@@ -4,6 +4,8 @@ import logging
 from abc import ABC
 from typing import Type
 
+from mmf.utils.distributed import is_main
+from mmf.utils.profiling import SpanProfiler, configure_profiler
 from mmf.utils.timer import Timer
 
 
@@ -18,3 +20,16 @@ class TrainerProfilingMixin(ABC):
             return
         logging.debug(f"{text}: {self.profiler.get_time_since_start()}")
         self.profiler.reset()
+
+    def load_span_profiler(self) -> SpanProfiler:
+        """Configures the span profiler from ``training.profiling``, its spans
+        are emitted by the logistics callback every log interval"""
+        profiling_config = self.training_config.get("profiling", {})
+        trace_file = profiling_config.get("trace_file", None)
+        self.span_profiler = configure_profiler(
+            enabled=profiling_config.get("enabled", False),
+            cuda_sync=profiling_config.get("cuda_sync", False),
+            # a single trace, written by the main process
+            trace_file=trace_file if is_main() else None,
+        )
+        return self.span_profiler
@@ -2,6 +2,7 @@
 
 import gc
 import logging
+import os
 from abc import ABC
 from typing import Any, Dict
 
@@ -11,7 +12,14 @@ from mmf.common.registry import registry
 from mmf.common.report import Report
 from mmf.common.sample import to_device
 from mmf.utils.distributed import is_xla
-from mmf.utils.general import clip_gradients, extract_loss, get_max_updates
+from mmf.utils.file_io import PathManager
+from mmf.utils.general import (
+    clip_gradients,
+    extract_loss,
+    get_autocast,
+    get_max_updates,
+)
+from mmf.utils.profiling import get_profiler, span
 from torch import Tensor
 
 
@@ -74,7 +82,9 @@ class TrainerTrainingLoopMixin(ABC):
             )
 
             should_start_update = True
-            for idx, batch in enumerate(self.train_loader):
+            # time spent waiting for the dataloader
+            batches = get_profiler().iterate("batch_load", self.train_loader)
+            for idx, batch in enumerate(batches):
                 if should_start_update:
                     combined_report = None
                     self._start_update()
@@ -118,9 +128,10 @@ class TrainerTrainingLoopMixin(ABC):
                     should_log = True
                     # Calculate metrics every log interval for debugging
                     if self.training_config.evaluate_metrics:
-                        combined_report.metrics = self.metrics(
-                            combined_report, combined_report
-                        )
+                        with span("metrics"):
+                            combined_report.metrics = self.metrics(
+                                combined_report, combined_report
+                            )
                     self.meter.update_from_report(combined_report)
 
                 self.on_update_end(
@@ -163,13 +174,92 @@ class TrainerTrainingLoopMixin(ABC):
                     break
 
     def run_training_batch(self, batch: Dict[str, Tensor], loss_divisor: int) -> None:
+        anomaly_replay = self.training_config.get("anomaly_replay", False)
+        if anomaly_replay:
+            rng_state = self._get_rng_state()
+
         report = self._forward(batch)
-        if self.training_config.exit_on_nan_losses:
+        if self.training_config.exit_on_nan_losses and not anomaly_replay:
             self._check_nan_losses(report)
         loss = extract_loss(report, loss_divisor)
         self._backward(loss)
+
+        if anomaly_replay and not self._is_finite_step(loss):
+            self._replay_anomaly(batch, rng_state, loss_divisor)
         return report
 
+    def _is_finite_step(self, loss: Tensor) -> bool:
+        checks = [torch.isfinite(loss).all()]
+        # with fp16, non-finite gradients are expected and handled by the scaler
+        if not self.training_config.fp16:
+            checks.extend(
+                torch.isfinite(param.grad).all()
+                for param in self.model.parameters()
+                if param.grad is not None
+            )
+        # single sync with the device per step
+        return bool(torch.stack(checks).all().item())
+
+    def _get_rng_state(self) -> Dict[str, Any]:
+        rng_state = {"torch": torch.get_rng_state()}
+        if torch.cuda.is_available():
+            rng_state["cuda"] = torch.cuda.get_rng_state_all()
+        return rng_state
+
+    def _set_rng_state(self, rng_state: Dict[str, Any]) -> None:
+        torch.set_rng_state(rng_state["torch"])
+        if "cuda" in rng_state:
+            torch.cuda.set_rng_state_all(rng_state["cuda"])
+
+    def _replay_anomaly(
+        self, batch: Dict[str, Tensor], rng_state: Dict[str, Any], loss_divisor: int
+    ) -> None:
+        """Saves the batch, RNG state and model weights of a step that produced
+        a non-finite loss or gradient for offline debugging, then replays the
+        step with autograd anomaly detection on, so that the failing op is
+        reported, and exits.
+        """
+        update = self.num_updates + 1
+        logger.error(
+            f"Non-finite loss or gradients in update {update}, "
+            "replaying the batch with anomaly detection"
+        )
+        snapshot_path = os.path.join(
+            self.config.env.save_dir, f"anomaly_update_{update}.pth"
+        )
+        with PathManager.open(snapshot_path, "wb") as f:
+            torch.save(
+                {
+                    "batch": batch,
+                    "rng_state": rng_state,
+                    "num_updates": self.num_updates,
+                    "current_iteration": self.current_iteration,
+                    "model": self.model.state_dict(),
+                },
+                f,
+            )
+
+        self.optimizer.zero_grad()
+        self._set_rng_state(rng_state)
+        anomaly = None
+        with torch.autograd.detect_anomaly():
+            try:
+                report = self._forward(batch)
+                self._backward(extract_loss(report, loss_divisor))
+            except RuntimeError as e:
+                anomaly = e
+
+        error_msg = (
+            f"Non-finite loss or gradients in update {update}; batch, RNG state "
+            f"and model saved to {snapshot_path}"
+        )
+        if anomaly is not None:
+            error_msg += f"; anomaly detection reported: {anomaly}"
+        else:
+            error_msg += "; anomaly detection did not find a failing backward op"
+        logger.error(error_msg)
+        raise RuntimeError(error_msg) from anomaly
+
     def _check_nan_losses(self, report):
         # skip this check in XLA mode as calling .item() in forward pass
         # greatly slows down the training
@@ -192,11 +282,12 @@ class TrainerTrainingLoopMixin(ABC):
 
     def _forward(self, batch: Dict[str, Tensor]) -> Dict[str, Any]:
         # Move the sample list to device if it isn't as of now.
-        prepared_batch = to_device(batch, self.device)
+        with span("batch_prepare"):
+            prepared_batch = to_device(batch, self.device)
         self.profile("Batch prepare time")
         # Arguments should be a dict at this point
 
-        with torch.cuda.amp.autocast(enabled=self.training_config.fp16):
+        with get_autocast(self.training_config), span("forward"):
             model_output = self.model(prepared_batch)
             report = Report(prepared_batch, model_output)
 
@@ -209,10 +300,17 @@ class TrainerTrainingLoopMixin(ABC):
         self.optimizer.zero_grad()
 
     def _backward(self, loss: Tensor) -> None:
-        self.scaler.scale(loss).backward()
+        with span("backward"):
+            self.scaler.scale(loss).backward()
         self.profile("Backward time")
 
     def _finish_update(self):
+        with span("optimizer_step"):
+            self._step_optimizer()
+        self.num_updates += 1
+        self.profile("Finished update")
+
+    def _step_optimizer(self):
         if self.training_config.clip_gradients:
             clip_gradients(
                 self.model,
@@ -230,8 +328,6 @@ class TrainerTrainingLoopMixin(ABC):
 
         self.scaler.step(self.optimizer)
         self.scaler.update()
-        self.num_updates += 1
-        self.profile("Finished update")
 
     def _calculate_max_updates(self):
         config_max_updates = self.training_config.max_updates
@@ -0,0 +1,371 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+"""
+In-process hyperparameter sweep for Qlarifais.
+
+Qlarifais only trains its head (attention, fusion and classifier), the text,
+image and graph encoders are frozen. Instead of launching one job per trial
+which reloads and re-runs all of the encoders, the ``head_sweep`` trainer builds
+the model once, runs the frozen encoders once over the train and val sets and
+then trains every trial's head on the cached features, time-slicing the trials
+batch by batch.
+
+Trials are read from ``sweep.trials`` (or a yaml file at ``sweep.trials_file``)::
+
+    sweep:
+      trials:
+        - save_dir_key: lr0.08.wd1e-05.fdo0.1.cdo0.3
+          overrides:
+            optimizer.params.lr: 0.08
+            optimizer.params.weight_decay: 1e-05
+            model_config.qlarifais.fusion.params.dropout: 0.1
+            model_config.qlarifais.classifier.params.dropout: 0.3
+
+Each trial writes its config, logs, tensorboard and checkpoints to
+``<env.save_dir>/<save_dir_key>``, the same layout a separate job would have.
+The final ``qlarifais_final.pth`` of a trial contains the full model state dict
+and can be loaded with ``Qlarifais.from_pretrained``.
+"""
+
+import copy
+import json
+import logging
+import os
+import random
+
+import torch
+import tqdm
+from mmf.common.meter import Meter
+from mmf.common.registry import registry
+from mmf.common.report import Report
+from mmf.common.sample import SampleList, to_device
+from mmf.modules.losses import Losses
+from mmf.trainers.mmf_trainer import MMFTrainer
+from mmf.utils.build import build_optimizer, build_scheduler
+from mmf.utils.configuration import load_yaml
+from mmf.utils.distributed import is_main
+from mmf.utils.file_io import PathManager
+from mmf.utils.frozen_store import restore_frozen_modules
+from mmf.utils.general import clip_gradients, extract_loss
+from mmf.utils.logger import TensorboardLogger
+from omegaconf import OmegaConf
+
+
+logger = logging.getLogger(__name__)
+
+
+class HeadTrial:
+    """State of a single trial: its config, head, optimizer and bookkeeping."""
+
+    def __init__(self, save_dir_key, config, head, optimizer, scheduler, save_dir):
+        self.save_dir_key = save_dir_key
+        self.config = config
+        self.model_config = config.model_config[config.model]
+        # losses are per trial as their params may be swept as well
+        self.losses = Losses(self.model_config.get("losses", []))
+        self.head = head
+        self.optimizer = optimizer
+        self.scheduler = scheduler
+        self.save_dir = save_dir
+        self.meter = Meter()
+        self.num_updates = 0
+        self.best_update = 0
+        self.best_metric_value = None
+        self.tb_writer = None
+        if config.training.tensorboard:
+            self.tb_writer = TensorboardLogger(os.path.join(save_dir, "logs"))
+
+    def is_better(self, value, minimize):
+        if self.best_metric_value is None:
+            return True
+        if minimize:
+            return value < self.best_metric_value
+        return value > self.best_metric_value
+
+
+@registry.register_trainer("head_sweep")
+class HeadSweepTrainer(MMFTrainer):
+    def train(self):
+        logger.info("===== Model =====")
+        logger.info(self.model)
+
+        assert hasattr(self.model, "extract_features") and hasattr(
+            self.model, "build_head"
+        ), "head_sweep trainer requires a model with frozen encoders and a head"
+
+        self.trials = self.build_trials()
+        logger.info(f"Sweeping {len(self.trials)} trials in-process")
+
+        logger.info("Caching frozen encoder features for train set")
+        train_cache = self.cache_features(self.train_loader)
+        val_cache = []
+        if "val" in self.run_type:
+            logger.info("Caching frozen encoder features for val set")
+            val_cache = self.cache_features(self.val_loader)
+
+        self.head_training_loop(train_cache, val_cache)
+
+        for trial in self.trials:
+            self.finalize_trial(trial)
+        self.finalize()
+
+    def build_trials(self):
+        sweep_config = self.config.get("sweep", {})
+        trials = list(sweep_config.get("trials", []))
+        if sweep_config.get("trials_file", None):
+            trials.extend(load_yaml(sweep_config.trials_file).get("trials", []))
+        assert len(trials) > 0, "No trials specified in sweep.trials(_file)"
+
+        # Every head starts from the same initialization as the full model
+        # would in a separate job, i.e. the seeded RNG state after model build
+        rng_state = torch.get_rng_state()
+        built = []
+        for trial in trials:
+            trial_config = copy.deepcopy(self.config)
+            OmegaConf.set_struct(trial_config, False)
+            for key, value in trial.get("overrides", {}).items():
+                OmegaConf.update(trial_config, key, value, merge=True)
+            save_dir = os.path.join(self.config.env.save_dir, trial.save_dir_key)
+            PathManager.mkdirs(save_dir)
+
+            torch.set_rng_state(rng_state)
+            model_config = trial_config.model_config[trial_config.model]
+            head = self.model.build_head(model_config).to(self.device)
+            optimizer = build_optimizer(head, trial_config)
+            scheduler = None
+            if trial_config.training.lr_scheduler:
+                scheduler = build_scheduler(optimizer, trial_config)
+
+            if is_main():
+                with PathManager.open(os.path.join(save_dir, "config.yaml"), "w") as f:
+                    f.write(OmegaConf.to_yaml(trial_config, resolve=True))
+
+            built.append(
+                HeadTrial(
+                    trial.save_dir_key,
+                    trial_config,
+                    head,
+                    optimizer,
+                    scheduler,
+                    save_dir,
+                )
+            )
+        return built
+
+    def cache_features(self, loader):
+        dtype = getattr(torch, self.config.sweep.get("feature_dtype", "float32"))
+        cache = []
+        self.model.eval()
+        with torch.no_grad():
+            for batch in tqdm.tqdm(loader, disable=not is_main()):
+                batch = to_device(batch, self.device)
+                features = {
+                    # masks of region features stay boolean
+                    key: value.to("cpu", dtype if value.is_floating_point() else None)
+                    for key, value in self.model.extract_features(batch).items()
+                }
+                # Keep only what losses and metrics need from the batch
+                targets = SampleList(
+                    {
+                        "targets": batch["targets"].cpu(),
+                        "answers": batch["answers"],
+                        "id": batch["id"].cpu(),
+                    }
+                )
+                targets.dataset_name = batch.dataset_name
+                targets.dataset_type = batch.dataset_type
+                cache.append((features, targets))
+        return cache
+
+    def head_training_loop(self, train_cache, val_cache):
+        self.max_updates = self._calculate_max_updates()
+        log_interval = self.training_config.log_interval
+        evaluation_interval = self.training_config.evaluation_interval
+        rng = random.Random(self.training_config.seed)
+
+        for trial in self.trials:
+            trial.head.train()
+
+        while self.num_updates < self.max_updates:
+            self.current_epoch += 1
+            order = list(range(len(train_cache)))
+            rng.shuffle(order)
+
+            for idx in order:
+                features, sample_list = train_cache[idx]
+                features = self._features_to_device(features)
+                sample_list = to_device(sample_list, self.device)
+
+                # time-slice all trials over the same batch
+                for trial in self.trials:
+                    self.run_trial_batch(trial, features, sample_list)
+
+                self.num_updates += 1
+                self.current_iteration += 1
+
+                if self.num_updates % log_interval == 0:
+                    for trial in self.trials:
+                        self.log_trial(trial, "train")
+
+                if val_cache and self.num_updates % evaluation_interval == 0:
+                    for trial in self.trials:
+                        self.evaluate_trial(trial, val_cache)
+
+                if self.num_updates >= self.max_updates:
+                    break
+
+        if val_cache and self.num_updates % evaluation_interval != 0:
+            for trial in self.trials:
+                self.evaluate_trial(trial, val_cache)
+
+    def run_trial_batch(self, trial, features, sample_list):
+        trial.optimizer.zero_grad()
+        output = self.model.forward_head(
+            features, head=trial.head, config=trial.model_config
+        )
+        output["losses"] = trial.losses(sample_list, output)
+        report = Report(sample_list, output)
+        loss = extract_loss(report, 1)
+        loss.backward()
+
+        if trial.config.training.clip_gradients:
+            clip_gradients(
+                trial.head, trial.optimizer, trial.num_updates, None, trial.config
+            )
+        trial.optimizer.step()
+        if trial.scheduler is not None:
+            trial.scheduler.step()
+        trial.num_updates += 1
+
+        report = report.detach()
+        if self.training_config.evaluate_metrics:
+            report.metrics = self.metrics(report, report)
+        trial.meter.update_from_report(report)
+
+    def evaluate_trial(self, trial, val_cache):
+        meter = Meter()
+        trial.head.eval()
+        with torch.no_grad():
+            for features, sample_list in val_cache:
+                features = self._features_to_device(features)
+                sample_list = to_device(sample_list, self.device)
+                output = self.model.forward_head(
+                    features, head=trial.head, config=trial.model_config
+                )
+                output["losses"] = trial.losses(sample_list, output)
+                report = Report(sample_list, output).detach()
+                report.metrics = self.metrics(report, report)
+                meter.update_from_report(report)
+        trial.head.train()
+
+        self.log_trial(trial, "val", meter)
+
+        early_stop = trial.config.training.early_stop
+        criteria = early_stop.criteria
+        if "val" not in criteria:
+            criteria = f"val/{criteria}"
+        value = meter.meters.get(criteria, None)
+        if value is None:
+            logger.warning(f"[{trial.save_dir_key}] {criteria} is not present in meter")
+            self.save_trial(trial)
+            return
+
+        value = value.global_avg
+        if isinstance(value, torch.Tensor):
+            value = value.item()
+        update_best = trial.is_better(value, early_stop.minimize)
+        if update_best:
+            trial.best_metric_value = value
+            trial.best_update = trial.num_updates
+        self.save_trial(trial, update_best=update_best)
+
+    def log_trial(self, trial, stage, meter=None):
+        meter = trial.meter if meter is None else meter
+        logger.info(
+            f"[{trial.save_dir_key}] {stage} progress: "
+            f"{trial.num_updates}/{self.max_updates}, {meter}"
+        )
+        averages = {}
+        for key, value in meter.meters.items():
+            value = value.global_avg
+            averages[key] = value.item() if isinstance(value, torch.Tensor) else value
+
+        if trial.tb_writer is not None:
+            trial.tb_writer.add_scalars(averages, trial.num_updates)
+        if is_main():
+            metrics_file = os.path.join(trial.save_dir, "metrics.jsonl")
+            with PathManager.open(metrics_file, "a") as f:
+                log_dict = {"stage": stage, "num_updates": trial.num_updates}
+                log_dict.update(averages)
+                f.write(json.dumps(log_dict) + "\n")
+        if stage == "train":
+            trial.meter.reset()
+
+    def trial_state_dict(self, trial):
+        """Full model state dict with the head weights taken from ``trial``"""
+        state_dict = self.model.state_dict()
+        head_state_dict = trial.head.state_dict()
+        for key in list(state_dict.keys()):
+            if key.split(".")[0] in trial.head:
+                del state_dict[key]
+        state_dict.update(head_state_dict)
+        return state_dict
+
+    def save_trial(self, trial, update_best=False):
+        if not is_main():
+            return
+        ckpt = {
+            "model": self.trial_state_dict(trial),
+            "optimizer": trial.optimizer.state_dict(),
+            "num_updates": trial.num_updates,
+            "current_epoch": self.current_epoch,
+            "best_update": trial.best_update,
+            "best_metric_value": trial.best_metric_value,
+            "config": OmegaConf.to_container(trial.config, resolve=True),
+        }
+        if trial.scheduler is not None:
+            ckpt["lr_scheduler"] = trial.scheduler.state_dict()
+
+        # the encoders are shared by all trials, so they are stored only once
+        frozen_store = self.checkpoint_callback.checkpoint.frozen_store
+        if frozen_store is not None:
+            ckpt["model"], ckpt["frozen_modules"] = frozen_store.split(
+                self.model, ckpt["model"]
+            )
+            ckpt["frozen_store"] = frozen_store.root
+
+        with PathManager.open(os.path.join(trial.save_dir, "current.ckpt"), "wb") as f:
+            torch.save(ckpt, f)
+        if update_best:
+            with PathManager.open(os.path.join(trial.save_dir, "best.ckpt"), "wb") as f:
+                torch.save(ckpt, f)
+
+    def finalize_trial(self, trial):
+        if not is_main():
+            return
+        best_path = os.path.join(trial.save_dir, "best.ckpt")
+        if PathManager.exists(best_path):
+            with PathManager.open(best_path, "rb") as f:
+                ckpt = restore_frozen_modules(torch.load(f, map_location="cpu"))
+            state_dict = ckpt["model"]
+        else:
+            state_dict = self.trial_state_dict(trial)
+
+        pth_path = os.path.join(trial.save_dir, f"{self.config.model}_final.pth")
+        with PathManager.open(pth_path, "wb") as f:
+            torch.save(state_dict, f)
+        if trial.tb_writer is not None:
+            trial.tb_writer.close()
+        logger.info(
+            f"[{trial.save_dir_key}] finished, best {trial.best_metric_value} "
+            f"at update {trial.best_update}"
+        )
+
+    def _features_to_device(self, features):
+        # masks of region features stay boolean
+        return {
+            key: value.to(
+                self.device, torch.float32 if value.is_floating_point() else None
+            )
+            for key, value in features.items()
+        }
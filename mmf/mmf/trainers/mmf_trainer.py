@@ -41,6 +41,7 @@ class MMFTrainer(
     def load(self):
         super().load()
         self.load_fp16_scaler()
+        self.load_span_profiler()
 
         # Callbacks
         self.on_init_start()
@@ -118,6 +119,13 @@ class MMFTrainer(
                 "1.6"
             ), f"Using fp16 requires torch version >- 1.6, found: {torch.__version__}"
             assert self.device != torch.device("cpu"), "fp16 cannot be used on cpu"
+        if self.training_config.get("cpu_amp", False):
+            assert not self.training_config.fp16, "fp16 and cpu_amp are exclusive"
+            if self.device != torch.device("cpu"):
+                logger.warning(
+                    "cpu_amp only autocasts operations on cpu, "
+                    + f"the model is on {self.device}"
+                )
 
         set_torch_grad_scaler = True
         if self.training_config.fp16 and self.distributed:
@@ -132,6 +140,8 @@ class MMFTrainer(
             except ImportError:
                 logger.info("Using Pytorch AMP GradScaler")
 
+        # bfloat16 has the range of float32, so cpu_amp needs no loss scaling
+        # and the scaler stays disabled
         if set_torch_grad_scaler:
             self.scaler = torch.cuda.amp.GradScaler(enabled=self.training_config.fp16)
 
@@ -399,6 +399,9 @@ def build_dataloader_and_sampler(
     # to the codebase
     if not isinstance(dataset_instance, torch.utils.data.IterableDataset):
         other_args = _add_extra_args_for_dataloader(dataset_instance, other_args)
+        # group samples of similar question length, see LengthBucketBatchSampler
+        if datamodule_config.get("bucket_by_length", False):
+            other_args = _add_bucket_batch_sampler(dataset_instance, other_args)
     else:
         other_args.pop("shuffle")
 
@@ -423,7 +426,7 @@ def build_dataloader_and_sampler(
 
     loader.dataset_type = dataset_instance.dataset_type
 
-    return loader, other_args.get("sampler", None)
+    return loader, other_args.get("sampler", other_args.get("batch_sampler", None))
 
 
 def build_test_reporter(
@@ -488,6 +491,39 @@ def _add_extra_args_for_dataloader(
     return other_args
 
 
+def _add_bucket_batch_sampler(
+    dataset_instance: torch.utils.data.Dataset, other_args: Dict[str, Any]
+) -> Dict[str, Any]:
+    from mmf.datasets.samplers import LengthBucketBatchSampler
+    from mmf.utils.distributed import broadcast_scalar
+    from mmf.utils.general import get_current_device
+
+    if not hasattr(dataset_instance, "get_text_lengths") or is_xla():
+        logger.warning(
+            f"Length bucketing is not supported for {dataset_instance.dataset_name} "
+            + "or on XLA, using the default sampler"
+        )
+        return other_args
+
+    # batch_sampler is mutually exclusive with batch_size, shuffle and sampler
+    sampler = other_args.pop("sampler", None)
+    shuffle = other_args.pop("shuffle", None)
+    if sampler is not None:
+        shuffle = sampler.shuffle
+
+    # replicas are seeded differently, but have to shuffle the same way
+    seed = broadcast_scalar(
+        max(registry.get("seed", 0, no_warning=True) or 0, 0), 0, device=get_current_device()
+    )
+    other_args["batch_sampler"] = LengthBucketBatchSampler(
+        dataset_instance.get_text_lengths(),
+        other_args.pop("batch_size"),
+        shuffle=shuffle,
+        seed=seed,
+    )
+    return other_args
+
+
 def build_optimizer(model, config):
     optimizer_config = config.optimizer
     if "type" not in optimizer_config:
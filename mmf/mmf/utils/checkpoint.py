@@ -15,6 +15,7 @@ from mmf.utils.configuration import get_mmf_env, load_yaml
 from mmf.utils.distributed import is_main, is_xla, open_if_main, synchronize
 from mmf.utils.download import download_pretrained_model
 from mmf.utils.file_io import PathManager
+from mmf.utils.frozen_store import FrozenModuleStore, restore_frozen_modules
 from mmf.utils.general import get_current_device, updir
 from mmf.utils.xla import save_xla_ckpt
 from omegaconf import OmegaConf
@@ -57,9 +58,16 @@ def get_ckpt_path_from_folder(folder) -> str:
 
 
 def get_ckpt_from_path(path) -> Dict[str, Any]:
-    with PathManager.open(path, "rb") as f:
-        ckpt = torch.load(f, map_location=lambda storage, loc: storage)
-        return ckpt
+    try:
+        # memory-map the tensors, so they are only read from disk once they
+        # are copied into the model
+        local_path = PathManager.get_local_path(path)
+        ckpt = torch.load(local_path, map_location="cpu", mmap=True)
+    except (TypeError, RuntimeError):
+        # torch < 2.1 or a checkpoint in the legacy (non zip) format
+        with PathManager.open(path, "rb") as f:
+            ckpt = torch.load(f, map_location=lambda storage, loc: storage)
+    return restore_frozen_modules(ckpt)
 
 
 def get_config_from_folder_or_ckpt(
@@ -101,8 +109,7 @@ def _load_pretrained_checkpoint(checkpoint_path, *args, **kwargs):
 
     _hack_imports()
 
-    with PathManager.open(checkpoint_path, "rb") as f:
-        ckpt = torch.load(f, map_location=lambda storage, loc: storage)
+    ckpt = get_ckpt_from_path(checkpoint_path)
     assert "config" in ckpt, (
         "No configs provided with pretrained model "
         " while checkpoint also doesn't have configuration."
@@ -207,6 +214,14 @@ class Checkpoint:
         self.max_to_keep = self.config.checkpoint.max_to_keep
         self.saved_iterations = []
 
+        frozen_store_config = self.config.checkpoint.get("frozen_store", {})
+        self.frozen_store_dir = frozen_store_config.get("dir", None)
+        self.frozen_store = None
+        if frozen_store_config.get("enabled", False):
+            if self.frozen_store_dir is None:
+                self.frozen_store_dir = os.path.join(self.save_dir, "frozen_store")
+            self.frozen_store = FrozenModuleStore(self.frozen_store_dir)
+
     def save_config(self):
         if not is_main():
             return
@@ -268,7 +283,9 @@ class Checkpoint:
             if not should_continue:
                 return
         else:
-            ckpt = self._torch_load(file)
+            ckpt = restore_frozen_modules(
+                self._torch_load(file), self.frozen_store_dir
+            )
 
         if "model" not in ckpt:
             ckpt = {"model": ckpt}
@@ -400,7 +417,8 @@ class Checkpoint:
     def _load_fp16_scaler(self, ckpt):
         scaler = getattr(self.trainer, "scaler", None)
         scaler_dict = ckpt.get("fp16_scaler", None)
-        if scaler is not None and scaler_dict is not None:
+        # disabled scalers (fp32 or cpu_amp runs) save an empty state
+        if scaler is not None and scaler_dict:
             scaler.load_state_dict(scaler_dict)
 
     def _load_pretrained(self, ckpt):
@@ -548,6 +566,13 @@ class Checkpoint:
             "config": OmegaConf.to_container(self.config, resolve=True),
         }
 
+        if self.frozen_store is not None:
+            # only the trainable weights, frozen ones are referenced by hash
+            ckpt["model"], ckpt["frozen_modules"] = self.frozen_store.split(
+                model, ckpt["model"]
+            )
+            ckpt["frozen_store"] = self.frozen_store.root
+
         lr_scheduler = self.trainer.lr_scheduler_callback
 
         if (
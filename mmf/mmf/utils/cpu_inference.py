@@ -0,0 +1,145 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+"""
+Helpers for running frozen models on CPU only hosts.
+
+These are meant to be applied once to a model in eval mode right before
+inference, they change the modules in place and are not reversible:
+
+- ``remove_weight_norms`` folds ``weight_norm`` reparametrizations back into
+  plain weights, which is required before quantizing the affected layers.
+- ``fold_frozen_batchnorm`` folds frozen batch norms following a convolution
+  (detectron2 style ``Conv2d`` with a ``norm`` attribute) into the conv.
+- ``to_channels_last`` converts conv weights to channels-last memory format.
+- ``fuse_linear_layers`` drops eval mode dropouts and multiplies out stacks of
+  ``nn.Linear`` layers that are only separated by dropouts.
+- ``quantize_linear_layers`` applies dynamic int8 quantization to ``nn.Linear``.
+"""
+
+import logging
+
+import torch
+from torch import nn
+
+
+logger = logging.getLogger(__name__)
+
+
+def remove_weight_norms(module: nn.Module) -> int:
+    """Removes all ``weight_norm`` hooks below ``module``, returns how many"""
+    removed = 0
+    for submodule in module.modules():
+        if hasattr(submodule, "weight_g") and hasattr(submodule, "weight_v"):
+            nn.utils.remove_weight_norm(submodule)
+            removed += 1
+    return removed
+
+
+def _is_batchnorm(module: nn.Module) -> bool:
+    # Duck typed so detectron2's FrozenBatchNorm2d is covered without importing it
+    return all(
+        hasattr(module, name)
+        for name in ["weight", "bias", "running_mean", "running_var", "eps"]
+    )
+
+
+@torch.no_grad()
+def fold_frozen_batchnorm(module: nn.Module) -> int:
+    """Folds ``conv.norm`` batch norms into the conv weights, returns how many.
+
+    Only convolutions that apply their norm themselves (e.g. detectron2's
+    ``Conv2d``) are folded, the norm is then removed from the conv.
+    """
+    folded = 0
+    for conv in module.modules():
+        norm = getattr(conv, "norm", None)
+        if not isinstance(conv, nn.Conv2d) or norm is None or not _is_batchnorm(norm):
+            continue
+        if isinstance(norm, nn.modules.batchnorm._BatchNorm) and norm.training:
+            continue
+
+        scale = norm.weight * torch.rsqrt(norm.running_var + norm.eps)
+        bias = norm.bias - norm.running_mean * scale
+        if conv.bias is not None:
+            bias = bias + conv.bias * scale
+        conv.weight.mul_(scale.reshape(-1, 1, 1, 1))
+        conv.bias = nn.Parameter(bias, requires_grad=False)
+        conv.norm = None
+        folded += 1
+    return folded
+
+
+def to_channels_last(module: nn.Module) -> nn.Module:
+    return module.to(memory_format=torch.channels_last)
+
+
+def quantize_linear_layers(module: nn.Module) -> nn.Module:
+    """Dynamic int8 quantization of all ``nn.Linear`` layers in ``module``"""
+    remove_weight_norms(module)
+    return torch.quantization.quantize_dynamic(module, {nn.Linear}, dtype=torch.qint8)
+
+
+def _fuse_linear_pair(first: nn.Linear, second: nn.Linear) -> nn.Linear:
+    fused = nn.Linear(
+        first.in_features,
+        second.out_features,
+        bias=first.bias is not None or second.bias is not None,
+    ).to(device=second.weight.device, dtype=second.weight.dtype)
+    fused.weight.copy_(second.weight @ first.weight)
+    if fused.bias is not None:
+        bias = second.weight.new_zeros(second.out_features)
+        if first.bias is not None:
+            bias = bias + second.weight @ first.bias
+        if second.bias is not None:
+            bias = bias + second.bias
+        fused.bias.copy_(bias)
+    return fused
+
+
+def _is_cheaper_fused(first: nn.Linear, second: nn.Linear) -> bool:
+    # fusing through a narrow hidden layer would increase the number of flops
+    fused = first.in_features * second.out_features
+    separate = (first.in_features + second.out_features) * first.out_features
+    return fused <= separate
+
+
+@torch.no_grad()
+def fuse_linear_layers(module: nn.Module) -> int:
+    """Removes the dropouts of ``nn.Sequential`` blocks below ``module`` that
+    are in eval mode and fuses the ``nn.Linear`` layers that become adjacent,
+    returns how many layers were removed.
+
+    Weight norms have to be removed first, layers that still carry one are
+    left untouched.
+    """
+    removed = 0
+    for sequential in list(module.modules()):
+        if not isinstance(sequential, nn.Sequential):
+            continue
+
+        layers = []
+        for layer in sequential:
+            if isinstance(layer, (nn.Dropout, nn.Identity)) and not layer.training:
+                removed += 1
+                continue
+
+            previous = layers[-1] if layers else None
+            if (
+                type(layer) is nn.Linear
+                and type(previous) is nn.Linear
+                and not hasattr(layer, "weight_g")
+                and not hasattr(previous, "weight_g")
+                and _is_cheaper_fused(previous, layer)
+            ):
+                layers[-1] = _fuse_linear_pair(previous, layer)
+                removed += 1
+                continue
+            layers.append(layer)
+
+        # only blocks that changed are renumbered
+        if len(layers) != len(sequential):
+            for key in list(sequential._modules.keys()):
+                del sequential._modules[key]
+            for index, layer in enumerate(layers):
+                sequential.add_module(str(index), layer)
+    return removed
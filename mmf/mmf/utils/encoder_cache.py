@@ -0,0 +1,136 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+"""
+Memory bounded LRU caches for the outputs of frozen encoders.
+
+Entries are tensors (or tuples of tensors) stored under a hashable key in one
+of several named caches, each with its own memory limit in megabytes::
+
+    cache = EncoderCache({"image": 512, "question": 64})
+    features = cache.get("image", key)
+    if features is None:
+        features = encoder(image)
+        cache.put("image", key, features)
+    cache.stats()  # {"image": {"hits": 0, "misses": 1, "entries": 1, ...}, ...}
+
+``content_hash`` computes keys from the content of loaded images, so equal
+images hit the cache even if they are different objects. Image files are keyed
+by their path, modification time and size, so they are not read for the hash.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+import torch
+from PIL import Image
+
+
+def content_hash(item: Any) -> str:
+    """Hash of the content of an image (PIL image, tensor or array), of the
+    path, modification time and size of an image file, or of any other object
+    with a stable ``repr``."""
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(item, Image.Image):
+        digest.update(f"{item.mode}{item.size}".encode())
+        digest.update(item.tobytes())
+    elif isinstance(item, torch.Tensor):
+        digest.update(f"{item.dtype}{tuple(item.shape)}".encode())
+        digest.update(item.detach().cpu().contiguous().numpy().tobytes())
+    elif isinstance(item, np.ndarray):
+        digest.update(f"{item.dtype}{item.shape}".encode())
+        digest.update(np.ascontiguousarray(item).tobytes())
+    elif isinstance(item, str) and os.path.isfile(item):
+        stat = os.stat(item)
+        digest.update(f"{os.path.abspath(item)}{stat.st_mtime_ns}{stat.st_size}".encode())
+    else:
+        digest.update(repr(item).encode())
+    return digest.hexdigest()
+
+
+def _num_bytes(value: Any) -> int:
+    if isinstance(value, torch.Tensor):
+        return value.element_size() * value.nelement()
+    if isinstance(value, (tuple, list)):
+        return sum(_num_bytes(v) for v in value)
+    return 0
+
+
+class _LRUCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.num_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key: Hashable, value: Any):
+        size = _num_bytes(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self.num_bytes -= _num_bytes(self._entries.pop(key))
+        self._entries[key] = value
+        self.num_bytes += size
+        while self.num_bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.num_bytes -= _num_bytes(evicted)
+
+    def clear(self):
+        self._entries.clear()
+        self.num_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "entries": len(self._entries),
+            "megabytes": self.num_bytes / 2 ** 20,
+        }
+
+
+class EncoderCache:
+    """Named LRU caches, ``max_megabytes`` maps each name to its memory limit.
+    Caches with a limit of 0 are disabled and always miss."""
+
+    def __init__(self, max_megabytes: Dict[str, float]):
+        self._caches = {
+            name: _LRUCache(int(megabytes * 2 ** 20))
+            for name, megabytes in max_megabytes.items()
+        }
+        self._lock = threading.Lock()
+
+    def get(self, name: str, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            return self._caches[name].get(key)
+
+    def put(self, name: str, key: Hashable, value: Any):
+        # entries are often views of a batch, which must not be kept alive
+        if isinstance(value, tuple):
+            value = tuple(v.detach().clone() for v in value)
+        else:
+            value = value.detach().clone()
+        with self._lock:
+            self._caches[name].put(key, value)
+
+    def clear(self):
+        with self._lock:
+            for cache in self._caches.values():
+                cache.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: cache.stats() for name, cache in self._caches.items()}
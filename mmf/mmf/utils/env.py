@@ -1,7 +1,9 @@
 # Copyright (c) Facebook, Inc. and its affiliates.
 
+import ast
 import glob
 import importlib
+import json
 import logging
 import os
 import random
@@ -131,15 +133,32 @@ def import_files(file_path: str, module_name: str = None):
                 importlib.import_module(f"{import_name}")
 
 
-def setup_imports():
+# Registry decorators by the registry mapping they register into
+REGISTRY_DECORATOR_MAPPINGS = {
+    "register_trainer": "trainer_name_mapping",
+    "register_builder": "builder_name_mapping",
+    "register_datamodule": "builder_name_mapping",
+    "register_callback": "callback_name_mapping",
+    "register_metric": "metric_name_mapping",
+    "register_loss": "loss_name_mapping",
+    "register_pooler": "pool_name_mapping",
+    "register_fusion": "fusion_name_mapping",
+    "register_model": "model_name_mapping",
+    "register_processor": "processor_name_mapping",
+    "register_optimizer": "optimizer_name_mapping",
+    "register_scheduler": "scheduler_name_mapping",
+    "register_encoder": "encoder_name_mapping",
+    "register_decoder": "decoder_name_mapping",
+    "register_transformer_backend": "transformer_backend_name_mapping",
+    "register_transformer_head": "transformer_head_name_mapping",
+    "register_test_reporter": "test_reporter_mapping",
+    "register_iteration_strategy": "iteration_strategy_name_mapping",
+}
+
+
+def get_mmf_root_folder():
     from mmf.common.registry import registry
 
-    # First, check if imports are already setup
-    has_already_setup = registry.get("imports_setup", no_warning=True)
-    if has_already_setup:
-        return
-    # Automatically load all of the modules, so that
-    # they register with registry
     root_folder = registry.get("mmf_root", no_warning=True)
 
     if root_folder is None:
@@ -153,28 +172,19 @@ def setup_imports():
 
         registry.register("pythia_path", root_folder)
         registry.register("mmf_path", root_folder)
+    return root_folder
 
-    trainer_folder = os.path.join(root_folder, "trainers")
-    trainer_pattern = os.path.join(trainer_folder, "**", "*.py")
-    datasets_folder = os.path.join(root_folder, "datasets")
-    datasets_pattern = os.path.join(datasets_folder, "**", "*.py")
-    model_folder = os.path.join(root_folder, "models")
-    common_folder = os.path.join(root_folder, "common")
-    modules_folder = os.path.join(root_folder, "modules")
-    model_pattern = os.path.join(model_folder, "**", "*.py")
-    common_pattern = os.path.join(common_folder, "**", "*.py")
-    modules_pattern = os.path.join(modules_folder, "**", "*.py")
 
-    importlib.import_module("mmf.common.meter")
-
-    files = (
-        glob.glob(datasets_pattern, recursive=True)
-        + glob.glob(model_pattern, recursive=True)
-        + glob.glob(trainer_pattern, recursive=True)
-        + glob.glob(common_pattern, recursive=True)
-        + glob.glob(modules_pattern, recursive=True)
-    )
+def get_registry_module_files(root_folder):
+    """Python files of the modules which register themselves with the
+    registry, by their module name"""
+    patterns = [
+        os.path.join(root_folder, folder, "**", "*.py")
+        for folder in ["datasets", "models", "trainers", "common", "modules"]
+    ]
+    files = [f for pattern in patterns for f in glob.glob(pattern, recursive=True)]
 
+    module_files = {}
     for f in files:
         f = os.path.realpath(f)
         if f.endswith(".py") and not f.endswith("__init__.py"):
@@ -186,11 +196,95 @@ def setup_imports():
             file_name = splits[-1]
             module_name = file_name[: file_name.find(".py")]
             module = ".".join(["mmf"] + splits[import_prefix_index:-1] + [module_name])
-            importlib.import_module(module)
+            module_files[module] = f
+    return module_files
+
+
+def setup_imports():
+    from mmf.common.registry import registry
+
+    # First, check if imports are already setup
+    has_already_setup = registry.get("imports_setup", no_warning=True)
+    if has_already_setup:
+        return
+    # Automatically load all of the modules, so that
+    # they register with registry
+    root_folder = get_mmf_root_folder()
+
+    importlib.import_module("mmf.common.meter")
+
+    for module in get_registry_module_files(root_folder):
+        importlib.import_module(module)
 
     registry.register("imports_setup", True)
 
 
+def build_registry_manifest(root_folder=None):
+    """Maps each name registered with a registry decorator to the module that
+    registers it, by registry mapping. The sources are parsed and not
+    imported, so only names passed as string literals are found.
+
+    Returns:
+        Dict[str, Dict[str, str]]: module names by registered name by mapping
+    """
+    if root_folder is None:
+        root_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+    manifest = {}
+    # in the order of setup_imports, so later registrations win as they do there
+    for module, path in get_registry_module_files(root_folder).items():
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+        for node in ast.walk(tree):
+            if not (
+                isinstance(node, ast.Call)
+                and isinstance(node.func, ast.Attribute)
+                and isinstance(node.func.value, ast.Name)
+                and node.func.value.id == "registry"
+                and node.func.attr in REGISTRY_DECORATOR_MAPPINGS
+                and len(node.args) == 1
+                and isinstance(node.args[0], ast.Constant)
+                and isinstance(node.args[0].value, str)
+            ):
+                continue
+            mapping = REGISTRY_DECORATOR_MAPPINGS[node.func.attr]
+            manifest.setdefault(mapping, {})[node.args[0].value] = module
+    return {
+        mapping: dict(sorted(names.items()))
+        for mapping, names in sorted(manifest.items())
+    }
+
+
+def write_registry_manifest(path=None):
+    """Writes the manifest of ``build_registry_manifest`` as the python module
+    ``mmf.common.registry_manifest``, which the registry uses to import the
+    module of a name on its first lookup."""
+    if path is None:
+        path = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)),
+            "..",
+            "common",
+            "registry_manifest.py",
+        )
+    lines = [
+        "# Copyright (c) Facebook, Inc. and its affiliates.",
+        "# Generated by tools/scripts/registry/generate_manifest.py, do not edit.",
+        "# flake8: noqa",
+        "",
+        "MANIFEST = {",
+    ]
+    for mapping, names in build_registry_manifest().items():
+        lines.append(f"    {json.dumps(mapping)}: {{")
+        lines.extend(
+            f"        {json.dumps(name)}: {json.dumps(module)},"
+            for name, module in names.items()
+        )
+        lines.append("    },")
+    lines.append("}")
+    with open(path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
 def setup_torchaudio():
     # required for soundfile
     try:
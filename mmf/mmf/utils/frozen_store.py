@@ -0,0 +1,137 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+"""
+Content addressed store for the weights of frozen submodules, used to write
+checkpoints which only contain the trainable part of a model.
+
+Each frozen submodule (all parameters with ``requires_grad=False``, e.g. the
+text and image encoders of Qlarifais) is saved once as ``<hash>.pth`` in the
+store, the checkpoint keeps the hash under ``frozen_modules`` instead of the
+weights::
+
+    store = FrozenModuleStore("/path/to/store")
+    ckpt["model"], ckpt["frozen_modules"] = store.split(model, model.state_dict())
+    ckpt["frozen_store"] = store.root
+    ...
+    ckpt = restore_frozen_modules(torch.load(path))  # full state dict again
+
+Checkpoints without ``frozen_modules`` are returned unchanged by
+``restore_frozen_modules``, so both kinds can be loaded the same way.
+"""
+
+import hashlib
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import torch
+from mmf.utils.file_io import PathManager
+
+
+logger = logging.getLogger(__name__)
+
+
+def frozen_submodules(model: torch.nn.Module) -> Dict[str, torch.nn.Module]:
+    """Outermost submodules of ``model`` with parameters, none of which
+    require gradients, by their prefix in the state dict."""
+    frozen = {}
+    for name, module in model.named_modules():
+        if not name or any(name.startswith(prefix + ".") for prefix in frozen):
+            continue
+        params = list(module.parameters())
+        if params and not any(p.requires_grad for p in params):
+            frozen[name] = module
+    return frozen
+
+
+def state_hash(state_dict: Dict[str, torch.Tensor]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for key in sorted(state_dict):
+        value = state_dict[key]
+        digest.update(f"{key}{value.dtype}{tuple(value.shape)}".encode())
+        # numpy has no bfloat16, hash the raw bytes instead
+        value = value.detach().cpu().contiguous().reshape(-1)
+        digest.update(value.view(torch.uint8).numpy().tobytes())
+    return digest.hexdigest()
+
+
+class FrozenModuleStore:
+    """Saves and loads the state dicts of frozen submodules in ``root`` by the
+    hash of their content. Hashes are memoized on the storage and version
+    counter of the tensors, so unchanged modules are only hashed once."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._hashes = {}
+        PathManager.mkdirs(root)
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, f"{digest}.pth")
+
+    def put(self, state_dict: Dict[str, torch.Tensor]) -> str:
+        memo_key = tuple(
+            (key, value.data_ptr(), value._version, value.dtype, tuple(value.shape))
+            for key, value in sorted(state_dict.items())
+        )
+        digest = self._hashes.get(memo_key)
+        if digest is None:
+            digest = state_hash(state_dict)
+            self._hashes[memo_key] = digest
+
+        path = self.path(digest)
+        if not PathManager.exists(path):
+            # write to a temporary file first, so that concurrent runs sharing
+            # the store never read a partially written file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with PathManager.open(tmp_path, "wb") as f:
+                torch.save({k: v.cpu() for k, v in state_dict.items()}, f)
+            PathManager.mv(tmp_path, path)
+        return digest
+
+    def get(self, digest: str) -> Dict[str, torch.Tensor]:
+        with PathManager.open(self.path(digest), "rb") as f:
+            return torch.load(f, map_location=lambda storage, loc: storage)
+
+    def split(
+        self, model: torch.nn.Module, state_dict: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Puts the frozen submodules of ``model`` in the store.
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, str]]: ``state_dict`` without the
+            frozen submodules and the hash of each frozen submodule by prefix.
+        """
+        trainable = dict(state_dict)
+        references = {}
+        for prefix in frozen_submodules(model):
+            module_state = {
+                key[len(prefix) + 1 :]: trainable.pop(key)
+                for key in list(trainable)
+                if key.startswith(prefix + ".")
+            }
+            if module_state:
+                references[prefix] = self.put(module_state)
+        return trainable, references
+
+
+def restore_frozen_modules(
+    ckpt: Dict[str, Any], store_dir: Optional[str] = None
+) -> Dict[str, Any]:
+    """Adds the weights of the frozen submodules referenced by ``ckpt`` back
+    to ``ckpt["model"]``, from ``store_dir`` or else the store the checkpoint
+    was saved with."""
+    references = ckpt.pop("frozen_modules", None)
+    store_dirs = [d for d in (store_dir, ckpt.pop("frozen_store", None)) if d]
+    if not references:
+        return ckpt
+
+    for prefix, digest in references.items():
+        paths = [os.path.join(d, f"{digest}.pth") for d in store_dirs]
+        paths = [path for path in paths if PathManager.exists(path)]
+        assert paths, f"Frozen module {prefix} ({digest}) is missing from {store_dirs}"
+        with PathManager.open(paths[0], "rb") as f:
+            module_state = torch.load(f, map_location=lambda storage, loc: storage)
+        for key, value in module_state.items():
+            ckpt["model"][f"{prefix}.{key}"] = value
+    logger.info(f"Restored {len(references)} frozen modules from {store_dirs}")
+    return ckpt
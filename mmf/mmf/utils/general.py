@@ -1,6 +1,7 @@
 # Copyright (c) Facebook, Inc. and its affiliates.
 
 import collections
+import contextlib
 import gc
 import logging
 import math
@@ -9,7 +10,7 @@ import sys
 import time
 import warnings
 from bisect import bisect
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, List
 
 import torch
 from mmf.utils.distributed import get_rank, get_world_size, is_xla
@@ -413,6 +414,80 @@ def assert_iterator_finished(iter):
         assert False
 
 
+@contextlib.contextmanager
+def skip_init_weights():
+    """Turns the ``torch.nn.init`` initializers into no-ops, so that modules
+    whose weights are overwritten right after, e.g. from a checkpoint, are
+    built without spending time on their random initialization.
+    """
+    initializers = {
+        name: getattr(nn.init, name)
+        for name in dir(nn.init)
+        if name.endswith("_") and not name.startswith("_")
+    }
+
+    def skip(tensor, *args, **kwargs):
+        return tensor
+
+    try:
+        for name in initializers:
+            setattr(nn.init, name, skip)
+        yield
+    finally:
+        for name, initializer in initializers.items():
+            setattr(nn.init, name, initializer)
+
+
+def reset_missing_parameters(module: nn.Module, missing_keys: List[str]) -> List[str]:
+    """Re-initializes the parameters in ``missing_keys`` of a module loaded
+    from a checkpoint, which are left uninitialized if the module was built
+    under ``skip_init_weights``. Calls ``reset_parameters`` of the submodules
+    that own them, and keeps the loaded values of their other parameters and
+    buffers. Returns the names of the re-initialized submodules.
+    """
+    owners = {}
+    for key in missing_keys:
+        prefix, _, name = key.rpartition(".")
+        owners.setdefault(prefix, set()).add(name)
+
+    for prefix, missing in owners.items():
+        owner = module.get_submodule(prefix)
+        if not hasattr(owner, "reset_parameters"):
+            raise RuntimeError(
+                f"{sorted(missing)} of {prefix} ({type(owner).__name__}) are missing "
+                "from the checkpoint and the module cannot be re-initialized"
+            )
+        tensors = dict(owner.named_parameters(recurse=False))
+        tensors.update(owner.named_buffers(recurse=False))
+        loaded = {
+            name: tensor.detach().clone()
+            for name, tensor in tensors.items()
+            if name not in missing and tensor is not None
+        }
+        owner.reset_parameters()
+        with torch.no_grad():
+            for name, tensor in loaded.items():
+                getattr(owner, name).copy_(tensor)
+    return list(owners)
+
+
+def get_autocast(training_config):
+    """Autocast context for the forward pass of the model, float16 on GPU
+    with ``training.fp16`` or bfloat16 on CPU with ``training.cpu_amp``.
+    """
+    if training_config.get("cpu_amp", False):
+        return torch.autocast(device_type="cpu", dtype=torch.bfloat16)
+    return torch.cuda.amp.autocast(enabled=training_config.fp16)
+
+
+def is_cpu_autocast_enabled():
+    # torch.is_autocast_cpu_enabled is deprecated in recent versions of torch
+    try:
+        return torch.is_autocast_enabled("cpu")
+    except TypeError:
+        return torch.is_autocast_cpu_enabled()
+
+
 def get_current_device():
     if is_xla():
         import torch_xla.core.xla_model as xm
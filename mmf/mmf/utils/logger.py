@@ -390,6 +390,10 @@ class TensorboardLogger:
         for key, val in scalar_dict.items():
             self.summary_writer.add_scalar(key, val, iteration)
 
+    @skip_if_tensorboard_inactive
+    def add_histogram_raw(self, key, iteration, **histogram):
+        self.summary_writer.add_histogram_raw(key, global_step=iteration, **histogram)
+
     @skip_if_tensorboard_inactive
     def add_histogram_for_model(self, model, iteration):
         for name, param in model.named_parameters():
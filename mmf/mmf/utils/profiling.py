@@ -0,0 +1,231 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+"""
+Low overhead profiler of named spans, e.g. the stages of a model's forward or
+the steps of the training loop::
+
+    from mmf.utils.profiling import span
+
+    with span("text_encoder"):
+        question = self.language_module(input_ids)
+
+Spans are no-ops until the profiler is enabled with ``configure_profiler``,
+which the trainer does from ``training.profiling``. Enabled, a span costs two
+``time.perf_counter`` calls and an update of a fixed size histogram, no
+tensors are synchronized (unless ``cuda_sync`` is set), so the durations of
+cuda ops only include their launch.
+
+``get_profiler().summarize()`` returns the statistics of each span since the
+last summary together with the peak memory, ``emit`` additionally writes them
+to the logger, a ``TensorboardLogger`` and a trace file with one json
+object per interval.
+"""
+
+import bisect
+import json
+import logging
+import resource
+import time
+from contextlib import nullcontext
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import torch
+from mmf.utils.file_io import PathManager
+
+
+logger = logging.getLogger(__name__)
+
+# upper edges of the duration histograms in ms, from 1/16 ms to ~65 s
+BUCKET_EDGES_MS = [2.0 ** exponent for exponent in range(-4, 17)]
+
+_NULL_SPAN = nullcontext()
+
+
+class SpanStats:
+    __slots__ = ("count", "total", "sum_squares", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.sum_squares = 0.0
+        self.max = 0.0
+        # the last bucket counts everything above the last edge
+        self.buckets = [0] * (len(BUCKET_EDGES_MS) + 1)
+
+    def add(self, duration_ms: float):
+        self.count += 1
+        self.total += duration_ms
+        self.sum_squares += duration_ms * duration_ms
+        if duration_ms > self.max:
+            self.max = duration_ms
+        self.buckets[bisect.bisect_left(BUCKET_EDGES_MS, duration_ms)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper edge of the bucket of the ``q`` quantile, at most the max"""
+        threshold = q * self.count
+        cumulative = 0
+        for idx, count in enumerate(self.buckets):
+            cumulative += count
+            if cumulative >= threshold and count:
+                break
+        if idx == len(BUCKET_EDGES_MS):
+            return self.max
+        return min(BUCKET_EDGES_MS[idx], self.max)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": self.total,
+            "mean_ms": self.total / self.count,
+            "p50_ms": self.quantile(0.5),
+            "p90_ms": self.quantile(0.9),
+            "max_ms": self.max,
+            "histogram": self.buckets,
+        }
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "SpanProfiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        if self.profiler.cuda_sync:
+            torch.cuda.synchronize()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        if self.profiler.cuda_sync:
+            torch.cuda.synchronize()
+        self.profiler.record(self.name, (time.perf_counter() - self.start) * 1000)
+
+
+class SpanProfiler:
+    def __init__(self):
+        self.enabled = False
+        self.cuda_sync = False
+        self.trace_file = None
+        self.reset()
+
+    def configure(
+        self,
+        enabled: bool = False,
+        cuda_sync: bool = False,
+        trace_file: Optional[str] = None,
+    ):
+        self.enabled = enabled
+        self.cuda_sync = cuda_sync and torch.cuda.is_available()
+        self.trace_file = trace_file
+        self.reset()
+
+    def reset(self):
+        self._stats = {}
+        self._interval_start = time.perf_counter()
+
+    def span(self, name: str):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name: str, duration_ms: float):
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = SpanStats()
+        stats.add(duration_ms)
+
+    def iterate(self, name: str, iterable: Iterable) -> Iterator:
+        """Yields from ``iterable`` and records the time of each ``next`` as
+        span ``name``, e.g. the time spent waiting for a dataloader"""
+        if not self.enabled:
+            yield from iterable
+            return
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.record(name, (time.perf_counter() - start) * 1000)
+            yield item
+
+    def summarize(self) -> Dict[str, Any]:
+        """Statistics of all spans and the peak memory since the last summary,
+        then starts a new interval. The peak RSS is the peak of the process."""
+        summary = {
+            "interval_s": time.perf_counter() - self._interval_start,
+            "spans": {
+                name: stats.summary() for name, stats in sorted(self._stats.items())
+            },
+            # in kilobytes on linux
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }
+        if torch.cuda.is_available() and torch.cuda.is_initialized():
+            summary["peak_allocated_mb"] = torch.cuda.max_memory_allocated() / 2 ** 20
+            torch.cuda.reset_peak_memory_stats()
+        self.reset()
+        return summary
+
+    def emit(self, iteration: int, tb_writer=None) -> Optional[Dict[str, Any]]:
+        """Summarizes the interval and writes it to the logger, ``tb_writer``
+        and the trace file"""
+        if not self.enabled:
+            return None
+        # summarize starts a new interval, keep the raw histograms
+        raw_stats = self._stats
+        summary = self.summarize()
+        spans = summary["spans"]
+
+        memory = {k: v for k, v in summary.items() if k.startswith("peak_")}
+        logger.info(
+            f"Profile of the last {summary['interval_s']:.1f}s: "
+            + ", ".join(
+                f"{name} {stats['mean_ms']:.2f}ms (p90 {stats['p90_ms']:.2f}ms)"
+                for name, stats in spans.items()
+            )
+            + "".join(f", {key} {value:.0f}" for key, value in memory.items())
+        )
+
+        if tb_writer is not None:
+            scalars = {f"profiling/{key}": value for key, value in memory.items()}
+            for name, stats in spans.items():
+                for key in ("mean_ms", "p50_ms", "p90_ms", "max_ms"):
+                    scalars[f"profiling/{name}/{key}"] = stats[key]
+            tb_writer.add_scalars(scalars, iteration)
+            for name, stats in raw_stats.items():
+                tb_writer.add_histogram_raw(
+                    f"profiling/{name}",
+                    min=0.0,
+                    max=stats.max,
+                    num=stats.count,
+                    sum=stats.total,
+                    sum_squares=stats.sum_squares,
+                    bucket_limits=BUCKET_EDGES_MS + [max(stats.max, 2.0 ** 17)],
+                    bucket_counts=stats.buckets,
+                    iteration=iteration,
+                )
+
+        if self.trace_file is not None:
+            with PathManager.open(self.trace_file, "a") as f:
+                f.write(json.dumps({"iteration": iteration, **summary}) + "\n")
+        return summary
+
+
+_profiler = SpanProfiler()
+
+
+def get_profiler() -> SpanProfiler:
+    return _profiler
+
+
+def configure_profiler(**kwargs) -> SpanProfiler:
+    _profiler.configure(**kwargs)
+    return _profiler
+
+
+def span(name: str):
+    """Context manager which records the time of its body as span ``name``"""
+    return _profiler.span(name)
@@ -0,0 +1,180 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+"""
+Dynamic micro-batching for serving a model to concurrent clients.
+
+Requests are put on a queue by any number of threads. A single worker thread
+collects them into micro-batches, which are closed either when ``max_batch_size``
+requests are waiting or when the oldest request has waited ``max_wait_ms``, and
+runs ``batch_fn`` once per micro-batch. If a micro-batch fails, its requests
+are run one at a time, so a bad request only fails itself::
+
+    batcher = MicroBatcher(lambda items: [len(item) for item in items])
+    batcher.start()
+    batcher.submit("question")  # blocks until the batch containing it is done
+    batcher.stats()  # {"queue_depth": 0, "p50_ms": ..., "p99_ms": ..., ...}
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class _Request:
+    def __init__(self, item: Any):
+        self.item = item
+        self.result = None
+        self.error = None
+        self.enqueue_time = time.perf_counter()
+        self.done = threading.Event()
+
+
+class LatencyStats:
+    """Keeps the last ``window`` latencies and reports percentiles over them."""
+
+    def __init__(self, window: int = 10000):
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def add(self, latency: float):
+        with self._lock:
+            self._latencies.append(latency)
+            self.count += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) == 0:
+            return None
+        index = min(len(latencies) - 1, int(round(q / 100 * (len(latencies) - 1))))
+        return latencies[index]
+
+
+class MicroBatcher:
+    """Groups concurrent requests into micro-batches for ``batch_fn``.
+
+    Args:
+        batch_fn (Callable[[List[Any]], List[Any]]): Runs a list of items and
+            returns a list of results in the same order.
+        max_batch_size (int): Maximum number of requests in a micro-batch.
+        max_wait_ms (float): Maximum time the oldest request in a micro-batch
+            waits for more requests before the batch is run.
+        max_queue_size (int): Requests beyond this many waiting ones are
+            rejected with ``queue.Full``. 0 means unbounded.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+        max_queue_size: int = 0,
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._thread = None
+        self._running = False
+        self.latency = LatencyStats()
+        self.batch_sizes = LatencyStats()
+        self.num_batches = 0
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> Any:
+        request = _Request(item)
+        self._queue.put_nowait(request)
+        if not request.done.wait(timeout):
+            raise TimeoutError("Request was not processed in time")
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, Any]:
+        def to_ms(value):
+            return None if value is None else round(value * 1000, 3)
+
+        return {
+            "queue_depth": self.queue_depth(),
+            "num_requests": self.latency.count,
+            "num_batches": self.num_batches,
+            "p50_ms": to_ms(self.latency.percentile(50)),
+            "p99_ms": to_ms(self.latency.percentile(99)),
+            "p50_batch_size": self.batch_sizes.percentile(50),
+            "max_batch_size": self.max_batch_size,
+        }
+
+    def _collect(self) -> List[_Request]:
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = first.enqueue_time + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run_batch(self, batch: List[_Request]):
+        results = self.batch_fn([request.item for request in batch])
+        assert len(results) == len(batch), "batch_fn must return one result per item"
+        for request, result in zip(batch, results):
+            request.result = result
+
+    def _run(self):
+        while self._running:
+            batch = self._collect()
+            if len(batch) == 0:
+                continue
+            try:
+                self._run_batch(batch)
+            except Exception as e:
+                if len(batch) == 1:
+                    logger.exception("Request failed")
+                    batch[0].error = e
+                else:
+                    logger.warning(
+                        f"Micro-batch of {len(batch)} failed ({e}), "
+                        "running its requests one at a time"
+                    )
+                    for request in batch:
+                        try:
+                            self._run_batch([request])
+                        except Exception as error:
+                            logger.exception("Request failed")
+                            request.error = error
+
+            now = time.perf_counter()
+            self.num_batches += 1
+            self.batch_sizes.add(len(batch))
+            for request in batch:
+                self.latency.add(now - request.enqueue_time)
+                request.done.set()
@@ -61,6 +61,17 @@ def generate_ngrams_range(tokens, ngram_range=(1, 3)):
     return chain(*(generate_ngrams(tokens, i) for i in range(*ngram_range)))
 
 
+def trim_padding(input_ids, input_mask=None, pad_token_id=0):
+    """Trims a batch of padded token ids and their attention mask to the
+    longest actual sequence in the batch. The mask is derived from the
+    padding token if not given.
+    """
+    if input_mask is None:
+        input_mask = (input_ids != pad_token_id).long()
+    length = max(int(input_mask.sum(1).max()), 1)
+    return input_ids[:, :length], input_mask[:, :length]
+
+
 def tokenize(sentence, regex=SENTENCE_SPLIT_REGEX, keep=None, remove=None):
     if keep is None:
         keep = ["'s"]
@@ -1,7 +1,10 @@
 # Copyright (c) Facebook, Inc. and its affiliates.
+import hashlib
 import logging
 import os
+import shutil
 from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 import torch
@@ -17,6 +20,71 @@ EMBEDDING_NAME_CLASS_MAPPING = {"glove": "GloVe", "fasttext": "FastText"}
 logger = logging.getLogger(__name__)
 
 
+def _vocab_cache_path(embedding_name: str, vocab_file: Optional[str] = None) -> str:
+    """Directory of the cached vectors of ``embedding_name`` restricted to the
+    words of ``vocab_file``, keyed by the content of the vocab file."""
+    key = embedding_name
+    if vocab_file is not None:
+        digest = hashlib.blake2b(digest_size=16)
+        with PathManager.open(vocab_file, "rb") as f:
+            digest.update(f.read())
+        key = f"{embedding_name}-{digest.hexdigest()}"
+    return os.path.join(get_mmf_cache_dir(), "vocab_cache", key)
+
+
+def _load_vocab_cache(path: str) -> Optional[Tuple[List[str], torch.Tensor]]:
+    if not PathManager.exists(os.path.join(path, "vectors.npy")):
+        return None
+    with PathManager.open(os.path.join(path, "itos.txt"), "r") as f:
+        itos = f.read().split("\n")
+    # copy on write, pages are shared between processes until the embedding
+    # initialized from the vectors is trained
+    vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="c")
+    logger.info(f"Loaded cached vocab vectors from {path}")
+    return itos, torch.from_numpy(vectors)
+
+
+def _save_vocab_cache(path: str, itos: List[str], vectors: torch.Tensor):
+    # written to a temporary directory first, so that a partially written
+    # cache is never read
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    PathManager.mkdirs(tmp_path)
+    with PathManager.open(os.path.join(tmp_path, "itos.txt"), "w") as f:
+        f.write("\n".join(itos))
+    np.save(os.path.join(tmp_path, "vectors.npy"), vectors.numpy())
+    try:
+        os.rename(tmp_path, path)
+    except OSError:
+        # another process wrote the cache in the meantime
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def _gather_vectors(
+    words: List[str],
+    embedding_stoi: Dict[str, int],
+    embedding_vectors: torch.Tensor,
+    num_predefined: int = 4,
+    unk_index: int = 3,
+) -> torch.Tensor:
+    """Vectors of the predefined tokens (``0.1 * index``) followed by the
+    vectors of ``words``, gathered from ``embedding_vectors`` at once. Words
+    missing from the embedding get the vector of the unknown token."""
+    embedding_dim = embedding_vectors.size(1)
+    vectors = torch.empty((num_predefined + len(words), embedding_dim))
+    vectors[:num_predefined] = (
+        0.1 * torch.arange(num_predefined, dtype=torch.float).unsqueeze(1)
+    )
+
+    indices = torch.tensor(
+        [embedding_stoi.get(word, -1) for word in words], dtype=torch.long
+    )
+    found = indices >= 0
+    word_vectors = vectors[num_predefined:]
+    word_vectors[found] = embedding_vectors[indices[found]].float()
+    word_vectors[~found] = vectors[unk_index]
+    return vectors
+
+
 class Vocab:
     def __init__(self, *args, **params):
         vocab_type = params.get("type", "pretrained")
@@ -103,6 +171,7 @@ class BaseVocab:
 
         """
         self.type = "base"
+        self.vocab_file = None
         self.word_dict = {}
         self.itos = {}
 
@@ -127,6 +196,7 @@ class BaseVocab:
 
             if not PathManager.exists(vocab_file):
                 raise RuntimeError("Vocab not found at " + vocab_file)
+            self.vocab_file = vocab_file
 
             with PathManager.open(vocab_file, "r") as f:
                 for line in f:
@@ -263,6 +333,10 @@ class IntersectedVocab(BaseVocab):
          'glove.twitter.27B.200d', 'glove.6B.50d', 'glove.6B.100d',
          'glove.6B.200d', 'glove.6B.300d']
 
+        The intersected vectors are cached in the MMF cache directory by the
+        content of the vocab file and the embedding name, later runs memory
+        map them instead of loading the full embedding.
+
         Parameters
         ----------
         vocab_file : str
@@ -276,6 +350,14 @@ class IntersectedVocab(BaseVocab):
 
         self.type = "intersected"
 
+        words = [self.itos[i] for i in range(self.total_predefined, self.get_size())]
+        cache_path = _vocab_cache_path(embedding_name, self.vocab_file)
+        cached = _load_vocab_cache(cache_path)
+        if cached is not None and cached[0] == words:
+            self.vectors = cached[1]
+            self.embedding_dim = self.vectors.size(1)
+            return
+
         name = embedding_name.split(".")[0]
         dim = embedding_name.split(".")[2][:-1]
         middle = embedding_name.split(".")[1]
@@ -300,23 +382,13 @@ class IntersectedVocab(BaseVocab):
 
         embedding = getattr(vocab, class_name)(*params, cache=vector_cache)
 
-        self.vectors = torch.empty(
-            (self.get_size(), len(embedding.vectors[0])), dtype=torch.float
+        self.vectors = _gather_vectors(
+            words, embedding.stoi, embedding.vectors, self.total_predefined
         )
+        self.embedding_dim = self.vectors.size(1)
 
-        self.embedding_dim = len(embedding.vectors[0])
-
-        for i in range(0, 4):
-            self.vectors[i] = torch.ones_like(self.vectors[i]) * 0.1 * i
-
-        for i in range(4, self.get_size()):
-            word = self.itos[i]
-            embedding_index = embedding.stoi.get(word, None)
-
-            if embedding_index is None:
-                self.vectors[i] = self.vectors[self.UNK_INDEX]
-            else:
-                self.vectors[i] = embedding.vectors[embedding_index]
+        if is_main():
+            _save_vocab_cache(cache_path, words, self.vectors)
 
     def get_embedding_dim(self):
         return self.embedding_dim
@@ -338,15 +410,24 @@ class PretrainedVocab(BaseVocab):
         if embedding_name not in vocab.pretrained_aliases:
             raise RuntimeError(f"Unknown embedding type: {embedding_name}")
 
-        vector_cache = get_mmf_cache_dir()
+        cache_path = _vocab_cache_path(embedding_name)
+        cached = _load_vocab_cache(cache_path)
+        if cached is not None:
+            words, self.vectors = cached
+        else:
+            vector_cache = get_mmf_cache_dir()
 
-        # First test loading the vectors in master so that everybody doesn't
-        # download it in case it doesn't exist
-        if is_main():
-            vocab.pretrained_aliases[embedding_name](cache=vector_cache)
-        synchronize()
+            # First test loading the vectors in master so that everybody doesn't
+            # download it in case it doesn't exist
+            if is_main():
+                vocab.pretrained_aliases[embedding_name](cache=vector_cache)
+            synchronize()
 
-        embedding = vocab.pretrained_aliases[embedding_name](cache=vector_cache)
+            embedding = vocab.pretrained_aliases[embedding_name](cache=vector_cache)
+            words = list(embedding.stoi)
+            self.vectors = _gather_vectors(words, embedding.stoi, embedding.vectors)
+            if is_main():
+                _save_vocab_cache(cache_path, words, self.vectors)
 
         self.UNK_INDEX = 3
         self.stoi = defaultdict(lambda: self.UNK_INDEX)
@@ -362,20 +443,9 @@ class PretrainedVocab(BaseVocab):
         self.stoi[self.PAD_TOKEN] = self.PAD_INDEX
         self.stoi[self.UNK_TOKEN] = self.UNK_INDEX
 
-        self.vectors = torch.FloatTensor(
-            len(self.itos.keys()) + len(embedding.itos), len(embedding.vectors[0])
-        )
-
-        for i in range(4):
-            self.vectors[i] = torch.ones_like(self.vectors[i]) * 0.1 * i
-
-        index = 4
-        for word in embedding.stoi:
+        for index, word in enumerate(words, start=4):
             self.itos[index] = word
             self.stoi[word] = index
-            actual_index = embedding.stoi[word]
-            self.vectors[index] = embedding.vectors[actual_index]
-            index += 1
 
 
 class WordToVectorDict:
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3 -u
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+"""
+Local HTTP inference server for Qlarifais with dynamic micro-batching.
+
+Holds one model in memory and batches concurrent requests together::
+
+    mmf_serve --model_path save/models/qlarifais_final.pth \
+        --torch_cache /work3/s194253 --port 8080 --max_batch_size 16
+
+    curl -X POST localhost:8080/predict \
+        -d '{"image": "https://example.com/rain.jpg", "question": "What is falling?"}'
+    curl localhost:8080/stats
+
+`image` can be an http(s) url or a base64 encoded image, and also a path on the
+server if it is started with --allow_local_paths. Optional request fields are
+`top_k` (default 5) and `embeddings` (default false). Images are loaded and
+decoded per request before they are batched, so a bad image only fails its own
+request.
+"""
+
+import argparse
+import base64
+import io
+import json
+import logging
+import os
+import tempfile
+import typing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import torch
+import torchvision.datasets.folder as tv_helpers
+from mmf.utils.download import download
+from mmf.utils.logger import setup_logger
+from mmf.utils.serving import MicroBatcher
+from PIL import Image
+
+
+logger = logging.getLogger("mmf_cli.serve")
+
+
+def load_image(image: str, allow_local_paths: bool = False):
+    if image.startswith(("http://", "https://")):
+        temp_file = tempfile.NamedTemporaryFile()
+        download(image, *os.path.split(temp_file.name), disable_tqdm=True)
+        loaded = tv_helpers.default_loader(temp_file.name)
+        temp_file.close()
+        return loaded
+    if allow_local_paths and os.path.isfile(image):
+        return tv_helpers.default_loader(image)
+    try:
+        data = base64.b64decode(image, validate=True)
+    except ValueError:
+        sources = "an http(s) url, a local path" if allow_local_paths else "an http(s) url"
+        raise ValueError(f"image must be {sources} or a base64 encoded image")
+    # convert decodes the whole image, so broken images fail here
+    return Image.open(io.BytesIO(data)).convert("RGB")
+
+
+def build_batch_fn(interface):
+    def batch_fn(requests):
+        top_k = max(request["top_k"] for request in requests)
+        embedding_output = any(request["embeddings"] for request in requests)
+        results = interface.classify_batch(
+            [request["image"] for request in requests],
+            [request["question"] for request in requests],
+            top_k=top_k,
+            embedding_output=embedding_output,
+        )
+        for request, result in zip(requests, results):
+            result["answers"] = result["answers"][: request["top_k"]]
+            result["confidences"] = result["confidences"][: request["top_k"]]
+            if not request["embeddings"]:
+                result.pop("embedding", None)
+        return results
+
+    return batch_fn
+
+
+def build_handler(
+    batcher: MicroBatcher,
+    timeout: float,
+    cache_stats_fn: typing.Optional[typing.Callable[[], typing.Dict]] = None,
+    allow_local_paths: bool = False,
+):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                stats = batcher.stats()
+                if cache_stats_fn is not None:
+                    stats["encoder_cache"] = cache_stats_fn()
+                self._send(200, stats)
+            elif self.path == "/health":
+                self._send(200, {"status": "ok"})
+            else:
+                self._send(404, {"error": f"Unknown path {self.path}"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                self._send(404, {"error": f"Unknown path {self.path}"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length))
+                request = {
+                    "image": load_image(payload["image"], allow_local_paths),
+                    "question": payload["question"],
+                    "top_k": int(payload.get("top_k", 5)),
+                    "embeddings": bool(payload.get("embeddings", False)),
+                }
+            except Exception as e:
+                self._send(400, {"error": f"Invalid request: {e}"})
+                return
+
+            try:
+                result = batcher.submit(request, timeout=timeout)
+            except Exception as e:
+                self._send(503, {"error": str(e)})
+                return
+            self._send(200, result)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return Handler
+
+
+def get_parser():
+    parser = argparse.ArgumentParser("Qlarifais inference server")
+    parser.add_argument("--model_path", required=True, help="saved model to serve")
+    parser.add_argument(
+        "--torch_cache", required=True, help="directory containing the torch cache"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--device", default=None, help="defaults to cuda if available")
+    parser.add_argument(
+        "--max_batch_size", type=int, default=16, help="requests per micro-batch"
+    )
+    parser.add_argument(
+        "--max_wait_ms",
+        type=float,
+        default=10.0,
+        help="max time a request waits for its micro-batch to fill up",
+    )
+    parser.add_argument(
+        "--max_queue_size",
+        type=int,
+        default=256,
+        help="waiting requests beyond this are rejected, 0 for unbounded",
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=60.0, help="per request timeout in seconds"
+    )
+    parser.add_argument(
+        "--image_cache_mb",
+        type=float,
+        default=None,
+        help="memory limit of the image feature cache, 0 disables it",
+    )
+    parser.add_argument(
+        "--allow_local_paths",
+        "--allow-local-paths",
+        action="store_true",
+        help="also accept paths to images on the server, only use this if the "
+        "server is not reachable by untrusted clients",
+    )
+    return parser
+
+
+def serve(opts: typing.Optional[typing.List[str]] = None):
+    args = get_parser().parse_args(opts)
+    setup_logger()
+
+    from mmf.models import Qlarifais
+
+    device = args.device or ("cuda:0" if torch.cuda.is_available() else "cpu")
+    encoder_cache_mb = None
+    if args.image_cache_mb is not None:
+        encoder_cache_mb = {"image": args.image_cache_mb}
+    interface = Qlarifais.from_pretrained(
+        args.model_path, args.torch_cache, encoder_cache_mb=encoder_cache_mb
+    )
+    interface.to(torch.device(device))
+    interface.eval()
+
+    batcher = MicroBatcher(
+        build_batch_fn(interface),
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        max_queue_size=args.max_queue_size,
+    )
+    batcher.start()
+
+    server = ThreadingHTTPServer(
+        (args.host, args.port),
+        build_handler(
+            batcher,
+            args.timeout,
+            interface.encoder_cache.stats,
+            allow_local_paths=args.allow_local_paths,
+        ),
+    )
+    logger.info(f"Serving {args.model_path} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.stop()
+        logger.info(f"Final stats: {batcher.stats()}")
+
+
+if __name__ == "__main__":
+    serve()
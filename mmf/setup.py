@@ -157,6 +157,7 @@ if __name__ == "__main__":
                 "mmf_predict = mmf_cli.predict:predict",
                 "mmf_convert_hm = mmf_cli.hm_convert:main",
                 "mmf_interactive = mmf_cli.interactive:interactive",
+                "mmf_serve = mmf_cli.serve:serve",
             ]
         },
     )
@@ -0,0 +1,39 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+import unittest
+from unittest import mock
+
+import torch
+from mmf.common.registry import registry
+from mmf.common.registry_manifest import MANIFEST
+from mmf.utils.env import build_registry_manifest
+
+
+class TestRegistry(unittest.TestCase):
+    def test_manifest_is_up_to_date(self):
+        self.assertEqual(
+            build_registry_manifest(),
+            MANIFEST,
+            "Run tools/scripts/registry/generate_manifest.py to update it",
+        )
+
+    def test_lazy_lookup(self):
+        class LazyLoss(torch.nn.Module):
+            pass
+
+        def import_module(module):
+            registry.register_loss("lazy_loss")(LazyLoss)
+
+        with mock.patch.dict(
+            MANIFEST["loss_name_mapping"], {"lazy_loss": "mmf.modules.lazy_loss"}
+        ), mock.patch(
+            "mmf.common.registry.importlib.import_module", side_effect=import_module
+        ) as import_mock:
+            try:
+                self.assertIs(registry.get_loss_class("lazy_loss"), LazyLoss)
+                self.assertIs(registry.get_loss_class("lazy_loss"), LazyLoss)
+                import_mock.assert_called_once_with("mmf.modules.lazy_loss")
+
+                self.assertIsNone(registry.get_loss_class("not_registered"))
+                import_mock.assert_called_once()
+            finally:
+                registry.mapping["loss_name_mapping"].pop("lazy_loss", None)
@@ -0,0 +1,43 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+import os
+import unittest
+
+import torch
+from mmf.datasets.answer_targets import SoftScoreTable
+from mmf.datasets.processors.processors import VQAAnswerProcessor
+from omegaconf import OmegaConf
+
+
+class TestSoftScoreTable(unittest.TestCase):
+    def setUp(self):
+        vocab_path = os.path.join(
+            os.path.abspath(__file__), "..", "..", "data", "vocab.txt"
+        )
+        config = OmegaConf.create(
+            {
+                "vocab_file": os.path.abspath(vocab_path),
+                "num_answers": 10,
+                "preprocessor": {"type": "simple_word", "params": {}},
+            }
+        )
+        self.answer_processor = VQAAnswerProcessor(config)
+
+    def test_dense_matches_answer_processor(self):
+        all_answers = [
+            ["man"] * 6 + ["helmet"] * 4,
+            None,
+            ["Red", "red", "man", "unknown answer"],
+            ["countryside"] * 10,
+        ]
+        table = SoftScoreTable.build(all_answers, self.answer_processor)
+        self.assertEqual(len(table), 4)
+
+        rows = torch.tensor([3, 0, 1, 2, 0])
+        targets = table.dense(rows)
+        self.assertEqual(targets.size(), (5, self.answer_processor.get_vocab_size()))
+        for target, row in zip(targets, rows.tolist()):
+            if all_answers[row] is None:
+                self.assertEqual(target.abs().sum().item(), 0)
+                continue
+            expected = self.answer_processor({"answers": all_answers[row]})
+            self.assertTrue(torch.equal(target, expected["answers_scores"]))
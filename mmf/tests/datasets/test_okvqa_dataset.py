@@ -0,0 +1,59 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+import unittest
+from types import SimpleNamespace
+
+import torch
+from mmf.datasets.builders.okvqa.dataset import OKVQADataset
+from mmf.utils.text import VocabDict
+
+
+class TestOKVQADatasetPredictions(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(1234)
+        answer_vocab = VocabDict.__new__(VocabDict)
+        answer_vocab.word_list = ["<unk>", "cat", "dog", "man 's hat", "rain", "sun"]
+        answer_vocab._build()
+
+        self.answer_processor = SimpleNamespace(
+            answer_vocab=answer_vocab,
+            graph_vocab=["sun", "cat", "rain"],
+            get_true_vocab_size=lambda: len(answer_vocab),
+            idx2word=answer_vocab.idx2word,
+        )
+        self.dataset = OKVQADataset.__new__(OKVQADataset)
+        self.dataset.answer_processor = self.answer_processor
+
+    def test_collapse_graph_scores(self):
+        scores = torch.rand(4, 9)
+        collapsed = self.dataset._collapse_graph_scores(scores)
+
+        expected = scores.clone()
+        for batch_ind in range(scores.size(0)):
+            for graph_ind, graph_ans in enumerate(self.answer_processor.graph_vocab):
+                reg_idx = self.answer_processor.answer_vocab.word2idx(graph_ans)
+                expected[batch_ind, reg_idx] = max(
+                    expected[batch_ind, 6 + graph_ind], expected[batch_ind, reg_idx]
+                )
+                expected[batch_ind, 6 + graph_ind] = -float("Inf")
+        self.assertTrue(torch.equal(collapsed, expected))
+
+    def test_format_for_prediction(self):
+        scores = torch.tensor(
+            [
+                [0.0, 0.1, 0.2, 0.9, 0.3, 0.4],
+                [0.6, 0.5, 0.4, 0.3, 0.2, 0.1],
+            ]
+        )
+        report = SimpleNamespace(scores=scores, id=torch.tensor([7, 3]))
+        predictions = self.dataset.format_for_prediction(report)
+
+        self.assertEqual(
+            [prediction["question_id"] for prediction in predictions], [7, 3]
+        )
+        self.assertEqual(predictions[0]["answer"], "man's hat")
+        self.assertEqual(predictions[1]["answer"], "<unk>")
+        self.assertEqual(
+            [answer for answer, _ in predictions[0]["topk"]],
+            ["man's hat", "sun", "rain", "dog", "cat"],
+        )
+        self.assertAlmostEqual(predictions[1]["topk"][1][1], 0.5)
@@ -4,12 +4,18 @@ import tempfile
 import unittest
 
 import torch
-from mmf.datasets.processors.image_processors import VILTImageProcessor
+from mmf.datasets.processors.image_processors import (
+    GrayScaleTo3Channels,
+    NormalizeBGR255,
+    ToUInt8Tensor,
+    VILTImageProcessor,
+)
 from mmf.datasets.processors.processors import (
     CaptionProcessor,
     EvalAIAnswerProcessor,
     MultiClassFromFile,
     MultiHotAnswerFromVocabProcessor,
+    NumberbatchProcessor,
     Processor,
     TransformerBboxProcessor,
 )
@@ -176,6 +182,30 @@ class TestDatasetProcessors(unittest.TestCase):
         self.assertRaises(AssertionError, processor, {"label": "UNK"})
         os.unlink(f.name)
 
+    def test_numberbatch_processor(self):
+        f = tempfile.NamedTemporaryFile(mode="w", delete=False)
+        f.writelines(
+            "\n".join(["3 2", "red 1 0", "car 0 1", "red_car 3 4"]) + "\n"
+        )
+        f.close()
+        config = OmegaConf.create({"filepath": f.name, "max_seq_length": 5})
+        processor = NumberbatchProcessor(config)
+
+        output = processor(
+            {"tokens": ["[CLS]", "a", "red", "car", "[SEP]"], "answers": ["car", "red"]}
+        )
+        # longest concept is matched first, then the remaining ones
+        expected = torch.tensor([3.0, 5.0]) / torch.tensor([3.0, 5.0]).norm()
+        self.assertTrue(torch.allclose(output["graph_embedding"], expected))
+        # "car_red" is not a concept, so both answers are averaged
+        expected = torch.tensor([0.5, 0.5]) / torch.tensor([0.5, 0.5]).norm()
+        self.assertTrue(torch.allclose(output["avg_embedded_answers"], expected))
+
+        output = processor({"text": "unknown words"})
+        self.assertTrue(torch.equal(output["graph_embedding"], torch.zeros(2)))
+        self.assertNotIn("avg_embedded_answers", output)
+        os.unlink(f.name)
+
     def test_vilt_image_processor(self):
         from torchvision.transforms import ToPILImage
 
@@ -193,6 +223,29 @@ class TestDatasetProcessors(unittest.TestCase):
         processed_image = image_processor(image)
         self.assertEqual(processed_image.size(), expected_size)
 
+    def test_uint8_image_batch_normalization(self):
+        from torchvision.transforms import ToPILImage, ToTensor
+
+        normalize = NormalizeBGR255(
+            mean=[0.406, 0.456, 0.485],
+            std=[0.14380469, 0.12145835, 0.12221994],
+            to_bgr255=True,
+            pad_size=-1,
+        )
+        images = [
+            ToPILImage()(torch.rand(3, 20, 30)),
+            ToPILImage()(torch.rand(1, 20, 30)),
+        ]
+        expected = torch.stack(
+            [normalize(GrayScaleTo3Channels()(ToTensor()(image))) for image in images]
+        )
+
+        uint8_images = torch.stack([ToUInt8Tensor()(image) for image in images])
+        self.assertEqual(uint8_images.dtype, torch.uint8)
+        self.assertEqual(uint8_images.size(), torch.Size([2, 20, 30, 3]))
+        torch.testing.assert_close(normalize(uint8_images), expected)
+        torch.testing.assert_close(normalize(uint8_images[1]), expected[1])
+
     @skip_if_no_pytorchvideo
     def test_video_transforms(self):
         config = OmegaConf.create(
@@ -0,0 +1,40 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+import unittest
+
+import numpy as np
+from mmf.datasets.samplers import LengthBucketBatchSampler
+
+
+class TestLengthBucketBatchSampler(unittest.TestCase):
+    def setUp(self):
+        self.lengths = np.random.RandomState(0).randint(3, 30, 103)
+
+    def test_covers_dataset(self):
+        sampler = LengthBucketBatchSampler(
+            self.lengths, batch_size=8, bucket_size_multiplier=4
+        )
+        batches = list(sampler)
+        self.assertEqual(len(batches), len(sampler))
+        self.assertEqual(sorted(sum(batches, [])), list(range(len(self.lengths))))
+        # reshuffled on every iteration
+        self.assertNotEqual(batches, list(sampler))
+
+    def test_groups_lengths(self):
+        sampler = LengthBucketBatchSampler(self.lengths, batch_size=8, shuffle=False)
+        batches = list(sampler)
+        spread = [np.ptp(self.lengths[batch]) for batch in batches]
+        self.assertLessEqual(max(spread), 3)
+        self.assertTrue(all(len(batch) == 8 for batch in batches[:-1]))
+
+    def test_replicas(self):
+        batches = [
+            list(
+                LengthBucketBatchSampler(
+                    self.lengths, batch_size=8, drop_last=True, num_replicas=3, rank=rank
+                )
+            )
+            for rank in range(3)
+        ]
+        self.assertEqual({len(b) for b in batches}, {4})
+        indices = sum(sum(batches, []), [])
+        self.assertEqual(len(indices), len(set(indices)))
@@ -0,0 +1,34 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+import tempfile
+import unittest
+
+import numpy as np
+from mmf.datasets.processors.tokenized_store import TokenizedTextStore
+
+
+class TestTokenizedTextStore(unittest.TestCase):
+    def setUp(self):
+        self.texts = ["what is this?", "is it raining?", ""]
+        self.input_ids = [[101, 2054, 2003, 2023, 102], [101, 2003, 102], [101, 102]]
+        self.question_ids = [7, 3, 12]
+
+    def test_write_and_get(self):
+        with tempfile.TemporaryDirectory() as path:
+            TokenizedTextStore.write(
+                path, self.input_ids, self.texts, self.question_ids, {"a": 1}
+            )
+            store = TokenizedTextStore(path)
+
+            self.assertEqual(len(store), 3)
+            self.assertEqual(store.meta, {"a": 1, "num_texts": 3})
+            self.assertEqual(store.input_ids.dtype, np.uint16)
+            for text, ids, question_id in zip(
+                self.texts, self.input_ids, self.question_ids
+            ):
+                self.assertEqual(store.get(text, question_id).tolist(), ids)
+                self.assertEqual(store.get(text).tolist(), ids)
+
+            # changed question of a known id falls back to the text
+            self.assertEqual(store.get("is it raining?", 7).tolist(), [101, 2003, 102])
+            self.assertIsNone(store.get("what is that?", 7))
+            self.assertIsNone(store.get("what is that?"))
@@ -53,6 +53,14 @@ class TestEncoders(unittest.TestCase):
     def test_identity(self):
         self._test_init(encoders.IdentityEncoder, in_dim=256)
 
+    def test_pack_regions(self):
+        regions = [torch.randn(3, 8), torch.randn(5, 8), torch.randn(1, 8)]
+        packed, mask = encoders.pack_regions(regions)
+        self.assertEqual(list(packed.size()), [3, 5, 8])
+        self.assertEqual(mask.sum(1).tolist(), [3, 5, 1])
+        self.assertTrue(torch.equal(packed[0, :3], regions[0]))
+        self.assertTrue(torch.all(packed[~mask] == 0))
+
     def test_transformer_encoder_forward(self):
         encoder = encoders.TransformerEncoder.from_params()
         self.assertEqual(encoder.embeddings.word_embeddings.weight.size(1), 768)
@@ -1,6 +1,7 @@
 # Copyright (c) Facebook, Inc. and its affiliates.
 import os
 import unittest
+from types import SimpleNamespace
 
 import mmf.modules.metrics as metrics
 import torch
@@ -333,3 +334,59 @@ class TestModuleMetrics(unittest.TestCase):
 
         acc = metric.calculate({"targets": targets}, {"scores": scores})
         self.assertAlmostEqual(0.48, acc.item(), 1)
+
+    def test_streaming_metrics(self):
+        torch.manual_seed(2)
+        targets = torch.rand((25, 10))
+        scores = torch.rand((25, 10))
+
+        for metric in [
+            metrics.Accuracy(),
+            metrics.TopKAccuracy(score_key="scores", k=5),
+            metrics.VQAAccuracy(),
+        ]:
+            self.assertTrue(metric.supports_streaming)
+            expected = metric.calculate({"targets": targets}, {"scores": scores})
+
+            metric.reset()
+            for start in range(0, 25, 8):
+                metric.update(
+                    {"targets": targets[start : start + 8]},
+                    {"scores": scores[start : start + 8]},
+                )
+            self.assertAlmostEqual(metric.compute().item(), expected.item(), 5)
+
+        self.assertFalse(metrics.MacroF1().supports_streaming)
+
+    def test_streaming_vqa_evalai_accuracy(self):
+        words = ["<unk>", "cat", "dog", "red", "two"]
+        answer_processor = SimpleNamespace(
+            get_true_vocab_size=lambda: len(words), idx2word=lambda idx: words[idx]
+        )
+        registry.register("streaming_answer_processor", answer_processor)
+
+        torch.manual_seed(2)
+        scores = torch.rand((25, 5))
+        answers = [
+            [words[torch.randint(1, 5, (1,)).item()] for _ in range(10)]
+            for _ in range(25)
+        ]
+
+        def sample_list(start, end):
+            sample = Sample()
+            sample.dataset_name = "streaming"
+            sample.answers = answers[start:end]
+            sample.context_tokens = [[] for _ in range(start, end)]
+            return sample
+
+        metric = metrics.VQAEvalAIAccuracy()
+        self.assertTrue(metric.supports_streaming)
+        expected = metric.calculate(sample_list(0, 25), {"scores": scores})
+        self.assertGreater(expected.item(), 0)
+
+        metric.reset()
+        for start in range(0, 25, 8):
+            metric.update(
+                sample_list(start, start + 8), {"scores": scores[start : start + 8]}
+            )
+        self.assertAlmostEqual(metric.compute().item(), expected.item(), 5)
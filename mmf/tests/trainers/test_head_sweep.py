@@ -0,0 +1,66 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+import unittest
+
+import torch
+from mmf.modules.encoders import pack_regions
+from mmf.trainers.head_sweep_trainer import HeadSweepTrainer
+from mmf.utils.build import build_attention_module
+from omegaconf import OmegaConf
+
+
+class TestHeadSweepTrainer(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(1234)
+        self.trainer = HeadSweepTrainer.__new__(HeadSweepTrainer)
+        self.trainer.device = torch.device("cpu")
+
+    def _build_attention_module(self):
+        return build_attention_module(
+            OmegaConf.create(
+                {
+                    "type": "dual_one_way_top_down",
+                    "fusion": {
+                        "type": "two_modality_arithmetic",
+                        "params": {
+                            "operation": "multiply",
+                            "i_dim": 8,
+                            "guided_dim": 6,
+                            "h_dim": 4,
+                            "norm": "weight",
+                            "act": "ReLU",
+                            "dropout": 0,
+                        },
+                    },
+                }
+            )
+        )
+
+    def test_region_features_with_attention(self):
+        # features as cache_features stores them for region features, which are
+        # at most max_regions per image
+        regions = [torch.rand(3, 8), torch.rand(5, 8)]
+        image, image_mask = pack_regions(regions)
+        cached = {
+            "image": image.half(),
+            "image_mask": image_mask,
+            "question": torch.rand(2, 6).half(),
+        }
+        features = self.trainer._features_to_device(cached)
+        self.assertEqual(features["image"].dtype, torch.float32)
+        self.assertEqual(features["image_mask"].dtype, torch.bool)
+
+        attention_module = self._build_attention_module()
+        attention = attention_module(
+            features["image"], features["question"], mask=features["image_mask"]
+        )
+        self.assertTrue(torch.allclose(attention.sum(1), torch.ones(2, 1)))
+        self.assertTrue(torch.all(attention[0, 3:] == 0))
+
+    def test_image_without_regions(self):
+        image, image_mask = pack_regions([torch.rand(3, 8), torch.rand(0, 8)])
+        attention = self._build_attention_module()(
+            image, torch.rand(2, 6), mask=image_mask
+        )
+        self.assertTrue(torch.isfinite(attention).all())
+        self.assertTrue(torch.allclose(attention[0].sum(), torch.tensor(1.0)))
+        self.assertTrue(torch.all(attention[1] == 0))
@@ -225,3 +225,24 @@ class TestTrainingLoop(unittest.TestCase):
         except RuntimeError:
             exception_raised = True
         self.assertTrue(exception_raised)
+
+    @patch("mmf.trainers.core.training_loop.PathManager")
+    @patch("mmf.common.test_reporter.PathManager", return_value=MagicMock())
+    def test_anomaly_replay(self, a, path_manager):
+        config = self._get_config(max_updates=2, max_epochs=None, batch_size=4)
+        config.training.anomaly_replay = True
+        trainer = TrainerTrainingLoopMock(config=config)
+        add_model(trainer, SimpleNaNLossModel({"in_dim": 1}))
+        add_optimizer(trainer, config)
+        registry.register("config", trainer.config)
+        batch_size = get_batch_size()
+        trainer.config.training.batch_size = batch_size
+        trainer.load_datasets()
+
+        with patch("torch.save") as save:
+            with self.assertRaises(RuntimeError) as context:
+                trainer.training_loop()
+            # the offending step is snapshotted before it is replayed
+            self.assertEqual(save.call_count, 1)
+        self.assertIn("Non-finite loss or gradients in update 1", str(context.exception))
+        self.assertFalse(torch.is_anomaly_enabled())
@@ -0,0 +1,95 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+import unittest
+
+import torch
+from mmf.utils.cpu_inference import (
+    fold_frozen_batchnorm,
+    fuse_linear_layers,
+    quantize_linear_layers,
+    remove_weight_norms,
+    to_channels_last,
+)
+from torch import nn
+from torch.nn.utils.weight_norm import weight_norm
+
+
+class ConvWithNorm(nn.Conv2d):
+    def __init__(self, *args, norm=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.norm = norm
+
+    def forward(self, x):
+        x = super().forward(x)
+        if self.norm is not None:
+            x = self.norm(x)
+        return x
+
+
+class TestUtilsCPUInference(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(1234)
+
+    def test_remove_weight_norms(self):
+        module = nn.Sequential(
+            weight_norm(nn.Linear(8, 8), dim=None), nn.ReLU(), nn.Linear(8, 2)
+        )
+        x = torch.randn(4, 8)
+        expected = module(x)
+
+        self.assertEqual(remove_weight_norms(module), 1)
+        self.assertFalse(hasattr(module[0], "weight_g"))
+        self.assertTrue(torch.allclose(module(x), expected, atol=1e-6))
+
+    def test_fold_frozen_batchnorm(self):
+        norm = nn.BatchNorm2d(4)
+        norm.running_mean.uniform_(-1, 1)
+        norm.running_var.uniform_(0.5, 2)
+        norm.weight.data.uniform_(0.5, 2)
+        norm.bias.data.uniform_(-1, 1)
+        module = nn.Sequential(ConvWithNorm(3, 4, 3, bias=False, norm=norm)).eval()
+        x = torch.randn(2, 3, 8, 8)
+        expected = module(x)
+
+        self.assertEqual(fold_frozen_batchnorm(module), 1)
+        self.assertIsNone(module[0].norm)
+        module = to_channels_last(module)
+        output = module(x.contiguous(memory_format=torch.channels_last))
+        self.assertTrue(torch.allclose(output, expected, atol=1e-5))
+
+    def test_fuse_linear_layers(self):
+        module = nn.Sequential(
+            weight_norm(nn.Linear(16, 8), dim=None),
+            nn.Dropout(0.4),
+            weight_norm(nn.Linear(8, 8), dim=None),
+            nn.ReLU(),
+            nn.Dropout(0.4),
+            nn.Linear(8, 4),
+        ).eval()
+        x = torch.randn(8, 16)
+        expected = module(x)
+
+        # weight norms have to be removed before layers can be fused
+        self.assertEqual(fuse_linear_layers(module), 2)
+        self.assertEqual(len(module), 4)
+        self.assertEqual(remove_weight_norms(module), 2)
+        self.assertEqual(fuse_linear_layers(module), 1)
+        self.assertEqual(len(module), 3)
+        self.assertEqual(module[0].weight.shape, (8, 16))
+        self.assertTrue(torch.allclose(module(x), expected, atol=1e-5))
+
+        # dropouts of modules in train mode are kept
+        module = nn.Sequential(nn.Linear(4, 4), nn.Dropout(0.4), nn.Linear(4, 4))
+        self.assertEqual(fuse_linear_layers(module), 0)
+
+    def test_quantize_linear_layers(self):
+        module = nn.Sequential(
+            weight_norm(nn.Linear(16, 32), dim=None), nn.ReLU(), nn.Linear(32, 4)
+        ).eval()
+        x = torch.randn(8, 16)
+        expected = module(x)
+
+        quantized = quantize_linear_layers(module)
+        self.assertFalse(isinstance(quantized[0], nn.Linear))
+        output = quantized(x)
+        self.assertEqual(output.shape, expected.shape)
+        self.assertTrue(torch.allclose(output, expected, atol=0.1))
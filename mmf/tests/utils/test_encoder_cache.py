@@ -0,0 +1,57 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import torch
+from mmf.utils.encoder_cache import EncoderCache, content_hash
+from PIL import Image
+
+
+class TestUtilsEncoderCache(unittest.TestCase):
+    def test_lru_eviction_and_stats(self):
+        # room for two entries of 64 float32 values
+        cache = EncoderCache({"image": 512 / 2 ** 20, "question": 0})
+        batch = torch.randn(3, 64)
+
+        self.assertIsNone(cache.get("image", "a"))
+        cache.put("image", "a", batch[0])
+        cache.put("image", "b", batch[1])
+        self.assertTrue(torch.equal(cache.get("image", "a"), batch[0]))
+        # "b" is now the least recently used entry
+        cache.put("image", "c", batch[2])
+        self.assertIsNone(cache.get("image", "b"))
+        self.assertIsNotNone(cache.get("image", "c"))
+
+        # entries do not keep the whole batch alive
+        entry = cache.get("image", "a")
+        self.assertEqual(entry.untyped_storage().nbytes(), 256)
+
+        stats = cache.stats()
+        self.assertEqual(stats["image"]["hits"], 3)
+        self.assertEqual(stats["image"]["misses"], 2)
+        self.assertEqual(stats["image"]["entries"], 2)
+
+        # a limit of 0 disables the cache
+        cache.put("question", (1, 2), batch[0])
+        self.assertIsNone(cache.get("question", (1, 2)))
+
+    def test_content_hash(self):
+        array = np.random.randint(0, 255, (8, 8, 3), dtype=np.uint8)
+        image = Image.fromarray(array)
+        self.assertEqual(content_hash(image), content_hash(Image.fromarray(array)))
+        self.assertNotEqual(content_hash(image), content_hash(image.rotate(90)))
+        self.assertEqual(
+            content_hash(torch.from_numpy(array)), content_hash(torch.tensor(array))
+        )
+
+    def test_content_hash_of_files(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "image.png")
+            Image.fromarray(np.zeros((8, 8, 3), dtype=np.uint8)).save(path)
+            key = content_hash(path)
+            self.assertEqual(content_hash(path), key)
+            # a rewritten file gets a new key
+            os.utime(path, ns=(0, 0))
+            self.assertNotEqual(content_hash(path), key)
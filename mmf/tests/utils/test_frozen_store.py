@@ -0,0 +1,66 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+import os
+import tempfile
+import unittest
+
+import torch
+from mmf.utils.frozen_store import (
+    FrozenModuleStore,
+    frozen_submodules,
+    restore_frozen_modules,
+)
+
+
+class TestFrozenStore(unittest.TestCase):
+    def setUp(self):
+        torch.manual_seed(1234)
+        self.model = torch.nn.ModuleDict(
+            {
+                "encoder": torch.nn.Sequential(
+                    torch.nn.Linear(4, 8), torch.nn.BatchNorm1d(8)
+                ),
+                "head": torch.nn.Linear(8, 2),
+            }
+        )
+        for param in self.model["encoder"].parameters():
+            param.requires_grad = False
+
+    def test_frozen_submodules(self):
+        self.assertEqual(list(frozen_submodules(self.model)), ["encoder"])
+
+    def test_split_and_restore(self):
+        with tempfile.TemporaryDirectory() as root:
+            store = FrozenModuleStore(root)
+            state_dict = self.model.state_dict()
+            trainable, references = store.split(self.model, state_dict)
+
+            self.assertEqual(set(trainable), {"head.weight", "head.bias"})
+            self.assertEqual(list(references), ["encoder"])
+            self.assertEqual(len(os.listdir(root)), 1)
+
+            # unchanged frozen modules are stored once
+            _, same_references = store.split(self.model, self.model.state_dict())
+            self.assertEqual(same_references, references)
+            self.assertEqual(len(os.listdir(root)), 1)
+
+            ckpt = {
+                "model": trainable,
+                "frozen_modules": references,
+                "frozen_store": root,
+            }
+            ckpt = restore_frozen_modules(ckpt)
+            self.assertNotIn("frozen_modules", ckpt)
+            self.assertEqual(set(ckpt["model"]), set(state_dict))
+            for key, value in state_dict.items():
+                self.assertTrue(torch.equal(ckpt["model"][key], value))
+
+            # in-place changes of the frozen weights give a new entry
+            with torch.no_grad():
+                self.model["encoder"][0].weight.add_(1)
+            _, new_references = store.split(self.model, self.model.state_dict())
+            self.assertNotEqual(new_references, references)
+            self.assertEqual(len(os.listdir(root)), 2)
+
+    def test_restore_full_checkpoint(self):
+        ckpt = {"model": self.model.state_dict()}
+        self.assertIs(restore_frozen_modules(ckpt), ckpt)
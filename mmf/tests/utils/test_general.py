@@ -1,7 +1,16 @@
 # Copyright (c) Facebook, Inc. and its affiliates.
 import unittest
 
-from mmf.utils.general import dict_to_string, get_overlap_score
+import torch
+from mmf.utils.general import (
+    dict_to_string,
+    get_autocast,
+    get_overlap_score,
+    is_cpu_autocast_enabled,
+    reset_missing_parameters,
+    skip_init_weights,
+)
+from omegaconf import OmegaConf
 
 
 class TestUtilsGeneral(unittest.TestCase):
@@ -42,3 +51,46 @@ class TestUtilsGeneral(unittest.TestCase):
         candidate = "pythia"
         target = "vqa"
         self.assertEqual(get_overlap_score(candidate, target), 0.0)
+
+    def test_get_autocast(self):
+        linear = torch.nn.Linear(4, 2)
+        x = torch.rand(3, 4)
+
+        config = OmegaConf.create({"fp16": False, "cpu_amp": True})
+        with get_autocast(config):
+            self.assertTrue(is_cpu_autocast_enabled())
+            self.assertEqual(linear(x).dtype, torch.bfloat16)
+        self.assertFalse(is_cpu_autocast_enabled())
+
+        config = OmegaConf.create({"fp16": False})
+        with get_autocast(config):
+            self.assertFalse(is_cpu_autocast_enabled())
+            self.assertEqual(linear(x).dtype, torch.float32)
+
+    def test_skip_init_weights(self):
+        with skip_init_weights():
+            linear = torch.nn.Linear(4, 2)
+            torch.nn.init.constant_(linear.weight, 1.0)
+        self.assertFalse(torch.equal(linear.weight, torch.ones(2, 4)))
+
+        torch.nn.init.constant_(linear.weight, 1.0)
+        self.assertTrue(torch.equal(linear.weight, torch.ones(2, 4)))
+
+    def test_reset_missing_parameters(self):
+        with skip_init_weights():
+            model = torch.nn.Sequential(torch.nn.Linear(4, 2), torch.nn.ReLU())
+        bias = torch.tensor([1.0, -1.0])
+        incompatible_keys = model.load_state_dict({"0.bias": bias}, strict=False)
+        self.assertEqual(incompatible_keys.missing_keys, ["0.weight"])
+
+        torch.manual_seed(0)
+        self.assertEqual(reset_missing_parameters(model, ["0.weight"]), ["0"])
+        torch.manual_seed(0)
+        expected = torch.nn.Linear(4, 2).weight
+        self.assertTrue(torch.equal(model[0].weight, expected))
+        # the loaded bias is kept
+        self.assertTrue(torch.equal(model[0].bias, bias))
+
+        model.register_buffer("scale", torch.ones(1))
+        with self.assertRaises(RuntimeError):
+            reset_missing_parameters(model, ["scale"])
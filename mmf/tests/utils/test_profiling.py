@@ -0,0 +1,59 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from mmf.utils.profiling import BUCKET_EDGES_MS, SpanProfiler, SpanStats
+
+
+class TestProfiling(unittest.TestCase):
+    def test_disabled(self):
+        profiler = SpanProfiler()
+        with profiler.span("forward"):
+            pass
+        self.assertEqual(list(profiler.iterate("batch_load", range(3))), [0, 1, 2])
+        self.assertEqual(profiler.summarize()["spans"], {})
+        self.assertIsNone(profiler.emit(1))
+
+    def test_span_stats(self):
+        stats = SpanStats()
+        for duration in [0.5, 1.5, 1.5, 3.0, 100000.0]:
+            stats.add(duration)
+        self.assertEqual(stats.count, 5)
+        self.assertEqual(sum(stats.buckets), 5)
+        self.assertEqual(stats.buckets[-1], 1)
+        self.assertEqual(stats.quantile(0.5), 2.0)
+        self.assertEqual(stats.quantile(1.0), 100000.0)
+
+        summary = stats.summary()
+        self.assertEqual(summary["max_ms"], 100000.0)
+        self.assertAlmostEqual(summary["mean_ms"], 100006.5 / 5)
+        self.assertEqual(len(summary["histogram"]), len(BUCKET_EDGES_MS) + 1)
+
+    def test_emit(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            trace_file = os.path.join(tmp_dir, "trace.jsonl")
+            profiler = SpanProfiler()
+            profiler.configure(enabled=True, trace_file=trace_file)
+            for _ in profiler.iterate("batch_load", range(4)):
+                with profiler.span("forward"):
+                    pass
+            tb_writer = MagicMock()
+            summary = profiler.emit(10, tb_writer)
+
+            self.assertEqual(set(summary["spans"]), {"batch_load", "forward"})
+            self.assertEqual(summary["spans"]["forward"]["count"], 4)
+            self.assertIn("peak_rss_mb", summary)
+            scalars = tb_writer.add_scalars.call_args[0][0]
+            self.assertIn("profiling/forward/p90_ms", scalars)
+            self.assertEqual(tb_writer.add_histogram_raw.call_count, 2)
+
+            # a new interval starts after each summary
+            self.assertEqual(profiler.summarize()["spans"], {})
+            profiler.emit(20)
+            with open(trace_file) as f:
+                lines = [json.loads(line) for line in f]
+            self.assertEqual([line["iteration"] for line in lines], [10, 20])
+            self.assertEqual(lines[0]["spans"]["batch_load"]["count"], 4)
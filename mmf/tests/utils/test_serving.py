@@ -0,0 +1,113 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+import base64
+import io
+import os
+import tempfile
+import threading
+import unittest
+
+from mmf.utils.serving import LatencyStats, MicroBatcher
+from mmf_cli.serve import load_image
+from PIL import Image
+
+
+class TestUtilsServing(unittest.TestCase):
+    def test_micro_batches_concurrent_requests(self):
+        batch_sizes = []
+
+        def batch_fn(items):
+            batch_sizes.append(len(items))
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=200)
+        batcher.start()
+        results = {}
+
+        def client(value):
+            results[value] = batcher.submit(value, timeout=5)
+
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        batcher.stop()
+
+        self.assertEqual(results, {i: i * 2 for i in range(8)})
+        self.assertEqual(sum(batch_sizes), 8)
+        self.assertTrue(max(batch_sizes) <= 4)
+        self.assertTrue(len(batch_sizes) < 8)
+
+        stats = batcher.stats()
+        self.assertEqual(stats["num_requests"], 8)
+        self.assertEqual(stats["queue_depth"], 0)
+        self.assertIsNotNone(stats["p50_ms"])
+        self.assertTrue(stats["p99_ms"] >= stats["p50_ms"])
+
+    def test_errors_are_raised_in_caller(self):
+        def batch_fn(items):
+            raise ValueError("bad batch")
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=2, max_wait_ms=1)
+        batcher.start()
+        with self.assertRaises(ValueError):
+            batcher.submit(1, timeout=5)
+        batcher.stop()
+
+    def test_bad_request_only_fails_itself(self):
+        def batch_fn(items):
+            if "bad" in items:
+                raise ValueError("bad item")
+            return [item.upper() for item in items]
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=200)
+        batcher.start()
+        results = {}
+
+        def client(value):
+            try:
+                results[value] = batcher.submit(value, timeout=5)
+            except ValueError as e:
+                results[value] = e
+
+        threads = [
+            threading.Thread(target=client, args=(value,))
+            for value in ["a", "bad", "c"]
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        batcher.stop()
+
+        self.assertEqual(results["a"], "A")
+        self.assertEqual(results["c"], "C")
+        self.assertIsInstance(results["bad"], ValueError)
+
+    def test_load_image(self):
+        buffer = io.BytesIO()
+        Image.new("RGB", (4, 4), (255, 0, 0)).save(buffer, format="PNG")
+        encoded = base64.b64encode(buffer.getvalue()).decode()
+        self.assertEqual(load_image(encoded).size, (4, 4))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "image.png")
+            with open(path, "wb") as f:
+                f.write(buffer.getvalue())
+            # local paths are only accepted when they are allowed
+            with self.assertRaises(ValueError):
+                load_image(path)
+            self.assertEqual(load_image(path, allow_local_paths=True).size, (4, 4))
+
+        # truncated images fail when they are loaded, not in the batch
+        truncated = base64.b64encode(buffer.getvalue()[:20]).decode()
+        with self.assertRaises(OSError):
+            load_image(truncated)
+
+    def test_latency_percentiles(self):
+        stats = LatencyStats()
+        self.assertIsNone(stats.percentile(50))
+        for value in range(101):
+            stats.add(value)
+        self.assertEqual(stats.percentile(50), 50)
+        self.assertEqual(stats.percentile(99), 99)
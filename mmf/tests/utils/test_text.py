@@ -54,6 +54,17 @@ class TestUtilsText(unittest.TestCase):
 
         self.assertEqual(list(tokens), self.TOKENS)
 
+    def test_trim_padding(self):
+        input_ids = torch.tensor([[101, 7, 8, 102, 0, 0], [101, 9, 102, 0, 0, 0]])
+        trimmed_ids, mask = text_utils.trim_padding(input_ids)
+        self.assertEqual(trimmed_ids.tolist(), [[101, 7, 8, 102], [101, 9, 102, 0]])
+        self.assertEqual(mask.tolist(), [[1, 1, 1, 1], [1, 1, 1, 0]])
+
+        input_mask = (input_ids != 0).long()
+        trimmed_ids, mask = text_utils.trim_padding(input_ids, input_mask)
+        self.assertEqual(list(trimmed_ids.size()), [2, 4])
+        self.assertTrue(torch.equal(mask, input_mask[:, :4]))
+
     def test_generate_ngrams(self):
         ngrams = text_utils.generate_ngrams(self.TOKENS, 2)
 
@@ -0,0 +1,46 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+import os
+import tempfile
+import unittest
+
+import torch
+from mmf.utils.vocab import _gather_vectors, _load_vocab_cache, _save_vocab_cache
+
+
+class TestVocab(unittest.TestCase):
+    def setUp(self):
+        self.embedding_stoi = {"cat": 2, "dog": 0, "rain": 1}
+        self.embedding_vectors = torch.arange(6, dtype=torch.float).view(3, 2)
+
+    def test_gather_vectors(self):
+        vectors = _gather_vectors(
+            ["rain", "unknown", "cat"], self.embedding_stoi, self.embedding_vectors
+        )
+        expected = torch.tensor(
+            [
+                [0.0, 0.0],
+                [0.1, 0.1],
+                [0.2, 0.2],
+                [0.3, 0.3],
+                [2.0, 3.0],
+                [0.3, 0.3],
+                [4.0, 5.0],
+            ]
+        )
+        self.assertTrue(torch.allclose(vectors, expected))
+
+    def test_vocab_cache(self):
+        words = ["rain", "cat"]
+        vectors = _gather_vectors(words, self.embedding_stoi, self.embedding_vectors)
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "glove.6B.300d")
+            self.assertIsNone(_load_vocab_cache(path))
+
+            _save_vocab_cache(path, words, vectors)
+            itos, cached_vectors = _load_vocab_cache(path)
+            self.assertEqual(itos, words)
+            self.assertTrue(torch.equal(cached_vectors, vectors))
+
+            # writes to the cached vectors do not change the cache
+            cached_vectors.add_(1)
+            self.assertTrue(torch.equal(_load_vocab_cache(path)[1], vectors))
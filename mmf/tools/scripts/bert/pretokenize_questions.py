@@ -0,0 +1,82 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+"""
+Tokenizes the questions of imdb annotation files once and writes them to a
+store, which the ``bert_tokenizer`` processor reads through its
+``tokenized_store`` param instead of tokenizing every question on every epoch:
+
+    python tools/scripts/bert/pretokenize_questions.py \
+        --annotations okvqa/defaults/annotations/annotations/imdb_train.npy \
+        okvqa/defaults/annotations/annotations/imdb_val.npy \
+        --out okvqa/defaults/annotations/tokenized/bert-base-uncased
+
+The tokenizer and ``max_seq_length`` have to match the processor config,
+otherwise the processor ignores the store.
+"""
+
+import argparse
+
+import numpy as np
+from mmf.datasets.processors.bert_processors import BertTokenizer
+from mmf.datasets.processors.tokenized_store import TokenizedTextStore
+from omegaconf import OmegaConf
+
+
+def get_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--tokenizer", default="bert-base-uncased", help="tokenizer type"
+    )
+    parser.add_argument("--max_seq_length", type=int, default=128)
+    parser.add_argument(
+        "--annotations", nargs="+", required=True, help="imdb .npy files"
+    )
+    parser.add_argument("--out", required=True, help="directory of the store")
+    return parser.parse_args()
+
+
+def get_questions(annotation_files):
+    questions = {}
+    for annotation_file in annotation_files:
+        data = np.load(annotation_file, allow_pickle=True)
+        for sample_info in data:
+            # skips the header of the imdb
+            if "question_id" not in sample_info:
+                continue
+            question = sample_info.get("question_str", sample_info.get("question"))
+            questions[int(sample_info["question_id"])] = question
+    return questions
+
+
+def main():
+    args = get_args()
+    config = OmegaConf.create(
+        {
+            "tokenizer_config": {
+                "type": args.tokenizer,
+                "params": {"do_lower_case": True},
+            },
+            "mask_probability": 0,
+            "max_seq_length": args.max_seq_length,
+        }
+    )
+    processor = BertTokenizer(config)
+
+    questions = get_questions(args.annotations)
+    input_ids = []
+    for question in questions.values():
+        output = processor({"text": question})
+        length = int(output["input_mask"].sum())
+        input_ids.append(output["input_ids"][:length].tolist())
+
+    TokenizedTextStore.write(
+        args.out,
+        input_ids,
+        list(questions.values()),
+        list(questions.keys()),
+        processor.tokenized_store_meta(config),
+    )
+    print(f"Wrote {len(questions)} tokenized questions to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
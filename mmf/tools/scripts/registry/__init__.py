@@ -0,0 +1 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
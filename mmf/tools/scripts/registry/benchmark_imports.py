@@ -0,0 +1,87 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+"""
+Measures the import time of MMF in fresh interpreters, for the Qlarifais-only
+path and for the eager import of every registered module (``setup_imports``,
+as ``mmf_run`` does), and lists which models each of them imports:
+
+    python tools/scripts/registry/benchmark_imports.py --repeats 3
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+
+import numpy as np
+
+
+STATEMENTS = {
+    "import_mmf": "import mmf",
+    "qlarifais": "from mmf.models import Qlarifais",
+    "setup_imports": "from mmf.utils.env import setup_imports; setup_imports()",
+}
+
+IMPORT_TIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_profile(statement):
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"{statement!r} failed:\n{process.stderr[-2000:]}")
+    modules, total_us = [], 0
+    for line in process.stderr.splitlines():
+        match = IMPORT_TIME.match(line)
+        if match is None:
+            continue
+        cumulative, indent, module = int(match[2]), match[3], match[4]
+        modules.append(module)
+        # top level imports are indented by a single space
+        if len(indent) == 1:
+            total_us += cumulative
+    return total_us / 1e6, modules
+
+
+def benchmark(statement, repeats):
+    seconds = []
+    for _ in range(repeats):
+        total, modules = import_profile(statement)
+        seconds.append(total)
+    models = sorted(
+        {
+            module.split(".")[2]
+            for module in modules
+            if module.startswith("mmf.models.") and module.count(".") >= 2
+        }
+    )
+    return {
+        "median_seconds": float(np.median(seconds)),
+        "num_modules": len(modules),
+        "num_mmf_modules": sum(m.split(".")[0] == "mmf" for m in modules),
+        "mmf_models": models,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the import time of MMF")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--statements",
+        nargs="+",
+        choices=list(STATEMENTS),
+        default=list(STATEMENTS),
+    )
+    args = parser.parse_args()
+
+    results = {
+        name: benchmark(STATEMENTS[name], args.repeats) for name in args.statements
+    }
+    print(json.dumps(results, indent=4))
+
+
+if __name__ == "__main__":
+    main()
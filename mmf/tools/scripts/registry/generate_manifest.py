@@ -0,0 +1,14 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+"""
+Regenerates mmf/common/registry_manifest.py, which maps every name registered
+with a registry decorator to its module. Run it after adding or renaming a
+registered model, encoder, dataset builder etc.:
+
+    python tools/scripts/registry/generate_manifest.py
+"""
+
+from mmf.utils.env import write_registry_manifest
+
+
+if __name__ == "__main__":
+    write_registry_manifest()
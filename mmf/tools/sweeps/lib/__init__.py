@@ -159,7 +159,7 @@ def get_args(argv=None):
         )
 
     parser.add_argument(
-        "--backend", choices=["slurm", "fblearner", 'lsf'], default=default_backend
+        "--backend", choices=["slurm", "fblearner", 'lsf', 'inprocess'], default=default_backend
     )
 
     # FBLearner params
@@ -286,5 +286,7 @@ def main(get_grid, postprocess_hyperparams):
         from .fblearner import main as backend_main
     elif args.backend == "lsf":
         from .lsf import main as backend_main
+    elif args.backend == "inprocess":
+        from .inprocess import main as backend_main
 
     backend_main(get_grid, postprocess_hyperparams, args)
@@ -0,0 +1,116 @@
+# Copyright (c) Facebook, Inc. and its affiliates.
+
+# Runs a whole sweep as a single local MMF job using the `head_sweep` trainer.
+# Hyperparameters with the same value in all trials (after postprocessing) are
+# passed on the command line, the others become per trial overrides.
+import itertools
+import os
+import random
+import subprocess
+from collections import OrderedDict
+
+import yaml
+from mmf.utils.general import get_mmf_root
+
+
+def main(get_grid, postprocess_hyperparams, args):
+    grid = get_grid(args)
+    grid_product = list(itertools.product(*[hp.values for hp in grid]))
+
+    random.seed(args.seed)
+    random.shuffle(grid_product)
+    if args.t > 0:
+        grid_product = grid_product[: args.t]
+
+    save_dir = os.path.join(args.checkpoints_dir, args.prefix)
+
+    trials = []
+    for hp_values in grid_product:
+        config = OrderedDict()
+        for hp, value in zip(grid, hp_values):
+            config[hp.name] = hp
+            config[hp.name].current_value = value
+
+        postprocess_hyperparams(args, config)
+
+        save_dir_key = ".".join(
+            filter(
+                lambda save_dir_key: save_dir_key is not None,
+                [hp.get_save_dir_key() for hp in config.values()],
+            )
+        )
+        save_dir_key = save_dir_key.replace(",", "_")
+        # as written by HeadSweepTrainer.finalize_trial
+        final_model = f"{config['model'].current_value}_final.pth"
+        if os.path.exists(os.path.join(save_dir, save_dir_key, final_model)):
+            if not args.resume_finished:
+                print(f"skip finished trial (override with --resume-finished): {save_dir_key}")
+                continue
+        # the hyperparam objects are shared by the trials, keep their values
+        trials.append(
+            {
+                "save_dir_key": save_dir_key,
+                "values": {name: hp.current_value for name, hp in config.items()},
+                "cli_args": {name: hp.get_cli_args() for name, hp in config.items()},
+            }
+        )
+
+    if len(trials) == 0:
+        print("nothing to run")
+        return
+
+    # hyperparameters (after postprocessing) with the same value in all trials
+    shared = [
+        name
+        for name in trials[0]["values"]
+        if all(
+            name in trial["values"] and trial["values"][name] == trials[0]["values"][name]
+            for trial in trials
+        )
+    ]
+    shared_cli_args = [arg for name in shared for arg in trials[0]["cli_args"][name]]
+    trials = [
+        {
+            "save_dir_key": trial["save_dir_key"],
+            "overrides": {
+                name: value
+                for name, value in trial["values"].items()
+                if name not in shared
+            },
+        }
+        for trial in trials
+    ]
+
+    trials_file = os.path.join(save_dir, "trials.yaml")
+    train_cmd = [
+        "python3",
+        "-u",
+        os.path.join(get_mmf_root(), "..", "mmf_cli", "run.py"),
+    ]
+    train_cmd.extend(map(str, shared_cli_args))
+    train_cmd.extend(["training.trainer", "head_sweep"])
+    train_cmd.extend(["sweep.trials_file", trials_file])
+    train_cmd.extend(["env.save_dir", save_dir])
+    if args.cache_dir:
+        train_cmd.extend(["env.cache_dir", args.cache_dir])
+    if args.data_dir:
+        train_cmd.extend(["env.data_dir", args.data_dir])
+    if args.tensorboard:
+        train_cmd.extend(["training.tensorboard", "1"])
+    if args.extra_args is not None and len(args.extra_args) > 0:
+        extra_args = [c for arg in args.extra_args for c in arg.split("=")]
+        train_cmd.extend(extra_args)
+
+    if args.dry_run:
+        print(f"| dry-run:  {len(trials)} trials in-process")
+        print(yaml.safe_dump({"trials": trials}))
+        print(f"| dry-run:  train command: {' '.join(train_cmd)}")
+        return
+
+    os.makedirs(save_dir, exist_ok=True)
+    with open(trials_file, "w") as f:
+        yaml.safe_dump({"trials": trials}, f)
+
+    print(f"running {len(trials)} trials in-process, saving to {save_dir}")
+    train_proc = subprocess.Popen(train_cmd, env=os.environ.copy())
+    train_proc.wait()